@@ -0,0 +1,28 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+
+from racing.async_views import AsyncDetailMixin, AsyncListMixin
+from racing.pagination import InvalidCursor
+
+from .views import PilotDetailView, PilotListView
+
+
+class AsyncPilotListView(AsyncListMixin, PilotListView):
+    pass
+
+
+class AsyncPilotDetailView(AsyncDetailMixin, PilotDetailView):
+    async def aprepare(self):
+        # The leaderboard loads itself from the database on first use.
+        await sync_to_async(self.get_standing)()
+
+    async def aload_context(self):
+        try:
+            self.drone_page = await self.get_drone_paginator().apage(
+                self.request.GET.get(self.cursor_param)
+            )
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+
+    def get_drone_page(self):
+        return self.drone_page
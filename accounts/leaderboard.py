@@ -0,0 +1,362 @@
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+MIN_RATING = 1
+MAX_RATING = 100
+
+
+class BaseLeaderboard:
+    """
+    Ranking of pilots by ``skill_rating``, best first.
+
+    Ranks are competition ranks: pilots sharing a rating share a rank, and
+    the next rating down starts after all of them. The order of pilots
+    within one rating is up to the backend.
+    """
+
+    def __init__(self, **options):
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+                    self._loaded = True
+
+    def load(self):
+        self.reload()
+
+    def reload(self):
+        """Replace the ranking with the ratings currently in the database."""
+        from accounts.models import Pilot
+
+        self.rebuild(
+            Pilot.objects.order_by().values_list("pk", "skill_rating")
+            .iterator(chunk_size=10000)
+        )
+        self._loaded = True
+
+    def rebuild(self, entries):
+        raise NotImplementedError
+
+    def update(self, pk, rating):
+        raise NotImplementedError
+
+    def remove(self, pk):
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def rank(self, pk):
+        raise NotImplementedError
+
+    def top(self, n):
+        """The ``n`` best ``(pk, rating)`` pairs."""
+        raise NotImplementedError
+
+    def around(self, pk, radius=2):
+        """Up to ``radius`` ``(pk, rating)`` pairs on each side of ``pk``."""
+        raise NotImplementedError
+
+    def percentile(self, pk):
+        """Share of the other pilots rated strictly below ``pk``, 0-100."""
+        rank = self.rank(pk)
+        if rank is None:
+            return None
+        total = self.count()
+        if total <= 1:
+            return 100.0
+        below = total - self.count_at_or_above(pk)
+        return round(100.0 * below / (total - 1), 1)
+
+    def count_at_or_above(self, pk):
+        """Number of pilots rated at least as high as ``pk``."""
+        raise NotImplementedError
+
+
+class InProcessLeaderboard(BaseLeaderboard):
+    """
+    Per-process leaderboard. Ratings are bounded, so a Fenwick tree over
+    the rating range counts the pilots above any rating in O(log R) and a
+    sorted list of pilot IDs per rating places a pilot inside its rating.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._reset()
+
+    def _reset(self):
+        self.ratings = {}
+        self.buckets = {}
+        # Tree slot i counts the pilots rated MAX_RATING - i + 1, so prefix
+        # sums run from the best rating down.
+        self.tree = [0] * (MAX_RATING - MIN_RATING + 2)
+
+    @staticmethod
+    def _slot(rating):
+        if not MIN_RATING <= rating <= MAX_RATING:
+            raise ValueError(f"Rating {rating} is out of range.")
+        return MAX_RATING - rating + 1
+
+    def _add(self, rating, delta):
+        slot = self._slot(rating)
+        while slot < len(self.tree):
+            self.tree[slot] += delta
+            slot += slot & -slot
+
+    def _prefix(self, slot):
+        total = 0
+        while slot > 0:
+            total += self.tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def _above(self, rating):
+        return self._prefix(self._slot(rating) - 1)
+
+    def _rating_at(self, position):
+        """Rating of the pilot at 0-based ``position`` in leaderboard order."""
+        slot, remaining = 0, position + 1
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if slot + step < len(self.tree) and self.tree[slot + step] < remaining:
+                slot += step
+                remaining -= self.tree[slot]
+            step >>= 1
+        return MAX_RATING - slot, remaining - 1
+
+    def _insert(self, pk, rating):
+        self.ratings[pk] = rating
+        insort(self.buckets.setdefault(rating, []), pk)
+        self._add(rating, 1)
+
+    def _discard(self, pk):
+        rating = self.ratings.pop(pk, None)
+        if rating is None:
+            return
+        bucket = self.buckets[rating]
+        del bucket[bisect_left(bucket, pk)]
+        self._add(rating, -1)
+
+    def rebuild(self, entries):
+        self._reset()
+        for pk, rating in entries:
+            self._insert(pk, rating)
+
+    def update(self, pk, rating):
+        self.ensure_loaded()
+        with self._lock:
+            if self.ratings.get(pk) != rating:
+                self._discard(pk)
+                self._insert(pk, rating)
+
+    def remove(self, pk):
+        self.ensure_loaded()
+        with self._lock:
+            self._discard(pk)
+
+    def count(self):
+        self.ensure_loaded()
+        return len(self.ratings)
+
+    def rank(self, pk):
+        self.ensure_loaded()
+        rating = self.ratings.get(pk)
+        if rating is None:
+            return None
+        return self._above(rating) + 1
+
+    def count_at_or_above(self, pk):
+        rating = self.ratings[pk]
+        return self._prefix(self._slot(rating))
+
+    def _position(self, pk):
+        rating = self.ratings[pk]
+        return self._above(rating) + bisect_left(self.buckets[rating], pk)
+
+    def _slice(self, start, stop):
+        stop = min(stop, len(self.ratings))
+        result = []
+        position = max(start, 0)
+        while position < stop:
+            rating, offset = self._rating_at(position)
+            bucket = self.buckets[rating][offset:offset + stop - position]
+            result.extend((pk, rating) for pk in bucket)
+            position += len(bucket)
+        return result
+
+    def top(self, n):
+        self.ensure_loaded()
+        with self._lock:
+            return self._slice(0, n)
+
+    def around(self, pk, radius=2):
+        self.ensure_loaded()
+        with self._lock:
+            if pk not in self.ratings:
+                return []
+            position = self._position(pk)
+            return self._slice(position - radius, position + radius + 1)
+
+
+class RedisLeaderboard(BaseLeaderboard):
+    """
+    Leaderboard kept in a Redis sorted set shared by every process.
+
+    ``client`` is anything speaking the redis-py sorted-set API (a
+    ``redis.Redis`` instance, or ``LocalSortedSetClient`` in tests);
+    without one, a client is created from ``url``.
+    """
+
+    def __init__(self, client=None, url=None, key="leaderboard:pilots",
+                 **options):
+        super().__init__(**options)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.key = key
+
+    def load(self):
+        # The sorted set outlives the process; only seed it when missing.
+        if not self.client.zcard(self.key):
+            self.reload()
+
+    @staticmethod
+    def _pairs(members):
+        return [(int(member), int(score)) for member, score in members]
+
+    def rebuild(self, entries):
+        self.client.delete(self.key)
+        batch = {}
+        for pk, rating in entries:
+            batch[str(pk)] = rating
+            if len(batch) >= 10000:
+                self.client.zadd(self.key, batch)
+                batch = {}
+        if batch:
+            self.client.zadd(self.key, batch)
+
+    def update(self, pk, rating):
+        self.ensure_loaded()
+        self.client.zadd(self.key, {str(pk): rating})
+
+    def remove(self, pk):
+        self.ensure_loaded()
+        self.client.zrem(self.key, str(pk))
+
+    def count(self):
+        self.ensure_loaded()
+        return self.client.zcard(self.key)
+
+    def rank(self, pk):
+        self.ensure_loaded()
+        score = self.client.zscore(self.key, str(pk))
+        if score is None:
+            return None
+        return self.client.zcount(self.key, f"({score}", "+inf") + 1
+
+    def count_at_or_above(self, pk):
+        score = self.client.zscore(self.key, str(pk))
+        return self.client.zcount(self.key, score, "+inf")
+
+    def top(self, n):
+        self.ensure_loaded()
+        return self._pairs(
+            self.client.zrevrange(self.key, 0, n - 1, withscores=True)
+        )
+
+    def around(self, pk, radius=2):
+        self.ensure_loaded()
+        position = self.client.zrevrank(self.key, str(pk))
+        if position is None:
+            return []
+        return self._pairs(self.client.zrevrange(
+            self.key, max(position - radius, 0), position + radius,
+            withscores=True,
+        ))
+
+
+class LocalSortedSetClient:
+    """
+    In-memory stand-in for the redis-py sorted-set commands used by
+    ``RedisLeaderboard``, for tests and single-process development.
+    """
+
+    def __init__(self):
+        self.sets = {}
+
+    def _ordered(self, key):
+        members = self.sets.get(key, {})
+        return sorted(members.items(), key=lambda item: (item[1], item[0]),
+                      reverse=True)
+
+    @staticmethod
+    def _bound(value):
+        value = str(value)
+        if value in ("+inf", "-inf"):
+            return float(value), False
+        if value.startswith("("):
+            return float(value[1:]), True
+        return float(value), False
+
+    def delete(self, key):
+        return int(self.sets.pop(key, None) is not None)
+
+    def zadd(self, key, mapping):
+        members = self.sets.setdefault(key, {})
+        added = sum(1 for member in mapping if member not in members)
+        members.update({member: float(score) for member, score in mapping.items()})
+        return added
+
+    def zrem(self, key, *members):
+        current = self.sets.get(key, {})
+        return sum(current.pop(member, None) is not None for member in members)
+
+    def zcard(self, key):
+        return len(self.sets.get(key, {}))
+
+    def zscore(self, key, member):
+        return self.sets.get(key, {}).get(member)
+
+    def zcount(self, key, minimum, maximum):
+        low, low_open = self._bound(minimum)
+        high, high_open = self._bound(maximum)
+        return sum(
+            1 for score in self.sets.get(key, {}).values()
+            if (score > low if low_open else score >= low)
+            and (score < high if high_open else score <= high)
+        )
+
+    def zrevrank(self, key, member):
+        for position, (name, _) in enumerate(self._ordered(key)):
+            if name == member:
+                return position
+        return None
+
+    def zrevrange(self, key, start, end, withscores=False):
+        ordered = self._ordered(key)
+        end = len(ordered) if end == -1 else end + 1
+        items = ordered[start:end]
+        return items if withscores else [name for name, _ in items]
+
+
+_leaderboard = None
+
+
+def get_leaderboard():
+    global _leaderboard
+    if _leaderboard is None:
+        config = getattr(settings, "PILOT_LEADERBOARD", {})
+        backend = import_string(config.get(
+            "BACKEND", "accounts.leaderboard.InProcessLeaderboard"
+        ))
+        _leaderboard = backend(**config.get("OPTIONS", {}))
+    return _leaderboard
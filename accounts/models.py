@@ -2,10 +2,31 @@ from django.contrib.auth.models import AbstractUser
 from django.core.validators import (MaxValueValidator,
                                     MinValueValidator,
                                     RegexValidator,)
-from django.db import models
+from django.db import connection, models
+from django.db.models.functions import Collate, Lower
 from django.urls import reverse
 
 
+# Compares by code point, under which a prefix match is also a range of
+# the index. SQLite has no "C" collation; its BINARY one is the same order.
+BYTE_ORDER_COLLATION = "BINARY" if connection.vendor == "sqlite" else "C"
+
+
+def byte_order(expression):
+    return Collate(expression, BYTE_ORDER_COLLATION)
+
+
+def fold_username(username):
+    """
+    Lowercase ``username`` the way ``Lower()`` does in the database;
+    SQLite's LOWER() leaves letters outside ASCII unchanged.
+    """
+    if connection.vendor == "sqlite":
+        return "".join(char.lower() if char.isascii() else char
+                       for char in username)
+    return username.lower()
+
+
 class Pilot(AbstractUser):
     drone_license = models.CharField(
         max_length=8, 
@@ -26,11 +47,26 @@ class Pilot(AbstractUser):
         ],
     )
     certification_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "pilot"
         verbose_name_plural = "pilots"
         ordering = ["username"]
+        indexes = [
+            models.Index(
+                fields=["-skill_rating", "username"],
+                name="pilot_skill_rating_idx",
+            ),
+            # Covers the case-insensitive autocomplete, which reads only
+            # these columns.
+            models.Index(
+                byte_order(Lower("username")),
+                "username",
+                "skill_rating",
+                name="pilot_username_lower_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.username} (Rating: {self.skill_rating})"
@@ -1,3 +1,297 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import transaction
+from django.urls import reverse
+
+from accounts.leaderboard import (InProcessLeaderboard,
+                                  LocalSortedSetClient,
+                                  RedisLeaderboard,
+                                  get_leaderboard,)
+from accounts.models import Pilot
+from accounts.views import PilotDetailView, PilotListView
+from racing.testing import DatasetTestCase, QueryCountTestCase
+
+PILOT_FORM = {
+    "username": "query.counter",
+    "first_name": "Query",
+    "last_name": "Counter",
+    "email": "query.counter@example.com",
+    "drone_license": "QC000001",
+    "skill_rating": 55,
+    "certification_date": "2024-05-01",
+}
+
+
+class PilotQueryTests(QueryCountTestCase):
+    def test_list(self):
+        self.assertQueries(5, reverse("pilots:pilot-list"))
+
+    def test_list_does_not_grow_with_page_size(self):
+        with mock.patch.object(PilotListView, "paginate_by", 25):
+            self.assertQueries(5, reverse("pilots:pilot-list"))
+
+    def test_list_does_not_grow_with_fan_out(self):
+        self.assign_many()
+        self.assertQueries(5, reverse("pilots:pilot-list"))
+
+    def test_list_rows_load_a_few_drones(self):
+        self.assign_many()
+        response = self.assertQueries(
+            5, reverse("pilots:pilot-list"),
+            data={"username": self.pilot.username},
+        )
+        pilot = next(pilot for pilot in response.context["pilot_list"]
+                     if pilot.pk == self.pilot.pk)
+        self.assertEqual(pilot.num_drones, self.pilot.drones.count())
+        self.assertEqual(len(pilot.row_drones), PilotListView.row_drones)
+
+    def test_search(self):
+        self.assertQueries(
+            5, reverse("pilots:pilot-list"), data={"username": "a"}
+        )
+
+    def test_detail(self):
+        url = reverse("pilots:pilot-detail", args=[self.pilot.pk])
+        self.assertQueries(5, url)
+
+    def test_detail_does_not_grow_with_fan_out(self):
+        url = reverse("pilots:pilot-detail", args=[self.pilot.pk])
+        self.assign_many()
+        self.assertQueries(5, url)
+
+    def test_detail_pages_and_sorts_drones(self):
+        url = reverse("pilots:pilot-detail", args=[self.pilot.pk])
+        self.assign_many()
+        with mock.patch.object(PilotDetailView, "drones_per_page", 5):
+            response = self.assertQueries(5, url, data={"sort": "-max_speed"})
+            speeds = [drone.max_speed for drone in response.context["drone_list"]]
+            self.assertEqual(speeds, sorted(speeds, reverse=True))
+            self.assertEqual(len(speeds), 5)
+
+            response = self.assertQueries(
+                5, url + response.context["next_page_url"]
+            )
+            self.assertLessEqual(
+                response.context["drone_list"][0].max_speed, speeds[-1]
+            )
+
+    def test_detail_unknown_sort_falls_back(self):
+        url = reverse("pilots:pilot-detail", args=[self.pilot.pk])
+        response = self.assertQueries(5, url, data={"sort": "password"})
+        self.assertEqual(response.context["drone_sort"], "model_name")
+
+    def test_detail_invalid_cursor(self):
+        url = reverse("pilots:pilot-detail", args=[self.pilot.pk])
+        self.assertQueries(4, url, data={"cursor": "x"}, status=404)
+
+    def test_detail_not_modified(self):
+        url = reverse("pilots:pilot-detail", args=[self.pilot.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertQueries(3, url, HTTP_IF_NONE_MATCH=etag, status=304)
+
+    def test_autocomplete(self):
+        url = reverse("pilots:pilot-autocomplete")
+        after = self.assertQueries(3, url).json()["after"]
+        self.assertQueries(3, url, data={"after": after})
+        self.assertQueries(3, url, data={"q": "a"})
+
+    def test_autocomplete_ignores_case(self):
+        alice = Pilot.objects.create_user(
+            username="Alice", drone_license="ALICE001",
+        )
+        alicia = Pilot.objects.create_user(
+            username="alicia", drone_license="ALICE002",
+        )
+        url = reverse("pilots:pilot-autocomplete")
+        for q in ("ali", "ALI", "Alic"):
+            with self.subTest(q=q):
+                ids = [result["id"]
+                       for result in self.client.get(url, {"q": q}).json()["results"]]
+                self.assertLess(ids.index(alice.pk), ids.index(alicia.pk))
+
+    def test_autocomplete_punctuation_and_non_ascii(self):
+        names = ["john_doe", "john.doe", "John-Smith", "johnxdoe", "johnny",
+                 "Ødegaard", "ÖZIL", "öberg"]
+        pilots = {
+            name: Pilot.objects.create_user(
+                username=name, drone_license=f"PUNCT{number:03}",
+            )
+            for number, name in enumerate(names)
+        }
+        url = reverse("pilots:pilot-autocomplete")
+
+        def search(q):
+            results = self.client.get(url, {"q": q}).json()["results"]
+            return {result["id"] for result in results}
+
+        expected = {
+            "john_": {"john_doe"},
+            "JOHN.": {"john.doe"},
+            "john-": {"John-Smith"},
+            "john%": set(),
+            "Øde": {"Ødegaard"},
+            "ÖZ": {"ÖZIL"},
+            "Öz": {"ÖZIL"},
+            "öb": {"öberg"},
+        }
+        for q, usernames in expected.items():
+            with self.subTest(q=q):
+                self.assertEqual(search(q),
+                                 {pilots[name].pk for name in usernames})
+
+    def test_autocomplete_pages_do_not_overlap(self):
+        url = reverse("pilots:pilot-autocomplete")
+        seen, after = [], None
+        while True:
+            data = self.client.get(url, {"after": after} if after else {}).json()
+            seen.extend(result["id"] for result in data["results"])
+            after = data["after"]
+            if after is None:
+                break
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), Pilot.objects.count())
+
+    def test_export(self):
+        self.assertQueries(3, reverse("pilots:pilot-export"))
+
+    def test_create(self):
+        url = reverse("pilots:pilot-create")
+        self.assertQueries(2, url)
+        self.assertQueries(
+            11,
+            url,
+            "post",
+            {
+                **PILOT_FORM,
+                "password1": "a-long-Passw0rd",
+                "password2": "a-long-Passw0rd",
+            },
+            status=302,
+        )
+
+    def test_update(self):
+        url = reverse("pilots:pilot-update", args=[self.pilot.pk])
+        self.assertQueries(3, url)
+        self.assertQueries(13, url, "post", PILOT_FORM, status=302)
+
+    def test_delete(self):
+        pilot = Pilot.objects.get(pk=2)
+        url = reverse("pilots:pilot-delete", args=[pilot.pk])
+        self.assertQueries(4, url)
+        self.assertQueries(16, url, "post", status=302)
+
+
+class LeaderboardContract:
+    """Behaviour shared by every leaderboard backend."""
+
+    def make_leaderboard(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        super().setUp()
+        self.leaderboard = self.make_leaderboard()
+        self.leaderboard.reload()
+
+    def test_matches_the_database(self):
+        ratings = dict(Pilot.objects.values_list("pk", "skill_rating"))
+        self.assertEqual(self.leaderboard.count(), len(ratings))
+        for pk, rating in ratings.items():
+            above = sum(other > rating for other in ratings.values())
+            below = sum(other < rating for other in ratings.values())
+            self.assertEqual(self.leaderboard.rank(pk), above + 1)
+            self.assertEqual(self.leaderboard.percentile(pk),
+                             round(100.0 * below / (len(ratings) - 1), 1))
+        best = max(ratings.values())
+        self.assertEqual([rating for _, rating in self.leaderboard.top(3)],
+                         sorted(ratings.values(), reverse=True)[:3])
+        self.assertEqual(self.leaderboard.top(1)[0][1], best)
+
+    def test_ties_share_a_rank(self):
+        self.leaderboard.rebuild([(1, 90), (2, 80), (3, 80), (4, 70)])
+        self.assertEqual(
+            [self.leaderboard.rank(pk) for pk in (1, 2, 3, 4)], [1, 2, 2, 4]
+        )
+        self.assertEqual(self.leaderboard.percentile(1), 100.0)
+        self.assertEqual(self.leaderboard.percentile(2), 33.3)
+        self.assertEqual(self.leaderboard.percentile(4), 0.0)
+        self.assertEqual(
+            [rating for _, rating in self.leaderboard.around(4, radius=1)],
+            [80, 70],
+        )
+
+    def test_updates_and_removals(self):
+        self.leaderboard.rebuild([(1, 90), (2, 80), (3, 70)])
+        self.leaderboard.update(3, 95)
+        self.assertEqual(self.leaderboard.top(3), [(3, 95), (1, 90), (2, 80)])
+        self.leaderboard.remove(1)
+        self.assertIsNone(self.leaderboard.rank(1))
+        self.assertIsNone(self.leaderboard.percentile(1))
+        self.assertEqual(self.leaderboard.around(1), [])
+        self.assertEqual(self.leaderboard.count(), 2)
+        self.assertEqual(self.leaderboard.rank(2), 2)
+
+    def test_reload_picks_up_unsignalled_writes(self):
+        Pilot.objects.filter(pk=self.pilot.pk).update(skill_rating=100)
+        Pilot.objects.exclude(pk=self.pilot.pk).filter(
+            skill_rating=100
+        ).update(skill_rating=99)
+        self.assertNotEqual(self.leaderboard.rank(self.pilot.pk), 1)
+        self.leaderboard.reload()
+        self.assertEqual(self.leaderboard.rank(self.pilot.pk), 1)
+        self.assertEqual(self.leaderboard.top(1), [(self.pilot.pk, 100)])
+
+
+class InProcessLeaderboardTests(LeaderboardContract, DatasetTestCase):
+    def make_leaderboard(self):
+        return InProcessLeaderboard()
+
+
+class RedisLeaderboardTests(LeaderboardContract, DatasetTestCase):
+    def make_leaderboard(self):
+        self.client_stub = LocalSortedSetClient()
+        return RedisLeaderboard(client=self.client_stub)
+
+    def test_shares_the_sorted_set_between_processes(self):
+        other = RedisLeaderboard(client=self.client_stub)
+        # The set is already seeded, so the second process does not read
+        # the database.
+        with self.assertNumQueries(0):
+            self.assertEqual(other.count(), self.leaderboard.count())
+        self.leaderboard.update(self.pilot.pk, 100)
+        self.assertEqual(other.rank(self.pilot.pk),
+                         self.leaderboard.rank(self.pilot.pk))
+
+
+class LeaderboardSignalTests(DatasetTestCase):
+    def test_rolled_back_rating_is_not_ranked(self):
+        leaderboard = get_leaderboard()
+        before = leaderboard.rank(self.pilot.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.pilot.skill_rating = 1
+                self.pilot.save()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(leaderboard.rank(self.pilot.pk), before)
+
+    def test_committed_rating_is_ranked(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pilot.skill_rating = 100
+            self.pilot.save()
+        self.assertEqual(get_leaderboard().rank(self.pilot.pk), 1)
+
+    def test_tie_changes_the_detail_etag(self):
+        pilot = Pilot.objects.filter(skill_rating__gt=1).first()
+        other = Pilot.objects.filter(skill_rating__lt=pilot.skill_rating).first()
+        url = reverse("pilots:pilot-detail", args=[pilot.pk])
+        etag = self.client.get(url)["ETag"]
+        rank = get_leaderboard().rank(pilot.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.skill_rating = pilot.skill_rating
+            other.save()
+        # Same rank and total, but one pilot fewer rated below.
+        self.assertEqual(get_leaderboard().rank(pilot.pk), rank)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
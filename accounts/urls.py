@@ -1,13 +1,22 @@
+from django.conf import settings
 from django.urls import path, include
 
 from .views import (
     PilotListView,
+    PilotExportView,
     PilotDetailView,
     PilotCreateView,
     PilotUpdateView,
     PilotDeleteView,
+    pilot_autocomplete,
 )
 
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        AsyncPilotListView as PilotListView,
+        AsyncPilotDetailView as PilotDetailView,
+    )
+
 app_name = "pilots"
 
 urlpatterns = [
@@ -22,6 +31,16 @@ urlpatterns = [
         PilotListView.as_view(),
         name="pilot-list",
     ),
+    path(
+        "pilots/export/",
+        PilotExportView.as_view(),
+        name="pilot-export",
+    ),
+    path(
+        "pilots/autocomplete/",
+        pilot_autocomplete,
+        name="pilot-autocomplete",
+    ),
     path(
         "pilots/<int:pk>/",
         PilotDetailView.as_view(),
@@ -1,15 +1,42 @@
+import sys
+
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
+from django.http import Http404, JsonResponse
 from django.urls import reverse_lazy
 from django.views import generic
 from django.contrib.auth.mixins import LoginRequiredMixin
 
-from accounts.models import Pilot
+from accounts.leaderboard import get_leaderboard
+from accounts.models import Pilot, byte_order, fold_username
+from racing.conditional import ConditionalDetailMixin
+from racing.counters import assigned_drone_count
+from racing.exports import ExportView
+from racing.models import Drone
+from racing.pagination import (CursorPaginator,
+                               InvalidCursor,
+                               KeysetPaginationMixin,
+                               cursor_page_context,)
+from racing.search import search_filter
 
 from .forms import PilotCreationForm, PilotUpdateForm, PilotUsernameSearchForm
 
+AUTOCOMPLETE_PAGE_SIZE = 20
+
 # Pilot Views
-class PilotListView(LoginRequiredMixin, generic.ListView):
+class PilotListView(LoginRequiredMixin,
+                    KeysetPaginationMixin,
+                    generic.ListView):
+    """
+    Each row shows the pilot's drone count and the first few drones by
+    name. The count is a subquery on the assignments and the drones are a
+    sliced prefetch, which Django runs as one window query per page, so a
+    pilot with a fleet of thousands loads no more rows than one with three.
+    """
+
     model = Pilot
     paginate_by = 5
+    row_drones = 3
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -19,15 +46,164 @@ class PilotListView(LoginRequiredMixin, generic.ListView):
 
     def get_queryset(self):
         form = PilotUsernameSearchForm(self.request.GET)
-        queryset = Pilot.objects.all().prefetch_related("drones")
+        queryset = Pilot.objects.annotate(
+            num_drones=assigned_drone_count()
+        ).prefetch_related(Prefetch(
+            "drones",
+            queryset=Drone.objects.only("model_name")
+            .order_by("model_name", "manufacturer_id")[:self.row_drones],
+            to_attr="row_drones",
+        ))
         if form.is_valid():
-            return queryset.filter(username__icontains=form.cleaned_data["username"])
+            return search_filter(queryset, form.cleaned_data["username"],
+                                 ranked=True)
         return queryset
 
 
-class PilotDetailView(LoginRequiredMixin, generic.DetailView):
+class PilotExportView(ExportView):
     model = Pilot
-    queryset = Pilot.objects.prefetch_related("drones__manufacturer")
+    search_form_class = PilotUsernameSearchForm
+    search_field = "username"
+    filename = "pilots"
+    columns = (
+        ("id", "pk"),
+        ("username", "username"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+        ("drone_license", "drone_license"),
+        ("skill_rating", "skill_rating"),
+        ("certification_date", "certification_date"),
+    )
+
+
+def pilot_autocomplete(request):
+    """
+    Pilots whose username starts with ``q``, ignoring case, a page at a
+    time.
+
+    The lowercased username is compared in code point order, so the
+    ``startswith`` match is also a range of the functional index; the range
+    is spelled out as well for SQLite, which cannot seek on ``LIKE`` over
+    an expression. ``after`` continues from the last username of the
+    previous page.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"detail": "Authentication required."}, status=401)
+
+    prefix = fold_username(request.GET.get("q", "").strip())
+    queryset = Pilot.objects.annotate(
+        username_key=byte_order(Lower("username"))
+    ).order_by("username_key", "username")
+    if prefix:
+        queryset = queryset.filter(username_key__startswith=prefix,
+                                   username_key__gte=prefix)
+        if ord(prefix[-1]) < sys.maxunicode:
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            queryset = queryset.filter(username_key__lt=upper)
+    after = request.GET.get("after")
+    if after:
+        after_key = fold_username(after)
+        queryset = queryset.filter(
+            Q(username_key__gt=after_key)
+            | Q(username_key=after_key, username__gt=after)
+        )
+
+    pilots = list(
+        queryset.only("username", "skill_rating")[:AUTOCOMPLETE_PAGE_SIZE + 1]
+    )
+    has_more = len(pilots) > AUTOCOMPLETE_PAGE_SIZE
+    pilots = pilots[:AUTOCOMPLETE_PAGE_SIZE]
+    return JsonResponse({
+        "results": [{"id": pilot.pk, "text": str(pilot)} for pilot in pilots],
+        "after": pilots[-1].username if has_more else None,
+    })
+
+
+class PilotDetailView(LoginRequiredMixin,
+                      ConditionalDetailMixin,
+                      generic.DetailView):
+    """
+    A pilot with one keyset-paginated page of their drones, sortable by
+    any of ``drone_sorts`` (prefixed with ``-`` for descending order).
+    """
+
+    model = Pilot
+    queryset = Pilot.objects.annotate(num_drones=assigned_drone_count())
+    drones_per_page = 12
+    cursor_param = "cursor"
+    sort_param = "sort"
+    drone_sorts = ("model_name", "max_speed", "weight")
+
+    def get_standing(self):
+        if not hasattr(self, "_standing"):
+            leaderboard = get_leaderboard()
+            pk = int(self.kwargs[self.pk_url_kwarg])
+            self._standing = {
+                "rank": leaderboard.rank(pk),
+                "percentile": leaderboard.percentile(pk),
+                "total": leaderboard.count(),
+            }
+        return self._standing
+
+    def get_version_extra(self):
+        # Other pilots' ratings move this pilot's rank and percentile, which
+        # also counts ties, and every sort and page of drones has a version
+        # of its own.
+        standing = self.get_standing()
+        return (
+            f"{standing['rank']}/{standing['total']}/{standing['percentile']}:"
+            f"{self.get_drone_sort()}:"
+            f"{self.request.GET.get(self.cursor_param, '')}"
+        )
+
+    def get_drone_sort(self):
+        sort = self.request.GET.get(self.sort_param, "")
+        if sort.lstrip("-") not in self.drone_sorts:
+            return self.drone_sorts[0]
+        return sort
+
+    def get_drone_sort_urls(self):
+        """Per sortable column, the first page sorted by it; again reverses."""
+        current = self.get_drone_sort()
+        urls = {}
+        for field in self.drone_sorts:
+            query = self.request.GET.copy()
+            query.pop(self.cursor_param, None)
+            query[self.sort_param] = "-" + field if current == field else field
+            urls[field] = "?" + query.urlencode()
+        return urls
+
+    def get_drone_paginator(self):
+        return CursorPaginator(
+            Drone.objects
+            .filter(pilots=self.kwargs[self.pk_url_kwarg])
+            .select_related("manufacturer"),
+            self.drones_per_page,
+            ordering=[self.get_drone_sort()],
+        )
+
+    def get_drone_page(self):
+        try:
+            return self.get_drone_paginator().page(
+                self.request.GET.get(self.cursor_param)
+            )
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = self.get_drone_page()
+        context.update(
+            cursor_page_context(self.request, page, self.cursor_param),
+            standing=self.get_standing(),
+            drone_sort=self.get_drone_sort(),
+            drone_sort_urls=self.get_drone_sort_urls(),
+            drone_list=page.object_list,
+            page_obj=page,
+            paginator=page.paginator,
+            is_paginated=page.has_other_pages(),
+        )
+        return context
 
 
 class PilotCreateView(LoginRequiredMixin, generic.CreateView):
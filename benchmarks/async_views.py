@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Compare the async read views on ASGI with the synchronous views on WSGI.
+
+The script runs load.py three times over the read-only pages (the
+dashboard, the lists and the detail pages):
+
+    wsgi         the synchronous views on the wsgiref server (prod settings)
+    asgi-sync    the synchronous views on the ASGI server (asgi settings,
+                 DJANGO_ASYNC_VIEWS=0), each run in a worker thread
+    asgi-async   the async views on the ASGI server (asgi settings)
+
+and prints requests per second and p95 latency per page for each run.
+Options not listed below, such as --drones or --concurrency, are passed
+on to load.py.
+
+    python benchmarks/async_views.py --drones 10k --concurrency 16
+    python benchmarks/async_views.py --asgi-server uvicorn --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+LOAD = Path(__file__).resolve().parent / "load.py"
+
+READ_ROUTES = [
+    "racing:index",
+    "racing:manufacturer-list",
+    "racing:manufacturer-detail",
+    "racing:racetrack-list",
+    "racing:racetrack-detail",
+    "racing:drone-list",
+    "racing:drone-detail",
+    "pilots:pilot-list",
+    "pilots:pilot-detail",
+]
+
+
+def run(label, server, async_views, extra):
+    env = dict(os.environ, DJANGO_ASYNC_VIEWS="1" if async_views else "0")
+    print(f"{label}:", file=sys.stderr)
+    output = subprocess.run(
+        [sys.executable, str(LOAD), "--server", server,
+         "--only", *READ_ROUTES, *extra],
+        env=env, stdout=subprocess.PIPE, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--asgi-server", choices=["asgi", "uvicorn"],
+                        default="asgi")
+    parser.add_argument("--output", "-o",
+                        help="Write the three load.py results here as JSON")
+    args, extra = parser.parse_known_args()
+
+    runs = {
+        "wsgi": run("wsgi", "wsgi", False, extra),
+        "asgi-sync": run("asgi-sync", args.asgi_server, False, extra),
+        "asgi-async": run("asgi-async", args.asgi_server, True, extra),
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(runs, indent=2) + "\n")
+
+    header = f"{'endpoint':<28}"
+    for label in runs:
+        header += f" {label + ' rps':>15} {'p95':>7}"
+    print(header)
+    for name in runs["wsgi"]["endpoints"]:
+        line = f"{name:<28}"
+        for result in runs.values():
+            endpoint = result["endpoints"][name]
+            p95 = endpoint["p95_ms"]
+            line += f" {endpoint['rps'] or 0:>15.1f} {p95 or 0:>7.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+Compare request throughput of the database profiles in config/settings.
+
+Every profile runs in a fresh interpreter, since the profile is read from
+the environment when the settings are imported. Worker processes stand in
+for gunicorn workers: each one repeatedly runs a mix of the queries a list
+page, a detail page and an edit issue, and the script reports operations
+per second and the number of "database is locked" errors.
+
+    python benchmarks/db_profiles.py --workers 8 --seconds 10
+    python benchmarks/db_profiles.py --profiles postgres postgres-pool
+
+The drones and manufacturers of the benchmark database are deleted before
+it is seeded. SQLite profiles use a temporary file; Postgres profiles use
+the scratch database named by --database-name, which must start with
+"test_" and differ from the DATABASE_NAME the app is configured with.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    "sqlite-default": {
+        "DATABASE_ENGINE": "sqlite",
+        "SQLITE_TUNING": "0",
+        "DATABASE_CONN_MAX_AGE": "0",
+        "DATABASE_TIMEOUT": "5",
+    },
+    "sqlite-tuned": {
+        "DATABASE_ENGINE": "sqlite",
+        "SQLITE_TUNING": "1",
+    },
+    "postgres": {
+        "DATABASE_ENGINE": "postgres",
+        "DATABASE_POOL_MAX_SIZE": "0",
+        "DATABASE_CONN_MAX_AGE": "0",
+    },
+    "postgres-pool": {
+        "DATABASE_ENGINE": "postgres",
+        "DATABASE_POOL_MAX_SIZE": "4",
+    },
+}
+
+SCRATCH_PREFIX = "test_"
+APP_DATABASE_NAME = os.environ.get("DATABASE_NAME", "drone_racing")
+
+MANUFACTURERS = 50
+DRONES = 5000
+WRITE_RATIO = 0.2
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.prod")
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    import django
+
+    django.setup()
+
+
+def check_scratch_name(name):
+    if not name.startswith(SCRATCH_PREFIX):
+        raise SystemExit(
+            f"Refusing to benchmark {name!r}: the database is wiped, so its "
+            f"name must start with {SCRATCH_PREFIX!r}."
+        )
+
+
+def check_scratch_database(name):
+    """Refuse ``name`` unless it is a scratch database the app does not use."""
+    check_scratch_name(name)
+    if name == APP_DATABASE_NAME:
+        raise SystemExit(
+            f"Refusing to benchmark {name!r}: it is the database the app "
+            "is configured with."
+        )
+
+
+def prepare():
+    from django.core.management import call_command
+    from django.db import connection
+    from racing.models import Drone, Manufacturer
+
+    if connection.vendor != "sqlite":
+        check_scratch_name(str(connection.settings_dict["NAME"]))
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    Drone.objects.all().delete()
+    Manufacturer.objects.all().delete()
+    manufacturers = Manufacturer.objects.bulk_create(
+        Manufacturer(name=f"Bench {index}", country="Benchland")
+        for index in range(MANUFACTURERS)
+    )
+    Drone.objects.bulk_create(
+        Drone(
+            model_name=f"Bench drone {index}",
+            max_speed=100 + index % 50,
+            weight=1 + index % 5,
+            manufacturer=manufacturers[index % MANUFACTURERS],
+        )
+        for index in range(DRONES)
+    )
+    return list(Drone.objects.values_list("pk", flat=True))
+
+
+def work(arguments):
+    drone_ids, seconds, seed = arguments
+    setup_django()
+    from django.db import OperationalError, close_old_connections, connection
+    from racing.models import Drone
+
+    rng = random.Random(seed)
+    operations = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        # One loop iteration is one "request": the request_started and
+        # request_finished signals call close_old_connections as well.
+        close_old_connections()
+        try:
+            if rng.random() < WRITE_RATIO:
+                Drone.objects.filter(pk=rng.choice(drone_ids)).update(
+                    max_speed=rng.uniform(50, 200)
+                )
+            else:
+                list(
+                    Drone.objects.select_related("manufacturer")
+                    .filter(pk__gte=rng.choice(drone_ids))[:5]
+                )
+                Drone.objects.filter(pk=rng.choice(drone_ids)).first()
+            operations += 1
+        except OperationalError:
+            errors += 1
+        close_old_connections()
+    connection.close()
+    return operations, errors
+
+
+def run_profile(workers, seconds):
+    setup_django()
+    from django.db import connection
+
+    drone_ids = prepare()
+    connection.close()
+    with Pool(workers) as pool:
+        results = pool.map(
+            work, [(drone_ids, seconds, seed) for seed in range(workers)]
+        )
+    operations = sum(result[0] for result in results)
+    errors = sum(result[1] for result in results)
+    print(json.dumps({
+        "operations": operations,
+        "errors": errors,
+        "per_second": operations / seconds,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", nargs="+",
+                        default=["sqlite-default", "sqlite-tuned"],
+                        choices=sorted(PROFILES))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--database-name", default="test_drone_racing_bench",
+                        help="Scratch Postgres database to wipe and seed "
+                             "(default: %(default)s)")
+    parser.add_argument("--run-profile", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        run_profile(args.workers, args.seconds)
+        return
+
+    if any(PROFILES[name]["DATABASE_ENGINE"] == "postgres"
+           for name in args.profiles):
+        check_scratch_database(args.database_name)
+
+    print(f"{'profile':<16} {'ops/s':>10} {'ops':>8} {'locked':>8}")
+    for name in args.profiles:
+        environment = {**os.environ, **PROFILES[name]}
+        with tempfile.TemporaryDirectory() as directory:
+            if PROFILES[name]["DATABASE_ENGINE"] == "sqlite":
+                environment["DATABASE_NAME"] = str(Path(directory) / "bench.sqlite3")
+            else:
+                environment["DATABASE_NAME"] = args.database_name
+            output = subprocess.run(
+                [sys.executable, __file__, "--run-profile",
+                 "--workers", str(args.workers),
+                 "--seconds", str(args.seconds)],
+                env=environment, check=True, capture_output=True, text=True,
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:<16} {result['per_second']:>10.0f} "
+              f"{result['operations']:>8} {result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
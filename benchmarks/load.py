@@ -0,0 +1,655 @@
+#!/usr/bin/env python
+"""
+Load test every route of racing/urls.py and accounts/urls.py over HTTP.
+
+The script seeds a database with generated data, starts a local server with
+the production settings and sends a fixed number of requests to each route
+from ``--concurrency`` threads. All requests use the session of a logged-in
+pilot. It reports requests per second and p50/p95/p99 latency for every
+route as JSON. Seeded SQLite databases are kept in benchmarks/.data and
+reused when the script runs again at the same scale. With
+DATABASE_ENGINE=postgres the script seeds and writes to the scratch
+database named by --database-name, which must start with "test_" and
+differ from the DATABASE_NAME the app is configured with.
+
+    python benchmarks/load.py --drones 10k --output before.json
+    python benchmarks/load.py --drones 10k --baseline before.json
+    python benchmarks/load.py --drones 1M --server uvicorn --skip "*-export"
+    python benchmarks/load.py --server-command \\
+        "gunicorn -w 4 -b 127.0.0.1:{port} config.wsgi"
+
+The ``wsgi`` and ``asgi`` servers are small reference servers built on the
+standard library. ``--server uvicorn`` needs uvicorn, and
+``--server-command`` needs whichever server it starts. The ASGI servers
+use the ``asgi`` settings profile, with the async views.
+"""
+import argparse
+import fnmatch
+import http.client
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from pathlib import Path
+from urllib.parse import urlencode
+
+from db_profiles import check_scratch_database, check_scratch_name
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+BENCH_USERNAME = "load-benchmark"
+CSRF_TOKEN = "loadbenchmarkcsrftoken0123456789"
+PERCENTILES = (50, 95, 99)
+
+# Routes of django.contrib.auth.urls that would end the session or need
+# a reset token; the login page stands in for them.
+SKIPPED_ROUTES = {
+    "logout",
+    "password_change",
+    "password_change_done",
+    "password_reset",
+    "password_reset_done",
+    "password_reset_confirm",
+    "password_reset_complete",
+}
+
+
+def parse_count(value):
+    """Read counts such as ``10000``, ``100k`` or ``1M``."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    suffix = value[-1:].lower()
+    if suffix in multipliers:
+        return int(float(value[:-1]) * multipliers[suffix])
+    return int(value)
+
+
+def configure_environment(args):
+    asgi = args.server != "wsgi" and not args.server_command
+    os.environ.setdefault(
+        "DJANGO_SETTINGS_MODULE",
+        "config.settings.asgi" if asgi else "config.settings.prod",
+    )
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    os.environ.setdefault("DJANGO_ALLOWED_HOSTS", "127.0.0.1,localhost")
+    os.environ.setdefault("DJANGO_SECURE_COOKIES", "0")
+    os.environ.setdefault("DJANGO_STATIC_ROOT", str(DATA_DIR / "static"))
+    if os.environ.get("DATABASE_ENGINE", "sqlite") == "sqlite":
+        os.environ.setdefault(
+            "DATABASE_NAME", str(DATA_DIR / f"load-{args.drones}.sqlite3")
+        )
+    elif not (args.serve_wsgi or args.serve_asgi):
+        # The servers started below inherit the scratch database name.
+        check_scratch_database(args.database_name)
+        os.environ["DATABASE_NAME"] = args.database_name
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+
+    django.setup()
+
+
+class Scale:
+    """Row counts derived from the number of drones."""
+
+    def __init__(self, drones):
+        self.drones = drones
+        self.pilots = max(drones // 10, 100)
+        self.manufacturers = max(drones // 500, 20)
+        self.racetracks = 100
+
+
+def seed(scale, reseed=False):
+    from django.core.management import call_command
+    from django.db import connection
+    from racing.models import Drone
+
+    import generate_fixtures
+    from racing.bulk_import import BulkImporter
+
+    if connection.vendor != "sqlite":
+        check_scratch_name(str(connection.settings_dict["NAME"]))
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    if Drone.objects.exists():
+        if not reseed:
+            return False
+        call_command("flush", interactive=False, verbosity=0)
+        call_command("rebuild_search_index", verbosity=0)
+
+    records = chain(
+        generate_fixtures.generate_manufacturers(scale.manufacturers, "load"),
+        generate_fixtures.generate_pilots(scale.pilots, "load"),
+        generate_fixtures.generate_drones(
+            scale.drones, scale.manufacturers, scale.pilots, "load"
+        ),
+        generate_fixtures.generate_racetracks(scale.racetracks, "load"),
+    )
+    importer = BulkImporter()
+    for record in records:
+        importer.add(record)
+    importer.finish()
+    return True
+
+
+def log_in():
+    """
+    Create the benchmark pilot and return its session cookie. The pilot
+    may add races, so that the ingest API accepts its session.
+    """
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Permission
+    from django.test import Client
+
+    user, _ = get_user_model().objects.get_or_create(
+        username=BENCH_USERNAME,
+        defaults={"drone_license": "LOADTEST", "skill_rating": 50},
+    )
+    user.user_permissions.add(
+        Permission.objects.get(content_type__app_label="racing",
+                               codename="add_race")
+    )
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return (
+        f"{settings.SESSION_COOKIE_NAME}={session}; "
+        f"{settings.CSRF_COOKIE_NAME}={CSRF_TOKEN}"
+    ), user.pk
+
+
+class Endpoint:
+    def __init__(self, name, pattern, build=None, method="GET"):
+        self.name = name
+        self.pattern = pattern
+        self.method = method
+        self.build = build or (lambda rng: ({}, None, None))
+
+    def request(self, rng):
+        """Return the method, path, body and content type of one request."""
+        from django.urls import reverse
+
+        kwargs, query, body = self.build(rng)
+        path = reverse(self.name, kwargs=kwargs)
+        if query:
+            path += "?" + urlencode(query, doseq=True)
+        if body is None:
+            return self.method, path, None, None
+        if isinstance(body, dict):
+            return (self.method, path, urlencode(body, doseq=True),
+                    "application/x-www-form-urlencoded")
+        return self.method, path, body, "application/json"
+
+
+def build_endpoints(scale):
+    """
+    One endpoint per named route. A route without a recipe here fails the
+    run, so that a new view is not silently left out of the benchmark.
+    """
+    from django.urls import get_resolver
+
+    def pk(count):
+        return lambda rng: ({"pk": rng.randint(1, count)}, None, None)
+
+    def toggle(rng):
+        return {"pk": rng.randint(1, scale.drones)}, None, None
+
+    def batch_assign(rng):
+        drones = rng.sample(range(1, scale.drones + 1), 10)
+        action = rng.choice(["assign", "unassign"])
+        return {}, None, {"drones": drones, "action": action}
+
+    def autocomplete(rng):
+        return {}, {"q": rng.choice("abcdefghijklmnopqrstuvwxyz")}, None
+
+    def ingest(rng):
+        started_at = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(
+            seconds=rng.randrange(10 ** 9)
+        )
+        pilots = rng.sample(range(1, scale.pilots + 1), 6)
+        return {}, None, json.dumps({
+            "track": rng.randint(1, scale.racetracks),
+            "started_at": started_at.isoformat(),
+            "results": [
+                {
+                    "pilot": pilot,
+                    "drone": rng.randint(1, scale.drones),
+                    "laps": [round(rng.uniform(30, 90), 3) for _ in range(5)],
+                }
+                for pilot in pilots
+            ],
+        })
+
+    recipes = {
+        "index": None,
+        "login": None,
+        "manufacturer-list": None,
+        "manufacturer-export": None,
+        "manufacturer-analytics": None,
+        "manufacturer-detail": pk(scale.manufacturers),
+        "manufacturer-create": None,
+        "manufacturer-update": pk(scale.manufacturers),
+        "manufacturer-delete": pk(scale.manufacturers),
+        "racetrack-list": None,
+        "racetrack-export": None,
+        "racetrack-detail": pk(scale.racetracks),
+        "racetrack-create": None,
+        "racetrack-update": pk(scale.racetracks),
+        "racetrack-delete": pk(scale.racetracks),
+        "drone-list": None,
+        "drone-export": None,
+        "drone-detail": pk(scale.drones),
+        "drone-create": None,
+        "drone-update": pk(scale.drones),
+        "drone-delete": pk(scale.drones),
+        "toggle-drone-assign": toggle,
+        "batch-drone-assign": ("POST", batch_assign),
+        "api-manufacturer-list": None,
+        "api-manufacturer-detail": pk(scale.manufacturers),
+        "api-drone-list": None,
+        "api-drone-detail": pk(scale.drones),
+        "api-racetrack-list": None,
+        "api-racetrack-detail": pk(scale.racetracks),
+        "api-pilot-list": None,
+        "api-pilot-detail": pk(scale.pilots),
+        "api-race-ingest": ("POST", ingest),
+        "pilot-list": None,
+        "pilot-export": None,
+        "pilot-autocomplete": autocomplete,
+        "pilot-detail": pk(scale.pilots),
+        "pilot-create": None,
+        "pilot-update": pk(scale.pilots),
+        "pilot-delete": pk(scale.pilots),
+    }
+
+    endpoints = []
+    missing = []
+    for namespace in ("racing", "pilots"):
+        _, resolver = get_resolver().namespace_dict[namespace]
+        for pattern in resolver.url_patterns:
+            for route in getattr(pattern, "url_patterns", [pattern]):
+                if route.name in SKIPPED_ROUTES:
+                    continue
+                if route.name not in recipes:
+                    missing.append(f"{namespace}:{route.name}")
+                    continue
+                recipe = recipes[route.name]
+                method = "GET"
+                if isinstance(recipe, tuple):
+                    method, recipe = recipe
+                endpoints.append(Endpoint(
+                    f"{namespace}:{route.name}", str(route.pattern), recipe,
+                    method,
+                ))
+    if missing:
+        raise SystemExit(
+            f"No benchmark recipe for {', '.join(missing)}; "
+            f"add one to build_endpoints()."
+        )
+    return endpoints
+
+
+def serve_wsgi(port):
+    """A threaded wsgiref server, so the run needs no extra packages."""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    from config.wsgi import application
+
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    make_server("127.0.0.1", port, application, Server, Handler).serve_forever()
+
+
+def serve_asgi(port):
+    """
+    An HTTP/1.0-style server for the ASGI application on asyncio streams:
+    one request per connection and the body buffered, like ``serve_wsgi``.
+    """
+    import asyncio
+    from urllib.parse import unquote
+
+    from config.asgi import application
+
+    async def handle(reader, writer):
+        try:
+            method, target, version = (
+                (await reader.readline()).decode("latin-1").split()
+            )
+            headers = []
+            while (line := await reader.readline()).strip():
+                name, _, value = line.decode("latin-1").partition(":")
+                headers.append((name.strip().lower().encode("latin-1"),
+                                value.strip().encode("latin-1")))
+            length = int(dict(headers).get(b"content-length", 0))
+            body = await reader.readexactly(length)
+        except (ValueError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": version.partition("/")[2],
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": writer.get_extra_info("peername")[:2],
+            "server": ("127.0.0.1", port),
+        }
+        sent = asyncio.Event()
+
+        async def receive():
+            nonlocal body
+            if body is None:
+                # Django listens for a disconnect while the view runs.
+                await sent.wait()
+                return {"type": "http.disconnect"}
+            message = {"type": "http.request", "body": body,
+                       "more_body": False}
+            body = None
+            return message
+
+        status, response_headers, chunks = 500, [], []
+
+        async def send(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await application(scope, receive, send)
+        sent.set()
+        content = b"".join(chunks)
+        head = [f"HTTP/1.1 {status} -".encode()]
+        head.extend(
+            name + b": " + value for name, value in response_headers
+            if name.lower() not in (b"content-length", b"connection")
+        )
+        head.append(b"Content-Length: %d" % len(content))
+        head.append(b"Connection: close")
+        writer.write(b"\r\n".join(head) + b"\r\n\r\n" + content)
+        await writer.drain()
+        writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", port,
+                                            backlog=128)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def start_server(args, port):
+    if args.server_command:
+        command = shlex.split(args.server_command.format(port=port))
+    elif args.server == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "config.asgi:application",
+                   "--port", str(port), "--log-level", "warning",
+                   "--workers", str(args.workers)]
+    else:
+        command = [sys.executable, __file__, f"--serve-{args.server}",
+                   str(port)]
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=os.environ.copy())
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with status {process.returncode}.")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("Server did not start within 60 seconds.")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[index]
+
+
+def drive(endpoint, host, port, cookie, requests, concurrency, seed):
+    """Send ``requests`` requests to one endpoint from parallel threads."""
+    latencies = []
+    errors = []
+    statuses = {}
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker(number):
+        rng = random.Random(f"{seed}:{endpoint.name}:{number}")
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            method, path, body, content_type = endpoint.request(rng)
+            headers = {"Cookie": cookie, "Host": host}
+            if method != "GET":
+                headers["X-CSRFToken"] = CSRF_TOKEN
+                headers["Content-Type"] = content_type
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                if response.getheader("Connection", "").lower() == "close":
+                    connection.close()
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                with lock:
+                    errors.append(f"{type(error).__name__}: {error}")
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status < 400:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(f"HTTP {status} from {method} {path}")
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(number,))
+        for number in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "method": endpoint.method,
+        "route": endpoint.pattern,
+        "requests": requests,
+        "errors": len(errors),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+    for percent in PERCENTILES:
+        value = percentile(latencies, percent)
+        result[f"p{percent}_ms"] = None if value is None else round(value * 1000, 2)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Print the p95 change per endpoint and return the regressed ones."""
+    regressed = []
+    print(f"{'endpoint':<36} {'p95 before':>11} {'p95 now':>9} {'change':>8}",
+          file=sys.stderr)
+    for name, result in results["endpoints"].items():
+        before = baseline["endpoints"].get(name, {}).get("p95_ms")
+        now = result["p95_ms"]
+        if not before or now is None:
+            continue
+        change = now / before - 1
+        print(f"{name:<36} {before:>11.1f} {now:>9.1f} {change:>+8.0%}",
+              file=sys.stderr)
+        if change > max_regression:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--drones", type=parse_count, default=10_000,
+                        help="Scale of the dataset: 10k, 100k or 1M drones")
+    parser.add_argument("--reseed", action="store_true",
+                        help="Regenerate the data even if the database has some")
+    parser.add_argument("--database-name", default="test_drone_racing_load",
+                        help="Scratch Postgres database to seed and write to "
+                             "(default: %(default)s)")
+    parser.add_argument("--server", choices=["wsgi", "asgi", "uvicorn"],
+                        default="wsgi")
+    parser.add_argument("--server-command",
+                        help="Start this server instead; {port} is replaced")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Server worker processes (uvicorn only)")
+    parser.add_argument("--url", help="Benchmark a server that is already "
+                                      "running on this database instead")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="Unmeasured requests per endpoint")
+    parser.add_argument("--only", nargs="+", default=["*"],
+                        help="Endpoint name patterns to run, e.g. 'racing:drone-*'")
+    parser.add_argument("--skip", nargs="+", default=[],
+                        help="Endpoint name patterns to leave out")
+    parser.add_argument("--seed", default="load")
+    parser.add_argument("--output", "-o", help="Write the JSON here, not stdout")
+    parser.add_argument("--baseline", help="Earlier JSON output to compare to")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Fail when a p95 grows by more than this fraction")
+    parser.add_argument("--serve-wsgi", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--serve-asgi", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    configure_environment(args)
+    DATA_DIR.mkdir(exist_ok=True)
+    setup_django()
+
+    if args.serve_wsgi:
+        serve_wsgi(args.serve_wsgi)
+        return
+    if args.serve_asgi:
+        serve_asgi(args.serve_asgi)
+        return
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    scale = Scale(args.drones)
+    print(f"Preparing {scale.drones} drones, {scale.pilots} pilots...",
+          file=sys.stderr)
+    seed(scale, args.reseed)
+    call_command("collectstatic", interactive=False, verbosity=0)
+    cookie, _ = log_in()
+    endpoints = [
+        endpoint for endpoint in build_endpoints(scale)
+        if any(fnmatch.fnmatch(endpoint.name, pattern) for pattern in args.only)
+        and not any(fnmatch.fnmatch(endpoint.name, pattern) for pattern in args.skip)
+    ]
+    connection.close()
+
+    process = None
+    if args.url:
+        host, _, port = args.url.split("://")[-1].rstrip("/").partition(":")
+        port = int(port or 80)
+    else:
+        host, port = "127.0.0.1", free_port()
+        process = start_server(args, port)
+
+    results = {
+        "revision": git_revision(),
+        "server": args.server_command or args.url or args.server,
+        "settings": os.environ["DJANGO_SETTINGS_MODULE"],
+        "async_views": settings.ASYNC_VIEWS,
+        "database": connection.vendor,
+        "drones": scale.drones,
+        "pilots": scale.pilots,
+        "concurrency": args.concurrency,
+        "endpoints": {},
+    }
+    try:
+        for endpoint in endpoints:
+            print(f"  {endpoint.name}", file=sys.stderr)
+            if args.warmup:
+                drive(endpoint, host, port, cookie, args.warmup,
+                      min(args.concurrency, args.warmup), f"{args.seed}:warmup")
+            results["endpoints"][endpoint.name] = drive(
+                endpoint, host, port, cookie, args.requests, args.concurrency,
+                args.seed,
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressed = compare(results, baseline, args.max_regression)
+        if regressed:
+            print(f"p95 regressed by more than {args.max_regression:.0%}: "
+                  f"{', '.join(regressed)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Per-view query and latency metrics.
+
+``QueryInstrumentationMiddleware`` counts the SQL queries of every request
+through ``connection.execute_wrapper`` and times the database, template
+rendering and the whole request. Template rendering is timed by the
+``InstrumentedDjangoTemplates`` backend, so ``render()`` in a function view
+counts as well as a ``TemplateResponse``. The numbers are kept as
+histograms per URL name and served in the Prometheus text format by
+``metrics_view``, to a bearer of ``settings.METRICS_TOKEN`` or, when no
+token is set, to staff users. They are per process; with several workers,
+scrape every worker or put them behind a single-process server.
+
+Query budgets come from settings::
+
+    QUERY_BUDGETS = {"racing:drone-list": 8, "pilots:pilot-detail": 6}
+    QUERY_BUDGET_DEFAULT = None     # budget for views not listed
+    QUERY_BUDGET_ACTION = "log"     # or "raise"
+"""
+
+import hmac
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import (iscoroutinefunction,
+                          markcoroutinefunction,
+                          sync_to_async,)
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self.lock:
+            counts, total = self.series.get(label, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-1] += 1
+            self.series[label] = (counts, total + value)
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = sorted(self.series.items())
+        for label, (counts, total) in series:
+            view = label.replace("\\", "\\\\").replace('"', '\\"')
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                lines.append(
+                    f'{self.name}_bucket{{view="{view}",le="{bound}"}} {count}'
+                )
+            lines.append(f'{self.name}_sum{{view="{view}"}} {total}')
+            lines.append(f'{self.name}_count{{view="{view}"}} {counts[-1]}')
+        return "\n".join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    "django_view_request_seconds",
+    "Total time spent handling the request.",
+    LATENCY_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "django_view_db_seconds",
+    "Time spent executing SQL queries.",
+    LATENCY_BUCKETS,
+)
+TEMPLATE_SECONDS = Histogram(
+    "django_view_template_seconds",
+    "Time spent rendering templates.",
+    LATENCY_BUCKETS,
+)
+QUERIES = Histogram(
+    "django_view_queries",
+    "Number of SQL queries executed.",
+    QUERY_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, DB_SECONDS, TEMPLATE_SECONDS, QUERIES)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or match._func_path
+
+
+def check_budget(name, queries):
+    budget = getattr(settings, "QUERY_BUDGETS", {}).get(
+        name, getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+    )
+    if budget is None or queries <= budget:
+        return
+    message = f"{name} ran {queries} queries, over its budget of {budget}."
+    if getattr(settings, "QUERY_BUDGET_ACTION", "log") == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _wrap_connections(stack, stats):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        request._instrumentation = stats
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            _wrap_connections(stack, stats)
+            response = self.get_response(request)
+        self.record(request, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        request._instrumentation = stats
+        start = time.perf_counter()
+        # Connections belong to threads, and the queries of an async
+        # request run in the single thread that Django gives the request
+        # for sync_to_async(), so the wrapper is installed there.
+        stack = ExitStack()
+        await sync_to_async(_wrap_connections)(stack, stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, stats, time.perf_counter() - start)
+        return response
+
+    def record(self, request, stats, elapsed):
+        name = view_name(request)
+        REQUEST_SECONDS.observe(name, elapsed)
+        DB_SECONDS.observe(name, stats.db_seconds)
+        TEMPLATE_SECONDS.observe(name, stats.template_seconds)
+        QUERIES.observe(name, stats.queries)
+        check_budget(name, stats.queries)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = getattr(request, "_instrumentation", None)
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_seconds += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    ``DjangoTemplates`` adding the time spent rendering to the request's
+    ``template_seconds``. Included and extended templates are rendered
+    inside the outer template and are not counted twice.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        allowed = hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(),
+            f"Bearer {token}".encode(),
+        )
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    body = "\n".join(histogram.expose() for histogram in HISTOGRAMS) + "\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4")
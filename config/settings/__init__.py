@@ -0,0 +1,6 @@
+"""
+Settings profiles: ``config.settings.dev`` for local development (the
+default of ``manage.py``), ``config.settings.prod`` for deployments (the
+default of the WSGI entry point) and ``config.settings.asgi``, the
+production profile with async views (the default of the ASGI entry point).
+"""
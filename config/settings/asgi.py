@@ -0,0 +1,16 @@
+"""
+ASGI settings: the production profile with the async read views, for
+``uvicorn config.asgi:application`` and other ASGI servers.
+"""
+
+import os
+
+from .prod import *  # noqa: F401,F403
+from .prod import DATABASES
+
+ASYNC_VIEWS = os.environ.get("DJANGO_ASYNC_VIEWS", "1") == "1"
+
+# Async views run their queries in a thread created for each request, so
+# persistent connections would be left behind one per request. Postgres
+# reuses connections through its pool instead (DATABASE_POOL_MAX_SIZE).
+DATABASES["default"]["CONN_MAX_AGE"] = 0
@@ -0,0 +1,239 @@
+"""
+Django settings for config project, shared by the ``dev`` and ``prod``
+profiles.
+
+Generated by 'django-admin startproject' using Django 5.2.5.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = "django-insecure-5+7o_r(9dtz)21uo)@)q&$gr3-2q(dh2phzewhe3+%h!z@d7_g"
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "crispy_forms",
+    "crispy_bootstrap5",
+    "accounts",
+    "racing",
+]
+
+AUTH_USER_MODEL = 'accounts.Pilot'
+
+LOGIN_URL = '/pilots/login/'
+LOGIN_REDIRECT_URL = '/'
+LOGOUT_REDIRECT_URL = '/'
+
+CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
+CRISPY_TEMPLATE_PACK = "bootstrap5"
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "config.instrumentation.QueryInstrumentationMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "config.urls"
+
+# Route the list, detail and dashboard pages to the async views of
+# racing.async_views and accounts.async_views. Only worth it under ASGI:
+# a WSGI server runs every async view through async_to_sync.
+ASYNC_VIEWS = os.environ.get("DJANGO_ASYNC_VIEWS", "0") == "1"
+
+# Per-view SQL query budgets, keyed by URL name (see config.instrumentation).
+QUERY_BUDGETS = {}
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_ACTION = "log"
+
+# Bearer token required by /metrics; without one, only staff may read it.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Pilot ranks (accounts.leaderboard). The in-process backend only sees the
+# rating changes of its own process, so it is meant for development and
+# single-process deployments; prod.py shares a Redis sorted set instead.
+PILOT_LEADERBOARD = {
+    "BACKEND": "accounts.leaderboard.InProcessLeaderboard",
+}
+
+# Bearer token of the timing systems that post races to /api/races/.
+RACE_INGEST_TOKEN = os.environ.get("RACE_INGEST_TOKEN")
+
+TEMPLATES = [
+    {
+        # DjangoTemplates, timing each render for the request metrics.
+        "BACKEND": "config.instrumentation.InstrumentedDjangoTemplates",
+        "DIRS": [BASE_DIR / "templates"],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "racing.context_processors.fragment_cache",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "config.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+
+# DATABASE_ENGINE selects the profile: "sqlite" (default) or "postgres".
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite")
+
+if DATABASE_ENGINE == "postgres":
+    # Connections come from a psycopg pool (psycopg[pool]) shared by the
+    # threads of a worker; set DATABASE_POOL_MAX_SIZE=0 to fall back to
+    # persistent per-thread connections instead.
+    pool_max_size = int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10"))
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DATABASE_NAME", "drone_racing"),
+            "USER": os.environ.get("DATABASE_USER", ""),
+            "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+            "HOST": os.environ.get("DATABASE_HOST", ""),
+            "PORT": os.environ.get("DATABASE_PORT", ""),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    if pool_max_size:
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")),
+            "max_size": pool_max_size,
+            "timeout": int(os.environ.get("DATABASE_POOL_TIMEOUT", "10")),
+        }
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = int(
+            os.environ.get("DATABASE_CONN_MAX_AGE", "60")
+        )
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DATABASE_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", "60")),
+            "OPTIONS": {
+                # Seconds a writer waits for the lock before "database is
+                # locked" is raised.
+                "timeout": int(os.environ.get("DATABASE_TIMEOUT", "20")),
+            },
+        }
+    }
+    if os.environ.get("SQLITE_TUNING", "1") == "1":
+        DATABASES["default"]["OPTIONS"].update({
+            # WAL lets readers run alongside the single writer, and
+            # synchronous=NORMAL is durable in WAL mode except on power
+            # loss. BEGIN IMMEDIATE takes the write lock up front instead of
+            # failing when a read transaction tries to upgrade.
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-20000;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+        })
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Template fragments get their own cache, so that list rows being culled
+# never evict the dashboard statistics. Fragment keys contain the
+# updated_at of the rendered object, so changed objects get new keys and
+# the old ones expire.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get("FRAGMENT_CACHE_TIMEOUT", "3600"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "template-fragments",
+        "TIMEOUT": FRAGMENT_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = "static/"
+STATICFILES_DIRS = [
+    BASE_DIR / "static",
+]
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
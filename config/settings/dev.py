@@ -0,0 +1,30 @@
+"""
+Development settings: debug mode and the Django Debug Toolbar.
+"""
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1", "[::1]"]
+
+# Django Debug Toolbar
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
+
+INSTALLED_APPS = [
+    *INSTALLED_APPS[:INSTALLED_APPS.index("django.contrib.staticfiles") + 1],
+    "debug_toolbar",
+    *INSTALLED_APPS[INSTALLED_APPS.index("django.contrib.staticfiles") + 1:],
+]
+
+MIDDLEWARE = [
+    MIDDLEWARE[0],
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    *MIDDLEWARE[1:],
+]
+
+# Fail loudly on N+1 regressions while developing.
+QUERY_BUDGET_ACTION = "raise"
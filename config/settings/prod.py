@@ -0,0 +1,86 @@
+"""
+Production settings: no debug tooling, cached templates, hashed static
+files, compressed and conditional responses and cached sessions.
+"""
+
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, CACHES, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+SESSION_COOKIE_SECURE = os.environ.get("DJANGO_SECURE_COOKIES", "1") == "1"
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
+
+# GZip sits before everything that reads the response body and
+# ConditionalGet right after it, so ETags are computed on the
+# uncompressed content.
+MIDDLEWARE = [
+    MIDDLEWARE[0],
+    "django.middleware.gzip.GZipMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    *MIDDLEWARE[1:],
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
+        },
+    },
+]
+
+STATIC_ROOT = os.environ.get("DJANGO_STATIC_ROOT", BASE_DIR / "staticfiles")
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage",
+    },
+}
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+# Every worker reads and updates the same dashboard statistics and
+# sessions, so the default cache is shared (redis-py). The template
+# fragments stay per process: their keys carry the version of what they
+# show, so a worker can miss an entry but never serve a stale one.
+CACHES = {
+    **CACHES,
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    },
+}
+
+# Every worker ranks pilots from the same sorted set; per-process ranks
+# would drift apart and make the pilot pages' ETags flap between workers.
+PILOT_LEADERBOARD = {
+    "BACKEND": "accounts.leaderboard.RedisLeaderboard",
+    "OPTIONS": {"url": REDIS_URL},
+}
+
+# Sessions are read from the cache and written through to the database,
+# and survive browser restarts.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_EXPIRE_AT_BROWSER_CLOSE = False
+SESSION_COOKIE_AGE = 60 * 60 * 24 * 14
@@ -3,197 +3,303 @@
 Script to generate random data fixtures for the drone racing service.
 Run this script to create a fixtures.json file that can be loaded with:
 python manage.py loaddata fixtures.json
+or, much faster for large files:
+python manage.py import_fixtures fixtures.json
+
+Records are streamed to the output one by one, so the dataset size is not
+bounded by memory. Load-test volumes are best written as JSON Lines or
+inserted straight into the database:
+
+python generate_fixtures.py --pilots 1000000 --drones 1000000 \\
+    --format jsonl --output fixtures.jsonl --seed 42
+python generate_fixtures.py --pilots 100000 --drones 100000 --database
 """
 
+import argparse
+import itertools
 import json
+import os
 import random
 import string
-from datetime import date, timedelta, datetime, timezone
+import sys
+from datetime import timedelta, datetime, timezone
+from multiprocessing import Pool
+
 from faker import Faker
 
-fake = Faker()
+LICENSE_ALPHABET = string.ascii_uppercase + string.digits
+LICENSE_LENGTH = 8
+LICENSE_SPACE = len(LICENSE_ALPHABET) ** LICENSE_LENGTH
+# Coprime with 36 ** 8, so ``index * LICENSE_STRIDE`` visits every license
+# exactly once before repeating.
+LICENSE_STRIDE = 1_572_869_953
+
+PILOT_CHUNK_SIZE = 10_000
+
+COUNTRIES = ['USA', 'Germany', 'Japan', 'China', 'France', 'Italy', 'UK', 'Canada', 'Australia', 'South Korea']
+COMPANY_NAMES = [
+    'AeroTech', 'SkyDrone', 'RacingWings', 'VelocityDrones', 'TurboFly',
+    'SpeedCraft', 'AirRacer', 'DroneMax', 'FlightForce', 'RapidRotor',
+    'PropellerPro', 'AeroSpeed', 'SkyRocket', 'DroneElite', 'AirVelocity'
+]
+COMPANY_SUFFIXES = ['Industries', 'Corp', 'Ltd', 'Systems', 'Tech']
+DRONE_MODELS = [
+    'Phantom', 'Mavic', 'Inspire', 'Spark', 'Mini', 'Air', 'Pro', 'Elite',
+    'Racer', 'Speed', 'Velocity', 'Thunder', 'Lightning', 'Storm', 'Blitz',
+    'Falcon', 'Eagle', 'Hawk', 'Swift', 'Arrow', 'Bullet', 'Rocket'
+]
+DRONE_VARIANTS = ['X', 'Pro', 'Elite', 'Racing', 'Speed']
+TRACK_PREFIXES = [
+    'Thunder Valley', 'Sky Harbor', 'Velocity', 'Aerial', 'Cloud Nine',
+    'Lightning', 'Storm Ridge', 'Wind Tunnel', 'Turbulence', 'Stratosphere',
+    'Jetstream', 'Altitude', 'Supersonic', 'Mach One', 'Hypersonic',
+    'Tornado Alley', 'Hurricane', 'Cyclone', 'Blizzard', 'Meteor'
+]
+TRACK_SUFFIXES = ['Circuit', 'Track', 'Speedway', 'Arena', 'Loop', 'Raceway', 'Highway', 'Boulevard']
+LOCATIONS = [
+    'Las Vegas, Nevada', 'Miami, Florida', 'Austin, Texas', 'Los Angeles, California',
+    'New York, New York', 'Chicago, Illinois', 'Phoenix, Arizona', 'Denver, Colorado',
+    'Seattle, Washington', 'Atlanta, Georgia', 'Boston, Massachusetts', 'Portland, Oregon',
+    'San Francisco, California', 'Dallas, Texas', 'Detroit, Michigan'
+]
+
+
+def generate_drone_license(index, offset=0):
+    """Map a pilot index to its own 8-character drone license (uppercase letters and numbers)"""
+    value = (index * LICENSE_STRIDE + offset) % LICENSE_SPACE
+    chars = []
+    for _ in range(LICENSE_LENGTH):
+        value, digit = divmod(value, len(LICENSE_ALPHABET))
+        chars.append(LICENSE_ALPHABET[digit])
+    return ''.join(reversed(chars))
 
-def generate_drone_license():
-    """Generate a random 8-character drone license (uppercase letters and numbers)"""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
-def generate_manufacturers(count=10):
+def unique_name(combinations, index):
+    """Name number ``index`` out of ``combinations``, numbered once they run out"""
+    generation, position = divmod(index, len(combinations))
+    name = combinations[position]
+    return name if generation == 0 else f"{name} {generation + 1}"
+
+
+def shuffled_combinations(rng, *parts):
+    combinations = [' '.join(words) for words in itertools.product(*parts)]
+    rng.shuffle(combinations)
+    return combinations
+
+
+def generate_manufacturers(count=10, seed=None):
     """Generate manufacturer data"""
-    manufacturers = []
-    countries = ['USA', 'Germany', 'Japan', 'China', 'France', 'Italy', 'UK', 'Canada', 'Australia', 'South Korea']
-    company_names = [
-        'AeroTech', 'SkyDrone', 'RacingWings', 'VelocityDrones', 'TurboFly',
-        'SpeedCraft', 'AirRacer', 'DroneMax', 'FlightForce', 'RapidRotor',
-        'PropellerPro', 'AeroSpeed', 'SkyRocket', 'DroneElite', 'AirVelocity'
-    ]
-    used_names = set()
-    
+    rng = random.Random(seed)
+    names = shuffled_combinations(rng, COMPANY_NAMES, COMPANY_SUFFIXES)
+
     for i in range(count):
-        while True:
-            name = random.choice(company_names) + f" {random.choice(['Industries', 'Corp', 'Ltd', 'Systems', 'Tech'])}"
-            if name not in used_names:
-                used_names.add(name)
-                break
-        
-        manufacturers.append({
+        yield {
             "model": "racing.manufacturer",
             "pk": i + 1,
             "fields": {
-                "name": name,
-                "country": random.choice(countries)
+                "name": unique_name(names, i),
+                "country": rng.choice(COUNTRIES)
             }
-        })
-    
-    return manufacturers
+        }
+
+
+def _generate_pilot_chunk(args):
+    """Generate pilots ``start`` to ``stop``; runs in a worker process"""
+    start, stop, seed, username_width = args
+    chunk_seed = None if seed is None else f"{seed}:pilots:{start}"
+    rng = random.Random(chunk_seed)
+    fake = Faker()
+    fake.seed_instance(chunk_seed)
+    license_offset = random.Random(f"{seed}:licenses").randrange(LICENSE_SPACE) if seed is not None else 0
+    # Seeded runs pin "now" so that the output does not depend on the day
+    now = datetime.now(timezone.utc) if seed is None else datetime(2025, 1, 1, tzinfo=timezone.utc)
+    today = now.date()
 
-def generate_pilots(count=20):
-    """Generate pilot data"""
     pilots = []
-    used_licenses = set()
-    used_usernames = set()
-    
-    for i in range(count):
-        # Generate unique drone license
-        while True:
-            license_num = generate_drone_license()
-            if license_num not in used_licenses:
-                used_licenses.add(license_num)
-                break
-        
-        # Generate unique username
-        while True:
-            username = fake.user_name()
-            if username not in used_usernames:
-                used_usernames.add(username)
-                break
-        
+    for i in range(start, stop):
         # Random certification date (within last 5 years or None)
         cert_date = None
-        if random.choice([True, False]):  # 50% chance of having certification
-            cert_date = fake.date_between(start_date=date.today() - timedelta(days=1825), end_date=date.today()).isoformat()
-        
+        if rng.choice([True, False]):  # 50% chance of having certification
+            cert_date = (today - timedelta(days=rng.randint(0, 1825))).isoformat()
+
         pilots.append({
             "model": "accounts.pilot",
             "pk": i + 1,
             "fields": {
-                "username": username,
+                # The zero-padded index keeps usernames unique without retrying
+                "username": f"{fake.user_name()}{i:0{username_width}d}",
                 "first_name": fake.first_name(),
                 "last_name": fake.last_name(),
                 "email": fake.email(),
                 "is_staff": False,
                 "is_active": True,
                 "is_superuser": False,
-                "date_joined": fake.date_time_between(start_date=datetime(2020, 1, 1, tzinfo=timezone.utc)).isoformat(),
-                "drone_license": license_num,
-                "skill_rating": random.randint(1, 100),
+                "date_joined": fake.date_time_between(start_date=datetime(2020, 1, 1, tzinfo=timezone.utc), end_date=now, tzinfo=timezone.utc).isoformat(),
+                "drone_license": generate_drone_license(i, license_offset),
+                "skill_rating": rng.randint(1, 100),
                 "certification_date": cert_date,
                 "password": "pbkdf2_sha256$600000$dummy$dummy"  # Dummy password hash
             }
         })
-    
     return pilots
 
-def generate_drones(count=30, manufacturer_count=10):
-    """Generate drone data"""
-    drones = []
-    drone_models = [
-        'Phantom', 'Mavic', 'Inspire', 'Spark', 'Mini', 'Air', 'Pro', 'Elite',
-        'Racer', 'Speed', 'Velocity', 'Thunder', 'Lightning', 'Storm', 'Blitz',
-        'Falcon', 'Eagle', 'Hawk', 'Swift', 'Arrow', 'Bullet', 'Rocket'
+
+def generate_pilots(count=20, seed=None, workers=None, chunk_size=PILOT_CHUNK_SIZE):
+    """Generate pilot data, spreading the Faker work over ``workers`` processes"""
+    username_width = len(str(max(count - 1, 0)))
+    chunks = [
+        (start, min(start + chunk_size, count), seed, username_width)
+        for start in range(0, count, chunk_size)
     ]
-    
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from _generate_pilot_chunk(chunk)
+        return
+
+    with Pool(workers) as pool:
+        for pilots in pool.imap(_generate_pilot_chunk, chunks):
+            yield from pilots
+
+
+def generate_drones(count=30, manufacturer_count=10, pilot_count=20, seed=None):
+    """Generate drone data"""
+    rng = random.Random(seed)
+
     for i in range(count):
-        model_name = f"{random.choice(drone_models)} {random.choice(['X', 'Pro', 'Elite', 'Racing', 'Speed'])}{random.randint(100, 999)}"
-        
-        drones.append({
+        # The running number keeps model names unique for every manufacturer
+        model_name = f"{rng.choice(DRONE_MODELS)} {rng.choice(DRONE_VARIANTS)}{100 + i}"
+
+        yield {
             "model": "racing.drone",
             "pk": i + 1,
             "fields": {
                 "model_name": model_name,
-                "max_speed": round(random.uniform(50.0, 200.0), 1),  # 50-200 km/h
-                "weight": str(round(random.uniform(0.5, 5.0), 2)),  # 0.5-5.0 kg
-                "manufacturer": random.randint(1, manufacturer_count),
-                "pilots": random.sample(range(1, 21), random.randint(0, 3))  # 0-3 pilots per drone
+                "max_speed": round(rng.uniform(50.0, 200.0), 1),  # 50-200 km/h
+                "weight": str(round(rng.uniform(0.5, 5.0), 2)),  # 0.5-5.0 kg
+                "manufacturer": rng.randint(1, manufacturer_count),
+                "pilots": rng.sample(range(1, pilot_count + 1), rng.randint(0, min(3, pilot_count)))  # 0-3 pilots per drone
             }
-        })
-    
-    return drones
+        }
 
-def generate_racetracks(count=15):
+
+def generate_racetracks(count=15, seed=None):
     """Generate racetrack data"""
-    racetracks = []
-    track_names = [
-        'Thunder Valley Circuit', 'Sky Harbor Track', 'Velocity Speedway', 'Aerial Arena',
-        'Cloud Nine Circuit', 'Lightning Loop', 'Storm Ridge Track', 'Wind Tunnel Raceway',
-        'Turbulence Track', 'Stratosphere Speedway', 'Jetstream Circuit', 'Altitude Arena',
-        'Supersonic Speedway', 'Mach One Track', 'Hypersonic Highway', 'Tornado Alley Track',
-        'Hurricane Harbor', 'Cyclone Circuit', 'Blizzard Boulevard', 'Meteor Speedway'
-    ]
-    
-    locations = [
-        'Las Vegas, Nevada', 'Miami, Florida', 'Austin, Texas', 'Los Angeles, California',
-        'New York, New York', 'Chicago, Illinois', 'Phoenix, Arizona', 'Denver, Colorado',
-        'Seattle, Washington', 'Atlanta, Georgia', 'Boston, Massachusetts', 'Portland, Oregon',
-        'San Francisco, California', 'Dallas, Texas', 'Detroit, Michigan'
-    ]
-    
-    used_names = set()
-    
+    rng = random.Random(seed)
+    names = shuffled_combinations(rng, TRACK_PREFIXES, TRACK_SUFFIXES)
+
     for i in range(count):
-        # Ensure unique track names
-        while True:
-            name = random.choice(track_names)
-            if name not in used_names:
-                used_names.add(name)
-                break
-        
         # Generate record time (between 30 seconds and 5 minutes)
-        record_seconds = random.randint(30, 300)
+        record_seconds = rng.randint(30, 300)
         record_time = f"00:{record_seconds // 60:02d}:{record_seconds % 60:02d}"
-        
-        racetracks.append({
+
+        yield {
             "model": "racing.racetrack",
             "pk": i + 1,
             "fields": {
-                "name": name,
-                "difficulty_level": random.randint(1, 5),
-                "length_meters": random.randint(500, 3000),
-                "location": random.choice(locations),
-                "record_time": record_time if random.choice([True, False]) else None  # 50% chance of having record
+                "name": unique_name(names, i),
+                "difficulty_level": rng.randint(1, 5),
+                "length_meters": rng.randint(500, 3000),
+                "location": rng.choice(LOCATIONS),
+                "record_time": record_time if rng.choice([True, False]) else None  # 50% chance of having record
             }
-        })
-    
-    return racetracks
-
-def main():
-    """Generate all fixtures and save to JSON file"""
-    print("Generating random data fixtures...")
-    
-    fixtures = []
-    
-    # Generate data
-    print("- Generating manufacturers...")
-    fixtures.extend(generate_manufacturers(10))
-    
-    print("- Generating pilots...")
-    fixtures.extend(generate_pilots(20))
-    
-    print("- Generating drones...")
-    fixtures.extend(generate_drones(30, 10))
-    
-    print("- Generating racetracks...")
-    fixtures.extend(generate_racetracks(15))
-    
-    # Save to JSON file
-    output_file = 'fixtures.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(fixtures, f, indent=2, ensure_ascii=False)
-    
-    print(f"\nFixtures generated successfully!")
-    print(f"Total records: {len(fixtures)}")
-    print(f"Saved to: {output_file}")
-    print(f"\nTo load the data into your database, run:")
-    print(f"python manage.py loaddata {output_file}")
+        }
+
+
+def generate_fixtures(options):
+    """Chain every generator in dependency order"""
+    seed = options.seed
+
+    def sub_seed(name):
+        return None if seed is None else f"{seed}:{name}"
+
+    yield from generate_manufacturers(options.manufacturers, sub_seed("manufacturers"))
+    yield from generate_pilots(options.pilots, seed, options.workers)
+    yield from generate_drones(options.drones, options.manufacturers, options.pilots, sub_seed("drones"))
+    yield from generate_racetracks(options.racetracks, sub_seed("racetracks"))
+
+
+def write_json(records, output):
+    """Stream a JSON array that ``loaddata`` accepts"""
+    count = 0
+    output.write("[")
+    for record in records:
+        output.write(",\n" if count else "\n")
+        output.write(json.dumps(record, ensure_ascii=False))
+        count += 1
+    output.write("\n]\n")
+    return count
+
+
+def write_jsonl(records, output):
+    """Stream one record per line"""
+    count = 0
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False))
+        output.write("\n")
+        count += 1
+    return count
+
+
+def write_database(records, batch_size):
+    """Insert the records straight into the configured database"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+    import django
+    django.setup()
+
+    from racing.bulk_import import BulkImporter
+
+    importer = BulkImporter(batch_size=batch_size)
+    for record in records:
+        importer.add(record)
+    return sum(importer.finish().values())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--manufacturers", type=int, default=10)
+    parser.add_argument("--pilots", type=int, default=20)
+    parser.add_argument("--drones", type=int, default=30)
+    parser.add_argument("--racetracks", type=int, default=15)
+    parser.add_argument("--seed", help="Seed for reproducible output")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes generating pilots (default: one per CPU)")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Output file, '-' for stdout (default: fixtures.json or fixtures.jsonl)")
+    parser.add_argument("--database", action="store_true",
+                        help="Insert into the configured database with bulk_create instead of writing a file")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Generate all fixtures and save them to a file or the database"""
+    options = parse_args(argv)
+    log = sys.stderr if options.output == "-" else sys.stdout
+    print("Generating random data fixtures...", file=log)
+
+    records = generate_fixtures(options)
+
+    if options.database:
+        total = write_database(records, options.batch_size)
+        print(f"\nFixtures inserted successfully!", file=log)
+        print(f"Total records: {total}", file=log)
+        return
+
+    output_file = options.output or f"fixtures.{options.format}"
+    write = write_json if options.format == "json" else write_jsonl
+    if output_file == "-":
+        total = write(records, sys.stdout)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            total = write(records, f)
+
+    print(f"\nFixtures generated successfully!", file=log)
+    print(f"Total records: {total}", file=log)
+    print(f"Saved to: {output_file}", file=log)
+    print(f"\nTo load the data into your database, run:", file=log)
+    print(f"python manage.py import_fixtures {output_file}", file=log)
+
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from racing.models import Manufacturer, Drone, RaceTrack
+from racing.models import (Drone,
+                           LapTime,
+                           Manufacturer,
+                           PersonalBest,
+                           Race,
+                           RaceResult,
+                           RaceTrack,)
 
 
 @admin.register(Manufacturer)
@@ -31,6 +37,37 @@ class RaceTrackAdmin(admin.ModelAdmin):
         "difficulty_level",
         "length_meters",
         "location",
+        "record_time",
     )
     search_fields = ("name", "location")
-    list_filter = ("difficulty_level",)
\ No newline at end of file
+    list_filter = ("difficulty_level",)
+
+
+class RaceResultInline(admin.TabularInline):
+    model = RaceResult
+    raw_id_fields = ("pilot", "drone")
+    extra = 0
+
+
+@admin.register(Race)
+class RaceAdmin(admin.ModelAdmin):
+    list_display = ("track", "started_at")
+    list_filter = ("track",)
+    date_hierarchy = "started_at"
+    inlines = (RaceResultInline,)
+
+
+@admin.register(LapTime)
+class LapTimeAdmin(admin.ModelAdmin):
+    list_display = ("pilot", "track", "lap_number", "time")
+    list_filter = ("track",)
+    raw_id_fields = ("result", "pilot")
+    list_select_related = ("pilot", "track")
+
+
+@admin.register(PersonalBest)
+class PersonalBestAdmin(admin.ModelAdmin):
+    list_display = ("pilot", "track", "time")
+    list_filter = ("track",)
+    raw_id_fields = ("pilot", "race")
+    list_select_related = ("pilot", "track")
@@ -0,0 +1,184 @@
+import threading
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from racing.models import Drone, Manufacturer
+
+VERSION_KEY = "racing:analytics:version"
+CHUNK_SIZE = 10000
+PERCENTILES = (10, 25, 50, 75, 90)
+# Modified z-score above which a drone counts as an outlier within its
+# manufacturer (Iglewicz and Hoaglin).
+OUTLIER_THRESHOLD = 3.5
+
+_lock = threading.Lock()
+_columns = {"version": None, "data": None}
+
+
+def invalidate():
+    """Mark the cached columns stale in every process sharing the cache."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def load_columns():
+    """
+    Read the drone table into columnar arrays, ``CHUNK_SIZE`` rows at a
+    time. Weights are cast to floats in SQL so no ``Decimal`` is built.
+    """
+    rows = (
+        Drone.objects.order_by()
+        .annotate(weight_value=Cast("weight", FloatField()))
+        .values_list("pk", "manufacturer_id", "max_speed", "weight_value")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    chunks, chunk = [], []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            chunks.append(np.array(chunk, dtype=np.float64))
+            chunk = []
+    if chunk:
+        chunks.append(np.array(chunk, dtype=np.float64))
+    table = np.concatenate(chunks) if chunks else np.empty((0, 4))
+    return {
+        "id": table[:, 0].astype(np.int64),
+        "manufacturer_id": table[:, 1].astype(np.int64),
+        "max_speed": table[:, 2].copy(),
+        "weight": table[:, 3].copy(),
+    }
+
+
+def get_columns():
+    """The drone columns, reloaded only after a drone write."""
+    version = _version()
+    with _lock:
+        if _columns["version"] != version or _columns["data"] is None:
+            _columns["data"] = load_columns()
+            _columns["version"] = version
+        return _columns["data"]
+
+
+def _grouped_percentiles(values, starts, counts, percentiles):
+    """
+    Linearly interpolated percentiles of every group of ``values``, which
+    must be sorted within groups laid out back to back.
+    """
+    positions = (counts[:, None] - 1) * (np.asarray(percentiles) / 100.0)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, counts[:, None] - 1)
+    fraction = positions - lower
+    lower_values = values[starts[:, None] + lower]
+    upper_values = values[starts[:, None] + upper]
+    return lower_values + (upper_values - lower_values) * fraction
+
+
+def analyze(columns):
+    """
+    Speed-to-weight statistics of the fleet and of every manufacturer,
+    computed without a Python loop over drones.
+    """
+    valid = columns["weight"] > 0
+    ids = columns["id"][valid]
+    speed = columns["max_speed"][valid]
+    weight = columns["weight"][valid]
+    ratio = speed / weight
+
+    if not len(ratio):
+        return {"fleet": None, "manufacturers": [], "outliers": []}
+
+    groups, group_of = np.unique(
+        columns["manufacturer_id"][valid], return_inverse=True
+    )
+    counts = np.bincount(group_of)
+    means = np.bincount(group_of, weights=ratio) / counts
+    squares = np.bincount(group_of, weights=ratio * ratio) / counts
+    stds = np.sqrt(np.maximum(squares - means * means, 0.0))
+    mean_speeds = np.bincount(group_of, weights=speed) / counts
+    mean_weights = np.bincount(group_of, weights=weight) / counts
+
+    # Sort by group, then by ratio, so every group is a sorted slice.
+    order = np.lexsort((ratio, group_of))
+    sorted_ratio = ratio[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    percentiles = _grouped_percentiles(sorted_ratio, starts, counts,
+                                       PERCENTILES)
+    minimums = sorted_ratio[starts]
+    maximums = sorted_ratio[starts + counts - 1]
+
+    medians = _grouped_percentiles(sorted_ratio, starts, counts, [50])[:, 0]
+    deviations = np.abs(ratio - medians[group_of])
+    deviation_order = np.lexsort((deviations, group_of))
+    mads = _grouped_percentiles(
+        deviations[deviation_order], starts, counts, [50]
+    )[:, 0]
+    scale = 1.4826 * mads[group_of]
+    scores = np.divide(
+        deviations, scale, out=np.zeros_like(deviations), where=scale > 0
+    )
+    is_outlier = scores > OUTLIER_THRESHOLD
+    outliers_per_group = np.bincount(group_of, weights=is_outlier,
+                                     minlength=len(groups))
+
+    names = dict(
+        Manufacturer.objects.filter(pk__in=groups.tolist())
+        .values_list("pk", "name")
+    )
+    manufacturers = [
+        {
+            "manufacturer_id": int(group),
+            "name": names.get(int(group), ""),
+            "count": int(counts[index]),
+            "mean": float(means[index]),
+            "std": float(stds[index]),
+            "min": float(minimums[index]),
+            "max": float(maximums[index]),
+            "percentiles": dict(zip(PERCENTILES,
+                                    percentiles[index].tolist())),
+            "mean_speed": float(mean_speeds[index]),
+            "mean_weight": float(mean_weights[index]),
+            "outliers": int(outliers_per_group[index]),
+        }
+        for index, group in enumerate(groups)
+    ]
+
+    flagged = np.flatnonzero(is_outlier)
+    flagged = flagged[np.argsort(-scores[flagged], kind="stable")]
+    outliers = [
+        {
+            "drone_id": int(ids[index]),
+            "manufacturer_id": int(groups[group_of[index]]),
+            "ratio": float(ratio[index]),
+            "score": float(scores[index]),
+        }
+        for index in flagged
+    ]
+
+    fleet = {
+        "count": int(len(ratio)),
+        "mean": float(ratio.mean()),
+        "std": float(ratio.std()),
+        "min": float(sorted_ratio.min()),
+        "max": float(sorted_ratio.max()),
+        "percentiles": dict(zip(PERCENTILES,
+                                np.percentile(ratio, PERCENTILES).tolist())),
+    }
+    return {"fleet": fleet, "manufacturers": manufacturers,
+            "outliers": outliers}
+
+
+def fleet_analytics():
+    return analyze(get_columns())
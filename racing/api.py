@@ -0,0 +1,358 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_datetime, parse_duration
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from accounts.models import Pilot
+from racing.exports import GroupConcat
+from racing.models import Drone, Manufacturer, RaceTrack
+from racing.pagination import CursorPaginator, InvalidCursor
+from racing.races import record_race
+
+MAX_IDS = 100
+# Longer laps are rejected as timing errors.
+MAX_LAP_TIME = timedelta(hours=1)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ResourceView(View):
+    """
+    Read-only JSON endpoint for one model.
+
+    ``fields`` maps the public field names to the ORM paths they are read
+    from; ``?fields=`` picks a subset and is turned into a single
+    ``values()`` query. Lists take ``?ids=1,2,3`` for bulk lookups and are
+    paginated with keyset cursors. Responses carry an ETag and answer
+    ``If-None-Match`` with ``304 Not Modified``.
+
+    The ETag is read before the rows are: it covers the newest
+    ``updated_at`` and the number of rows the response is drawn from, and
+    the request URL. Related data in a row (a drone's pilots, its
+    manufacturer's name) bumps the row's ``updated_at`` with it, and the
+    count changes when a row is deleted.
+    """
+
+    model = None
+    fields = {}
+    aggregates = {}
+    page_size = 50
+    max_page_size = 500
+
+    def get_selected_fields(self):
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}.")
+        return names
+
+    def get_ids(self):
+        ids = self.request.GET.get("ids")
+        if ids is None:
+            return None
+        try:
+            ids = [int(pk) for pk in ids.split(",") if pk.strip()]
+        except ValueError:
+            raise ApiError("ids must be a comma-separated list of integers.")
+        if len(ids) > MAX_IDS:
+            raise ApiError(f"At most {MAX_IDS} ids can be requested at once.")
+        return ids
+
+    def get_page_size(self):
+        try:
+            limit = int(self.request.GET.get("limit", self.page_size))
+        except ValueError:
+            raise ApiError("limit must be an integer.")
+        return max(1, min(limit, self.max_page_size))
+
+    def get_queryset(self, names):
+        queryset = self.model._default_manager.all()
+        for name in names:
+            if name in self.aggregates:
+                queryset = queryset.annotate(**{
+                    self.fields[name]: self.aggregates[name]
+                })
+        return queryset
+
+    def serialize(self, row, names):
+        return {name: row[self.fields[name]] for name in names}
+
+    def filter_queryset(self, queryset, pk=None):
+        if pk is not None:
+            return queryset.filter(pk=pk)
+        ids = self.get_ids()
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        return queryset
+
+    def get_etag(self, pk=None):
+        version = self.filter_queryset(
+            self.model._default_manager.all(), pk
+        ).aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+        key = (
+            f"{self.model._meta.label}:{version['last_modified']}:"
+            f"{version['count']}:{self.request.build_absolute_uri()}"
+        )
+        return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+    def get_data(self, pk=None):
+        names = self.get_selected_fields()
+        paths = [self.fields[name] for name in names]
+        queryset = self.filter_queryset(self.get_queryset(names), pk)
+
+        if pk is not None:
+            row = queryset.values(*paths).first()
+            if row is None:
+                raise ApiError("Not found.", status=404)
+            return self.serialize(row, names)
+
+        paginator = CursorPaginator(queryset, self.get_page_size())
+        keys = [attname for attname, _ in paginator.keys]
+        paginator.queryset = queryset.values(*paths, *keys)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise ApiError("Invalid cursor.")
+        return {
+            "results": [self.serialize(row, names) for row in page],
+            "next": self.page_url(page.next_cursor),
+            "previous": self.page_url(page.previous_cursor),
+        }
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query["cursor"] = cursor
+        return self.request.build_absolute_uri("?" + query.urlencode())
+
+    def get(self, request, pk=None):
+        if not request.user.is_authenticated:
+            return JsonResponse({"detail": "Authentication required."},
+                                status=401)
+        try:
+            etag = self.get_etag(pk)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                data = self.get_data(pk)
+                response = HttpResponse(
+                    json.dumps(data, cls=DjangoJSONEncoder),
+                    content_type="application/json",
+                )
+                response["ETag"] = etag
+        except ApiError as error:
+            return JsonResponse({"detail": str(error)}, status=error.status)
+        patch_vary_headers(response, ["Cookie"])
+        return response
+
+
+class PilotIds(GroupConcat):
+    """Pilot IDs of a drone, returned as a list of integers."""
+
+    def convert_value(self, value, expression, connection):
+        if not value:
+            return []
+        return sorted(int(pk) for pk in value.split(","))
+
+
+class ManufacturerResourceView(ResourceView):
+    model = Manufacturer
+    fields = {
+        "id": "id",
+        "name": "name",
+        "country": "country",
+    }
+
+
+class DroneResourceView(ResourceView):
+    model = Drone
+    fields = {
+        "id": "id",
+        "model_name": "model_name",
+        "max_speed": "max_speed",
+        "weight": "weight",
+        "manufacturer": "manufacturer_id",
+        "manufacturer_name": "manufacturer__name",
+        "pilots": "pilot_ids",
+    }
+    aggregates = {
+        "pilots": PilotIds("pilots"),
+    }
+
+
+class RaceTrackResourceView(ResourceView):
+    model = RaceTrack
+    fields = {
+        "id": "id",
+        "name": "name",
+        "difficulty_level": "difficulty_level",
+        "length_meters": "length_meters",
+        "location": "location",
+        "record_time": "record_time",
+    }
+
+
+class PilotResourceView(ResourceView):
+    model = Pilot
+    fields = {
+        "id": "id",
+        "username": "username",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "drone_license": "drone_license",
+        "skill_rating": "skill_rating",
+        "certification_date": "certification_date",
+    }
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class RaceIngestView(View):
+    """
+    Accept a finished race from a timing system as JSON::
+
+        {"track": 3, "started_at": "2025-06-01T14:00:00Z",
+         "results": [{"pilot": 7, "drone": 12, "position": 1,
+                      "laps": [62.418, "0:01:01.907", ...]}, ...]}
+
+    Lap times are seconds or duration strings of at most an hour. Pilots
+    and drones are
+    validated with one query each and the laps are written in bulk.
+
+    Timing systems authenticate with ``Authorization: Bearer <token>``
+    against ``settings.RACE_INGEST_TOKEN`` and skip the CSRF check, which
+    only protects cookie sessions. Signed-in users need the
+    ``racing.add_race`` permission and a CSRF token.
+    """
+
+    permission = "racing.add_race"
+
+    def has_valid_token(self, request):
+        token = getattr(settings, "RACE_INGEST_TOKEN", None)
+        header = request.headers.get("Authorization", "")
+        return bool(token) and hmac.compare_digest(
+            header.encode(), f"Bearer {token}".encode()
+        )
+
+    def check_access(self, request):
+        """Return an error response unless ``request`` may record races."""
+        if self.has_valid_token(request):
+            return None
+        if "Authorization" in request.headers:
+            return JsonResponse({"detail": "Invalid token."}, status=401)
+        if not request.user.is_authenticated:
+            return JsonResponse({"detail": "Authentication required."},
+                                status=401)
+        rejected = CsrfViewMiddleware(lambda request: None).process_view(
+            request, None, (), {}
+        )
+        if rejected is not None:
+            return rejected
+        if not request.user.has_perm(self.permission):
+            return JsonResponse({"detail": "Permission denied."}, status=403)
+        return None
+
+    def parse_position(self, value):
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ApiError(f"Invalid position: {value!r}.")
+        return value
+
+    def parse_lap(self, value):
+        time = None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Compared before conversion, which NaN, infinity and huge
+            # numbers would fail or overflow.
+            if 0 < value <= MAX_LAP_TIME.total_seconds():
+                time = timedelta(seconds=value)
+        elif isinstance(value, str):
+            try:
+                time = parse_duration(value)
+            except OverflowError:
+                pass
+        if time is None or not timedelta() < time <= MAX_LAP_TIME:
+            raise ApiError(f"Invalid lap time: {value!r}.")
+        return time
+
+    def parse(self, body):
+        try:
+            payload = json.loads(body)
+            track_id = int(payload["track"])
+            started_at = parse_datetime(payload["started_at"])
+            results = [
+                {
+                    "pilot_id": int(entry["pilot"]),
+                    "drone_id": int(entry["drone"]),
+                    "position": self.parse_position(entry.get("position")),
+                    "laps": [self.parse_lap(lap) for lap in entry["laps"]],
+                }
+                for entry in payload["results"]
+            ]
+        except (ValueError, KeyError, TypeError, OverflowError):
+            raise ApiError(
+                "Expected track, started_at and results with pilot, drone "
+                "and laps."
+            )
+        if started_at is None:
+            raise ApiError("started_at must be an ISO 8601 datetime.")
+        if not RaceTrack.objects.filter(pk=track_id).exists():
+            raise ApiError(f"Unknown track: {track_id}.")
+
+        pilot_ids = {entry["pilot_id"] for entry in results}
+        if len(pilot_ids) != len(results):
+            raise ApiError("Each pilot can only have one result per race.")
+        drone_ids = {entry["drone_id"] for entry in results}
+        for model, ids in ((Pilot, pilot_ids), (Drone, drone_ids)):
+            missing = ids - set(
+                model._default_manager.filter(pk__in=ids).order_by()
+                .values_list("pk", flat=True)
+            )
+            if missing:
+                raise ApiError(
+                    f"Unknown {model._meta.verbose_name} id(s): "
+                    f"{', '.join(map(str, sorted(missing)))}."
+                )
+        return track_id, started_at, results
+
+    def post(self, request):
+        denied = self.check_access(request)
+        if denied is not None:
+            return denied
+        try:
+            track_id, started_at, results = self.parse(request.body)
+        except ApiError as error:
+            return JsonResponse({"detail": str(error)}, status=error.status)
+
+        race = record_race(track_id, started_at, results)
+        record_time = (
+            RaceTrack.objects.filter(pk=track_id)
+            .values_list("record_time", flat=True)
+            .get()
+        )
+        return JsonResponse(
+            {
+                "race": race.pk,
+                "laps": sum(len(entry["laps"]) for entry in results),
+                "record_time": record_time,
+            },
+            encoder=DjangoJSONEncoder,
+            status=201,
+        )
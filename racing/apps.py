@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class RacingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'racing'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from racing import checks, signals  # noqa: F401
+
+        # The apps have no migrations; the search index is created with the
+        # tables, and racing.checks reports a schema that lacks it.
+        post_migrate.connect(signals.install_search_index, sender=self)
@@ -0,0 +1,172 @@
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models.signals import m2m_changed
+
+from racing.models import Drone
+
+Assignment = Drone.pilots.through
+
+
+def assigned_drone_ids(pilot, drone_ids):
+    """
+    The IDs among ``drone_ids`` that ``pilot`` is assigned to.
+
+    Only the given drones are looked up, through the unique
+    (drone, pilot) index of the through table, so the cost follows the
+    page size rather than the number of drones the pilot flies.
+    """
+    queryset = _assigned_queryset(pilot, drone_ids)
+    return set() if queryset is None else set(queryset)
+
+
+async def aassigned_drone_ids(pilot, drone_ids):
+    queryset = _assigned_queryset(pilot, drone_ids)
+    return set() if queryset is None else {pk async for pk in queryset}
+
+
+def _assigned_queryset(pilot, drone_ids):
+    drone_ids = list(drone_ids)
+    if not getattr(pilot, "is_authenticated", False) or not drone_ids:
+        return None
+    return (
+        Assignment.objects
+        .filter(pilot_id=pilot.pk, drone_id__in=drone_ids)
+        .values_list("drone_id", flat=True)
+    )
+
+
+def _send(pilot, action, drone_ids, using):
+    # The through table is written directly, so send the signals that
+    # ``pilot.drones.add()`` / ``remove()`` would have sent: ``pre_*``
+    # before the write, ``post_*`` after it.
+    m2m_changed.send(
+        sender=Assignment,
+        instance=pilot,
+        action=action,
+        reverse=True,
+        model=Drone,
+        pk_set=set(drone_ids),
+        using=using,
+    )
+
+
+def _insert(pilot, drone_ids, using):
+    """
+    Insert the assignments and return the drone IDs of the rows written.
+
+    A row that a concurrent transaction inserted first is skipped and left
+    out of the result, so that ``post_add`` never counts a row twice.
+    PostgreSQL and SQLite report the written rows with ``ON CONFLICT DO
+    NOTHING RETURNING``; other databases insert row by row in savepoints.
+    """
+    connection = connections[using]
+    drone_ids = list(drone_ids)
+    if (connection.vendor in ("postgresql", "sqlite")
+            and connection.features.can_return_rows_from_bulk_insert):
+        quote = connection.ops.quote_name
+        drone = quote(Assignment._meta.get_field("drone").column)
+        pilot_column = quote(Assignment._meta.get_field("pilot").column)
+        table = quote(Assignment._meta.db_table)
+        fields = [Assignment._meta.get_field("drone"),
+                  Assignment._meta.get_field("pilot")]
+        batch_size = connection.ops.bulk_batch_size(fields, drone_ids)
+        inserted = set()
+        with connection.cursor() as cursor:
+            for start in range(0, len(drone_ids), batch_size):
+                batch = drone_ids[start:start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {table} ({drone}, {pilot_column}) "
+                    f"VALUES {', '.join(['(%s, %s)'] * len(batch))} "
+                    f"ON CONFLICT DO NOTHING RETURNING {drone}",
+                    [value for pk in batch for value in (pk, pilot.pk)],
+                )
+                inserted.update(row[0] for row in cursor.fetchall())
+        return inserted
+
+    inserted = set()
+    for pk in drone_ids:
+        try:
+            with transaction.atomic(using=using):
+                Assignment.objects.using(using).create(
+                    pilot_id=pilot.pk, drone_id=pk
+                )
+        except IntegrityError:
+            continue
+        inserted.add(pk)
+    return inserted
+
+
+def _add(pilot, drone_ids, using):
+    _send(pilot, "pre_add", drone_ids, using)
+    inserted = _insert(pilot, drone_ids, using)
+    if inserted:
+        _send(pilot, "post_add", inserted, using)
+    return inserted
+
+
+def _remove(pilot, drone_ids, using):
+    _send(pilot, "pre_remove", drone_ids, using)
+    Assignment.objects.using(using).filter(
+        pilot_id=pilot.pk, drone_id__in=drone_ids
+    ).delete()
+    # Removals are recounted from the through table, so signalling an ID
+    # a concurrent transaction already removed does no harm.
+    _send(pilot, "post_remove", drone_ids, using)
+
+
+def toggle_assignment(pilot, drone_id):
+    """
+    Assign ``pilot`` to the drone, or unassign them if they already fly it.
+
+    The assignment row is read with a lock and then deleted or inserted;
+    concurrent toggles cannot create a duplicate, and only the transaction
+    that actually writes the row signals ``post_add``. Returns ``True``
+    when the pilot ends up assigned and ``None`` when the drone does not
+    exist.
+    """
+    using = router.db_for_write(Assignment, instance=pilot)
+    with transaction.atomic(using=using):
+        assigned = (
+            Assignment.objects.using(using)
+            .select_for_update()
+            .filter(pilot_id=pilot.pk, drone_id=drone_id)
+            .exists()
+        )
+        if assigned:
+            _remove(pilot, [drone_id], using)
+            return False
+        if not Drone.objects.using(using).filter(pk=drone_id).exists():
+            return None
+        _add(pilot, [drone_id], using)
+        return True
+
+
+def assign_drones(pilot, drone_ids):
+    """
+    Assign ``pilot`` to every existing drone in ``drone_ids`` with one
+    select and one bulk insert. Returns the newly assigned IDs.
+    """
+    using = router.db_for_write(Assignment, instance=pilot)
+    with transaction.atomic(using=using):
+        missing = set(
+            Drone.objects.using(using)
+            .filter(pk__in=set(drone_ids))
+            .exclude(pilots=pilot)
+            .values_list("pk", flat=True)
+        )
+        if not missing:
+            return set()
+        return _add(pilot, missing, using)
+
+
+def unassign_drones(pilot, drone_ids):
+    """
+    Unassign ``pilot`` from every drone in ``drone_ids`` with one select
+    and one delete. Returns the IDs that were actually removed.
+    """
+    using = router.db_for_write(Assignment, instance=pilot)
+    drone_ids = set(drone_ids)
+    with transaction.atomic(using=using):
+        removed = assigned_drone_ids(pilot, drone_ids)
+        if removed:
+            _remove(pilot, removed, using)
+    return removed
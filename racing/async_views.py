@@ -0,0 +1,209 @@
+"""
+Async versions of the read-only pages, routed instead of the synchronous
+ones when ``settings.ASYNC_VIEWS`` is enabled (the ``asgi`` settings
+profile).
+
+Each view subclasses its synchronous counterpart and keeps its queryset,
+template and context; only the queries are awaited on the async ORM, so
+an ASGI server no longer hands the whole view over to a worker thread.
+Templates are still rendered synchronously: Django renders the
+``TemplateResponse`` of an async view in a thread of its own.
+"""
+from inspect import isawaitable
+
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+
+from racing.assignments import aassigned_drone_ids
+from racing.pagination import CursorPaginator, InvalidCursor
+from racing.stats import aget_dashboard_stats
+from racing.views import (
+    DroneDetailView,
+    DroneListView,
+    ManufacturerDetailView,
+    ManufacturerListView,
+    RaceTrackDetailView,
+    RaceTrackListView,
+)
+
+
+async def load_user(request):
+    """
+    Load the user with ``request.auser()`` and keep it on the request, so
+    that the templates reading ``request.user`` do not query it again.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+class AsyncLoginRequiredMixin:
+    async def dispatch(self, request, *args, **kwargs):
+        await load_user(request)
+        # LoginRequiredMixin answers anonymous users with a plain redirect.
+        response = super().dispatch(request, *args, **kwargs)
+        if isawaitable(response):
+            response = await response
+        return response
+
+
+class AsyncListMixin(AsyncLoginRequiredMixin):
+    """
+    Run a ``ListView`` with ``KeysetPaginationMixin`` on the async ORM.
+
+    The count and the page, including its prefetches, are awaited before
+    ``get_context_data()`` runs, which then finds them already paginated.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.pagination = await self.apaginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list)
+        )
+        await self.aprepare(self.pagination[2])
+        return self.render_to_response(self.get_context_data())
+
+    async def aprepare(self, object_list):
+        """Await anything else ``get_context_data()`` reads from the database."""
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.pagination
+
+    async def apaginate_queryset(self, queryset, page_size):
+        if not page_size:
+            return None, None, [obj async for obj in queryset], False
+        if self.use_keyset_pagination():
+            paginator = CursorPaginator(
+                queryset,
+                page_size,
+                ordering=self.keyset_ordering,
+                approximate_count=self.keyset_approximate_count,
+            )
+            try:
+                page = await paginator.apage(
+                    self.request.GET.get(self.cursor_param)
+                )
+            except InvalidCursor:
+                raise Http404("Invalid cursor.")
+            return paginator, page, page.object_list, page.has_other_pages()
+
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        paginator.count = await queryset.acount()
+        page = (self.kwargs.get(self.page_kwarg)
+                or self.request.GET.get(self.page_kwarg)
+                or 1)
+        try:
+            number = paginator.validate_number(
+                paginator.num_pages if page == "last" else page
+            )
+        except InvalidPage as error:
+            raise Http404(f"Invalid page ({page}): {error}")
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        # Iterating the queryset fetches the rows and their prefetches in
+        # one step, where aiterator() would hand over once per chunk.
+        rows = [obj async for obj in queryset[bottom:top]]
+        page = paginator._get_page(rows, number, paginator)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AsyncDetailMixin(AsyncLoginRequiredMixin):
+    """Run a ``DetailView`` with ``ConditionalDetailMixin`` on the async ORM."""
+
+    async def get(self, request, *args, **kwargs):
+        last_modified = await self.get_last_modified_queryset().afirst()
+        if last_modified is None:
+            raise Http404(
+                f"No {self.model._meta.verbose_name} found matching the query"
+            )
+        await self.aprepare()
+
+        etag, timestamp = self.get_validators(last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is not None:
+            return self.finish_response(response)
+        self.object = await self.aget_object()
+        await self.aload_context()
+        response = self.render_to_response(
+            self.get_context_data(object=self.object)
+        )
+        return self.finish_response(response, etag, timestamp)
+
+    async def aprepare(self):
+        """Await anything else the validators need."""
+
+    async def aload_context(self):
+        """Await anything else ``get_context_data()`` reads; skipped on a 304."""
+
+    async def aget_object(self):
+        queryset = self.get_queryset()
+        try:
+            return await queryset.aget(pk=self.kwargs[self.pk_url_kwarg])
+        except queryset.model.DoesNotExist:
+            raise Http404(
+                f"No {self.model._meta.verbose_name} found matching the query"
+            )
+
+
+async def index(request):
+    user = await load_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    return TemplateResponse(request, "racing/index.html",
+                            await aget_dashboard_stats())
+
+
+class AsyncManufacturerListView(AsyncListMixin, ManufacturerListView):
+    pass
+
+
+class AsyncManufacturerDetailView(AsyncDetailMixin, ManufacturerDetailView):
+    async def aload_context(self):
+        self.drone_stats = await self.get_drones().aaggregate(
+            **self.drone_aggregates
+        )
+        try:
+            self.drone_page = await self.get_drone_paginator().apage(
+                self.request.GET.get(self.cursor_param)
+            )
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+
+    def get_drone_stats(self):
+        return self.drone_stats
+
+    def get_drone_page(self):
+        return self.drone_page
+
+
+class AsyncRaceTrackListView(AsyncListMixin, RaceTrackListView):
+    pass
+
+
+class AsyncRaceTrackDetailView(AsyncDetailMixin, RaceTrackDetailView):
+    pass
+
+
+class AsyncDroneListView(AsyncListMixin, DroneListView):
+    async def aprepare(self, object_list):
+        self.user_drone_ids = await aassigned_drone_ids(
+            self.request.user, [drone.pk for drone in object_list]
+        )
+
+    def get_user_drone_ids(self, drones):
+        return self.user_drone_ids
+
+
+class AsyncDroneDetailView(AsyncDetailMixin, DroneDetailView):
+    pass
@@ -0,0 +1,183 @@
+import csv
+import json
+
+from django.apps import apps
+from django.core.cache import caches
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from accounts.leaderboard import get_leaderboard
+from accounts.models import Pilot
+from racing import analytics, counters
+from racing.models import Drone, Manufacturer
+from racing.search import INDEXES, get_search_backend
+from racing.stats import rebuild_dashboard_stats
+
+READ_SIZE = 1 << 16
+
+
+def iter_json_array(stream):
+    """
+    Yield the items of a top-level JSON array one at a time, reading the
+    file in fixed-size blocks instead of parsing it as a whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    while True:
+        block = stream.read(READ_SIZE)
+        buffer += block
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if not started and position < len(buffer):
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array of records.")
+                started = True
+                position += 1
+                continue
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not block:
+                    raise
+                break
+            if end == len(buffer) and block:
+                # A number ending at the block boundary may continue in
+                # the next block.
+                break
+            yield item
+            position = end
+        buffer = buffer[position:]
+        if not block:
+            return
+
+
+def iter_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_csv(stream, model_label):
+    """
+    Yield records from a CSV file holding one model: a ``pk`` column plus
+    one column per field, many-to-many values separated by ``;``. The
+    ``pk`` column may only be left out for models without many-to-many
+    columns, as their through rows need the primary key.
+    """
+    for row in csv.DictReader(stream):
+        pk = row.pop("pk", None) or row.pop("id", None)
+        yield {"model": model_label, "pk": pk, "fields": row}
+
+
+class BulkImporter:
+    """
+    Insert fixture records with batched ``bulk_create`` calls, one
+    transaction per batch, writing many-to-many through-table rows in bulk
+    as well.
+
+    ``bulk_create`` sends no model signals, so the data derived from the
+    imported rows (dashboard statistics, the search index, primary key
+    sequences, the pilot leaderboard, the analytics columns, the counter
+    columns, cached list rows) is rebuilt once in ``finish()``.
+    """
+
+    def __init__(self, using="default", batch_size=5000):
+        self.using = using
+        self.batch_size = batch_size
+        self.batch = []
+        self.batch_model = None
+        self.counts = {}
+
+    def _field_value(self, field, value):
+        if value == "" and field.null:
+            return None
+        return field.to_python(value)
+
+    @staticmethod
+    def _related_pks(value):
+        if isinstance(value, str):
+            return [pk for pk in value.split(";") if pk]
+        return value or []
+
+    def _build(self, model, record):
+        fields, through_rows = {}, []
+        for name, value in record["fields"].items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                related_pks = self._related_pks(value)
+                if related_pks and record["pk"] is None:
+                    raise ValueError(
+                        f"{model._meta.label} records with a "
+                        f"{name!r} value need a pk."
+                    )
+                through = field.remote_field.through
+                through_rows.extend(
+                    (through, through(**{
+                        f"{field.m2m_field_name()}_id": record["pk"],
+                        f"{field.m2m_reverse_field_name()}_id": related_pk,
+                    }))
+                    for related_pk in related_pks
+                )
+            else:
+                fields[field.attname] = self._field_value(field, value)
+        return model(pk=record["pk"], **fields), through_rows
+
+    def flush(self):
+        if not self.batch:
+            return
+        model = apps.get_model(self.batch_model)
+        objects, through_objects = [], {}
+        for record in self.batch:
+            obj, through_rows = self._build(model, record)
+            objects.append(obj)
+            for through, row in through_rows:
+                through_objects.setdefault(through, []).append(row)
+
+        with transaction.atomic(using=self.using):
+            model._default_manager.using(self.using).bulk_create(objects)
+            for through, rows in through_objects.items():
+                through._default_manager.using(self.using).bulk_create(rows)
+
+        self.counts[model] = self.counts.get(model, 0) + len(objects)
+        self.batch = []
+
+    def add(self, record):
+        if self.batch and (record["model"] != self.batch_model
+                           or len(self.batch) >= self.batch_size):
+            self.flush()
+        self.batch_model = record["model"]
+        self.batch.append(record)
+
+    def finish(self):
+        self.flush()
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self.counts)
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+        backend = get_search_backend(self.using)
+        reindex = {model for model in self.counts if model in INDEXES}
+        if Manufacturer in reindex:
+            # Drones are indexed with their manufacturer's name.
+            reindex.add(Drone)
+        for model in reindex:
+            backend.rebuild(model)
+        if Drone in self.counts:
+            analytics.invalidate()
+            counters.reconcile(self.using)
+        if Pilot in self.counts:
+            get_leaderboard().reload()
+        rebuild_dashboard_stats()
+        # Bulk inserts send no signals, so existing objects keep the
+        # updated_at their cached list rows are keyed on.
+        caches["template_fragments"].clear()
+        return self.counts
@@ -0,0 +1,29 @@
+from django.core.checks import Error, Tags, register
+from django.db import connections
+
+from racing.models import Drone
+from racing.search import get_search_backend
+
+
+@register(Tags.database)
+def check_search_index(app_configs, databases=None, **kwargs):
+    """
+    The apps have no migrations, so the search index is created by the
+    ``post_migrate`` handler. Report a schema that was created some other
+    way, such as a restored dump, instead of failing on the first search.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if Drone._meta.db_table not in connection.introspection.table_names():
+            # Not created yet; migrate installs the index with the tables.
+            continue
+        missing = get_search_backend(alias).missing()
+        if missing:
+            errors.append(Error(
+                f"The search index of database {alias!r} is missing "
+                f"{', '.join(missing)}.",
+                hint="Run manage.py rebuild_search_index.",
+                id="racing.E001",
+            ))
+    return errors
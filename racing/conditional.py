@@ -0,0 +1,69 @@
+import hashlib
+
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control,
+                                patch_vary_headers,)
+from django.utils.http import http_date
+
+
+class ConditionalDetailMixin:
+    """
+    Answer repeat requests for a ``DetailView`` with ``304 Not Modified``.
+
+    The validators come from the object's ``updated_at`` column, read with
+    a single-column lookup by primary key, and from the requesting user's
+    own ``updated_at`` since every page shows the user in the sidebar. When
+    the client's copy is still current, neither the view's queries nor the
+    template rendering run.
+    """
+
+    def get_last_modified_queryset(self):
+        return (
+            self.model._default_manager
+            .filter(pk=self.kwargs[self.pk_url_kwarg])
+            .values_list("updated_at", flat=True)
+        )
+
+    def get_last_modified(self):
+        return self.get_last_modified_queryset().first()
+
+    def get_version_extra(self):
+        """Anything else the page shows that ``updated_at`` does not cover."""
+        return ""
+
+    def get_validators(self, last_modified):
+        """Return the ETag and the Last-Modified timestamp of the page."""
+        user = self.request.user
+        user_modified = getattr(user, "updated_at", None)
+        if user_modified is not None:
+            last_modified = max(last_modified, user_modified)
+        version = (
+            f"{self.model._meta.label}:{self.kwargs[self.pk_url_kwarg]}:"
+            f"{last_modified.isoformat()}:{user.pk}:"
+            f"{self.get_version_extra()}"
+        )
+        etag = '"%s"' % hashlib.md5(version.encode()).hexdigest()
+        return etag, int(last_modified.timestamp())
+
+    def finish_response(self, response, etag=None, timestamp=None):
+        if etag is not None:
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(timestamp)
+        patch_vary_headers(response, ["Cookie"])
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            # Let the regular lookup raise the 404.
+            return super().get(request, *args, **kwargs)
+
+        etag, timestamp = self.get_validators(last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is not None:
+            return self.finish_response(response)
+        response = super().get(request, *args, **kwargs)
+        return self.finish_response(response, etag, timestamp)
@@ -0,0 +1,91 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from racing.models import Drone, Manufacturer
+
+Assignment = Drone.pilots.through
+
+
+def adjust_pilot_counts(drone_ids, delta, using="default"):
+    if drone_ids:
+        Drone.objects.using(using).filter(pk__in=drone_ids).update(
+            pilot_count=F("pilot_count") + delta
+        )
+
+
+def adjust_drone_counts(manufacturer_ids, delta, using="default"):
+    if manufacturer_ids:
+        Manufacturer.objects.using(using).filter(pk__in=manufacturer_ids).update(
+            drone_count=F("drone_count") + delta
+        )
+
+
+def pilot_deleted(pilot_id, using="default"):
+    Drone.objects.using(using).filter(pilots=pilot_id).update(
+        pilot_count=F("pilot_count") - 1
+    )
+
+
+def _count(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+def _pilot_count():
+    return _count(Assignment.objects.all(), "drone")
+
+
+def _drone_count():
+    return _count(Drone.objects.all(), "manufacturer")
+
+
+def assigned_drone_count():
+    """Number of drones each pilot is assigned to, as a subquery per row."""
+    return _count(Assignment.objects.all(), "pilot")
+
+
+def recount_pilots(drone_ids, using="default"):
+    """
+    Set ``pilot_count`` of ``drone_ids`` from the through table.
+
+    ``remove()`` reports every ID it was given, assigned or not, so the
+    removed rows are counted again rather than subtracted.
+    """
+    if drone_ids:
+        Drone.objects.using(using).filter(pk__in=drone_ids).update(
+            pilot_count=_pilot_count()
+        )
+
+
+def reconcile(using="default"):
+    """
+    Repair counter columns that drifted from the rows they count, e.g.
+    after raw SQL or bulk writes that sent no signals. Only the rows in
+    error are written, and their ``updated_at`` is bumped so that cached
+    pages showing the old count are refreshed. Returns the number of rows
+    repaired per model.
+    """
+    now = timezone.now()
+    drones = (
+        Drone.objects.using(using)
+        .alias(actual=_pilot_count())
+        .exclude(pilot_count=F("actual"))
+        .update(pilot_count=_pilot_count(), updated_at=now)
+    )
+    manufacturers = (
+        Manufacturer.objects.using(using)
+        .alias(actual=_drone_count())
+        .exclude(drone_count=F("actual"))
+        .update(drone_count=_drone_count(), updated_at=now)
+    )
+    return {Drone: drones, Manufacturer: manufacturers}
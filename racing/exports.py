@@ -0,0 +1,89 @@
+import csv
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Aggregate, CharField
+from django.http import StreamingHttpResponse
+from django.views import View
+
+from racing.search import search_filter
+
+CHUNK_SIZE = 2000
+
+
+class GroupConcat(Aggregate):
+    """Comma-separated list of the aggregated values."""
+
+    function = "GROUP_CONCAT"
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            function="STRING_AGG",
+            template="%(function)s(CAST(%(expressions)s AS text), ',')",
+            **extra_context,
+        )
+
+
+class Echo:
+    """File-like object handing every written line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+class ExportView(LoginRequiredMixin, View):
+    """
+    Stream every row matching the list view's search form as CSV (default)
+    or JSON Lines (``?format=jsonl``). Rows are read with
+    ``values_list().iterator()`` so memory use does not grow with the table.
+    """
+
+    model = None
+    search_form_class = None
+    search_field = None
+    columns = ()
+    filename = None
+
+    def get_queryset(self):
+        return self.model._default_manager.order_by("pk")
+
+    def filter_queryset(self, queryset):
+        form = self.search_form_class(self.request.GET)
+        if form.is_valid():
+            return search_filter(queryset, form.cleaned_data[self.search_field])
+        return queryset
+
+    def iter_rows(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        paths = [path for _, path in self.columns]
+        return queryset.values_list(*paths).iterator(chunk_size=CHUNK_SIZE)
+
+    def iter_csv(self):
+        writer = csv.writer(Echo())
+        yield writer.writerow([header for header, _ in self.columns])
+        for row in self.iter_rows():
+            yield writer.writerow(row)
+
+    def iter_jsonl(self):
+        headers = [header for header, _ in self.columns]
+        for row in self.iter_rows():
+            yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n"
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "jsonl":
+            content, content_type, extension = (
+                self.iter_jsonl(), "application/x-ndjson", "jsonl"
+            )
+        else:
+            content, content_type, extension = (
+                self.iter_csv(), "text/csv", "csv"
+            )
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.filename}.{extension}"'
+        )
+        return response
@@ -1,8 +1,41 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 
 from racing.models import Drone
 
+
+class PilotAutocompleteWidget(forms.SelectMultiple):
+    """
+    Multiple select that renders only the selected pilots; the script in
+    ``Media`` adds more through the pilot autocomplete endpoint.
+    """
+
+    class Media:
+        js = ("js/pilot_autocomplete.js",)
+
+    def __init__(self, url_name="pilots:pilot-autocomplete", attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [pk for pk in value if str(pk).isdigit()]
+        self.choices = [
+            (pilot.pk, str(pilot))
+            for pilot in get_user_model().objects
+            .filter(pk__in=selected)
+            .only("username", "skill_rating")
+        ]
+        return super().optgroups(name, value, attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = reverse(
+            self.url_name
+        )
+        return context
+
+
 class DroneForm(forms.ModelForm):
     class Meta:
         model = Drone
@@ -12,9 +45,10 @@ class DroneForm(forms.ModelForm):
                   "manufacturer",
                   "pilots",]
 
+    # Validation only looks up the submitted IDs (``pk__in``).
     pilots = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=PilotAutocompleteWidget,
         required=False,
     )
 
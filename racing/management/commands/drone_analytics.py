@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from racing.analytics import PERCENTILES, fleet_analytics
+
+
+class Command(BaseCommand):
+    help = "Print speed-to-weight statistics of the drone fleet per manufacturer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--outliers",
+            type=int,
+            default=10,
+            help="Number of outlier drones to list.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the full result as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        analytics = fleet_analytics()
+        if options["json"]:
+            self.stdout.write(json.dumps(analytics, indent=2))
+            return
+
+        fleet = analytics["fleet"]
+        if fleet is None:
+            self.stdout.write("No drones to analyze.")
+            return
+        self.stdout.write(
+            f"{fleet['count']} drones, speed/weight mean {fleet['mean']:.1f} "
+            f"(std {fleet['std']:.1f})"
+        )
+
+        header = ["manufacturer", "drones", "min"]
+        header += [f"p{percentile}" for percentile in PERCENTILES]
+        header += ["max", "outliers"]
+        self.stdout.write("\t".join(header))
+        for row in analytics["manufacturers"]:
+            values = [row["min"], *row["percentiles"].values(), row["max"]]
+            self.stdout.write("\t".join([
+                row["name"],
+                str(row["count"]),
+                *(f"{value:.1f}" for value in values),
+                str(row["outliers"]),
+            ]))
+
+        outliers = analytics["outliers"][:options["outliers"]]
+        if outliers:
+            self.stdout.write("Outliers:")
+            for outlier in outliers:
+                self.stdout.write(
+                    f"  drone {outlier['drone_id']}: ratio "
+                    f"{outlier['ratio']:.1f}, score {outlier['score']:.1f}"
+                )
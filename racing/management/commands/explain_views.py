@@ -0,0 +1,178 @@
+import re
+from inspect import iscoroutine
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from accounts.models import Pilot
+from racing.models import Drone, Manufacturer, RaceTrack
+
+# The read paths of the pages and the admin changelists, as (route, model
+# whose first row is the ``pk`` argument, query). "{manufacturer}" and
+# the like in a query are replaced with the pk of that model's first row.
+# The exports and the fleet analytics read every row by design.
+ROUTES = (
+    ("racing:index", None, {}),
+    ("racing:manufacturer-list", None, {}),
+    ("racing:manufacturer-list", None, {"name": "a"}),
+    ("racing:manufacturer-list", None, {"cursor": ""}),
+    ("racing:manufacturer-detail", Manufacturer, {}),
+    ("racing:racetrack-list", None, {}),
+    ("racing:racetrack-list", None, {"cursor": ""}),
+    ("racing:racetrack-detail", RaceTrack, {}),
+    ("racing:drone-list", None, {}),
+    ("racing:drone-list", None, {"model_name": "a"}),
+    ("racing:drone-list", None, {"page": "last"}),
+    ("racing:drone-list", None, {"cursor": ""}),
+    ("racing:drone-detail", Drone, {}),
+    ("racing:api-manufacturer-list", None, {}),
+    ("racing:api-drone-list", None, {}),
+    ("racing:api-drone-detail", Drone, {}),
+    ("racing:api-racetrack-list", None, {}),
+    ("racing:api-pilot-list", None, {}),
+    ("pilots:pilot-list", None, {}),
+    ("pilots:pilot-list", None, {"username": "a"}),
+    ("pilots:pilot-list", None, {"cursor": ""}),
+    ("pilots:pilot-detail", Pilot, {}),
+    ("pilots:pilot-detail", Pilot, {"sort": "-max_speed"}),
+    ("pilots:pilot-autocomplete", None, {"q": "a"}),
+    ("admin:racing_drone_changelist", None,
+     {"manufacturer__id__exact": "{manufacturer}"}),
+    ("admin:racing_racetrack_changelist", None,
+     {"difficulty_level__exact": "3"}),
+    ("admin:accounts_pilot_changelist", None,
+     {"skill_rating__exact": "50"}),
+)
+
+# Plan lines worth a look: a table read from end to end, or rows sorted
+# after they were read instead of taken from an index in order. SQLite
+# sorts are only flagged when the rows come from a scan; sorting what an
+# index search returned (a drone's pilots, a primary key lookup) is
+# bounded by that search.
+SQLITE_FULL_SCAN = re.compile(
+    r"^SCAN (?!.*(USING (COVERING )?INDEX|VIRTUAL TABLE|CONSTANT ROW))"
+)
+SQLITE_SORT = re.compile(r"USE TEMP B-TREE")
+POSTGRES_FLAGS = re.compile(r"Seq Scan on|\bSort\b")
+
+
+def flagged_lines(vendor, plan):
+    if vendor == "sqlite":
+        scanned = any(line.startswith("SCAN ") for line in plan)
+        return [
+            line for line in plan
+            if SQLITE_FULL_SCAN.search(line)
+            or (scanned and SQLITE_SORT.search(line))
+        ]
+    if vendor == "postgresql":
+        return [line for line in plan if POSTGRES_FLAGS.search(line)]
+    return []
+
+
+class Command(BaseCommand):
+    help = ("Run EXPLAIN on every query of the read-only views and flag "
+            "sequential scans and sorts that no index serves. Plans "
+            "depend on the data, so run it against a realistic, ANALYZEd "
+            "database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Username to request the pages as (default: the first pilot).",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error when any query is flagged.",
+        )
+
+    def handle(self, *args, **options):
+        pilots = Pilot.objects.order_by("pk")
+        if options["user"]:
+            pilots = pilots.filter(username=options["user"])
+        user = pilots.first()
+        if user is None:
+            raise CommandError("No pilot to request the pages as.")
+        # Only in memory, for the admin changelists.
+        user.is_staff = user.is_superuser = True
+
+        first_pks = {
+            model._meta.model_name: model.objects.order_by("pk")
+            .values_list("pk", flat=True).first()
+            for model in (Drone, Manufacturer, Pilot, RaceTrack)
+        }
+        flagged = 0
+        for route, model, query in ROUTES:
+            kwargs = {}
+            if model is not None:
+                kwargs["pk"] = first_pks[model._meta.model_name]
+            path = reverse(route, kwargs=kwargs)
+            if query:
+                path += "?" + urlencode({
+                    name: value.format(**first_pks)
+                    for name, value in query.items()
+                })
+            queries = self.run_view(path, user)
+            findings = []
+            for sql in queries:
+                plan = self.explain(sql)
+                lines = flagged_lines(connection.vendor, plan)
+                if lines:
+                    findings.append((sql, lines))
+                if options["verbosity"] >= 2:
+                    self.stdout.write(f"  {sql}")
+                    for line in plan:
+                        self.stdout.write(f"    {line}")
+
+            flagged += len(findings)
+            style = self.style.WARNING if findings else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{path}: {len(queries)} queries, {len(findings)} flagged"
+            ))
+            for sql, lines in findings:
+                self.stdout.write(f"  {sql[:200]}")
+                for line in lines:
+                    self.stdout.write(self.style.WARNING(f"    {line}"))
+
+        if flagged and options["fail"]:
+            raise CommandError(f"{flagged} queries flagged.")
+
+    def run_view(self, path, user):
+        """Return the SELECTs the view behind ``path`` runs."""
+        host = next((host for host in settings.ALLOWED_HOSTS
+                     if host != "*" and not host.startswith(".")), "localhost")
+        request = RequestFactory(HTTP_HOST=host).get(path)
+        request.user = user
+        request.resolver_match = match = resolve(request.path_info)
+        with CaptureQueriesContext(connection) as context:
+            response = match.func(request, *match.args, **match.kwargs)
+            if iscoroutine(response):
+                response = async_to_sync(_await)(response)
+            if hasattr(response, "render"):
+                response.render()
+            if response.streaming:
+                b"".join(response.streaming_content)
+        if response.status_code != 200:
+            raise CommandError(f"{path} answered {response.status_code}.")
+        return [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].lstrip().upper().startswith(("SELECT", "WITH"))
+        ]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            rows = cursor.fetchall()
+        # SQLite returns (id, parent, notused, detail); the others one
+        # line of text per row.
+        return [str(row[-1]) for row in rows]
+
+
+async def _await(coroutine):
+    return await coroutine
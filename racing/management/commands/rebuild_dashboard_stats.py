@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from racing.stats import rebuild_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the cached dashboard statistics from the database."
+
+    def handle(self, *args, **options):
+        stats = rebuild_dashboard_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dashboard statistics rebuilt: "
+            f"{stats['num_pilots']} pilots, "
+            f"{stats['num_drones']} drones, "
+            f"{stats['num_manufacturers']} manufacturers, "
+            f"{stats['num_race_tracks']} race tracks."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.leaderboard import get_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Reload the pilot leaderboard from the skill ratings in the database."
+
+    def handle(self, *args, **options):
+        leaderboard = get_leaderboard()
+        leaderboard.reload()
+        self.stdout.write(self.style.SUCCESS(
+            f"Leaderboard rebuilt: {leaderboard.count()} pilots ranked."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from racing.search import INDEXES, get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Create the full-text search index and refill it from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to index.",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options["database"])
+        backend.install()
+        for model in INDEXES:
+            backend.rebuild(model)
+            self.stdout.write(f"Indexed {model._meta.verbose_name_plural}.")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
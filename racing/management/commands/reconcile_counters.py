@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from racing import stats
+from racing.counters import reconcile
+from racing.models import Drone
+
+
+class Command(BaseCommand):
+    help = ("Recount Drone.pilot_count and Manufacturer.drone_count and "
+            "repair the rows that drifted.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to reconcile.",
+        )
+
+    def handle(self, *args, **options):
+        repaired = reconcile(options["database"])
+        for model, count in repaired.items():
+            self.stdout.write(
+                f"Repaired {count} {model._meta.verbose_name_plural}."
+            )
+        if repaired[Drone]:
+            stats.refresh_popular_drones()
+        self.stdout.write(self.style.SUCCESS("Counters reconciled."))
@@ -2,12 +2,46 @@ from django.db import models
 from django.urls import reverse
 
 
-class Manufacturer(models.Model):
+class CounterFieldsMixin:
+    """
+    Leave ``counter_fields`` out of the UPDATE that ``save()`` runs. They
+    are maintained with ``F()`` updates by signals, so the values on a
+    loaded instance may already be stale.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not kwargs.get("force_insert")
+                and kwargs.get("update_fields") is None):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Manufacturer(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=255, unique=True)
     country = models.CharField(max_length=255)
+    drone_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of drones, kept up to date by signals",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    counter_fields = ("drone_count",)
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(
+                fields=["-drone_count", "name"],
+                name="manufacturer_popularity_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.country})"
@@ -19,7 +53,7 @@ class Manufacturer(models.Model):
         )
 
 
-class Drone(models.Model):
+class Drone(CounterFieldsMixin, models.Model):
     model_name = models.CharField(
         max_length=255,
     )
@@ -41,10 +75,31 @@ class Drone(models.Model):
         related_name="drones",
         blank=True,
     )
+    pilot_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of assigned pilots, kept up to date by signals",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    counter_fields = ("pilot_count",)
 
     class Meta:
-        ordering = ["model_name", "manufacturer"]
+        # The raw column, so the unique index serves the sort instead of
+        # a join on the manufacturer's name.
+        ordering = ["model_name", "manufacturer_id"]
         unique_together = ("model_name", "manufacturer")
+        indexes = [
+            # A manufacturer's drones in list order, and the admin filter.
+            models.Index(
+                fields=["manufacturer", "model_name"],
+                name="drone_manufacturer_model_idx",
+            ),
+            models.Index(
+                fields=["-pilot_count", "model_name"],
+                name="drone_popularity_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.model_name} ({self.manufacturer.name})"
@@ -83,11 +138,19 @@ class RaceTrack(models.Model):
     record_time = models.DurationField(
         null=True,
         blank=True,
-        help_text="Record time for the track",
+        editable=False,
+        help_text="Fastest recorded lap, kept up to date by race ingestion",
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["difficulty_level", "name"]
+        indexes = [
+            models.Index(
+                fields=["difficulty_level", "name"],
+                name="racetrack_difficulty_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_difficulty_level_display()})"
@@ -96,4 +159,131 @@ class RaceTrack(models.Model):
         return reverse(
             "racing:racetrack-detail",
             kwargs={"pk": self.pk},
-        )
\ No newline at end of file
+        )
+
+
+class Race(models.Model):
+    track = models.ForeignKey(
+        RaceTrack,
+        on_delete=models.CASCADE,
+        related_name="races",
+    )
+    started_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(
+                fields=["track", "started_at"],
+                name="race_track_started_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.track.name} @ {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class RaceResult(models.Model):
+    race = models.ForeignKey(
+        Race,
+        on_delete=models.CASCADE,
+        related_name="results",
+    )
+    pilot = models.ForeignKey(
+        "accounts.Pilot",
+        on_delete=models.CASCADE,
+        related_name="race_results",
+    )
+    # Retiring a drone keeps the races it flew and the records set with it.
+    drone = models.ForeignKey(
+        Drone,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="race_results",
+    )
+    position = models.PositiveIntegerField(null=True, blank=True)
+    total_time = models.DurationField(null=True, blank=True)
+    best_lap = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["race", "position"]
+        unique_together = ("race", "pilot")
+
+    def __str__(self):
+        return f"{self.pilot.username} in {self.race}"
+
+
+class LapTime(models.Model):
+    """
+    One timed lap. ``track`` and ``pilot`` repeat the values reachable
+    through ``result`` so the fastest laps of a track or a pilot are read
+    straight off an index.
+    """
+
+    result = models.ForeignKey(
+        RaceResult,
+        on_delete=models.CASCADE,
+        related_name="laps",
+    )
+    track = models.ForeignKey(
+        RaceTrack,
+        on_delete=models.CASCADE,
+        related_name="laps",
+    )
+    pilot = models.ForeignKey(
+        "accounts.Pilot",
+        on_delete=models.CASCADE,
+        related_name="laps",
+    )
+    lap_number = models.PositiveIntegerField()
+    time = models.DurationField()
+
+    class Meta:
+        ordering = ["result", "lap_number"]
+        unique_together = ("result", "lap_number")
+        indexes = [
+            models.Index(
+                fields=["track", "time"],
+                name="laptime_track_time_idx",
+            ),
+            models.Index(
+                fields=["pilot", "track", "time"],
+                name="laptime_pilot_track_time_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Lap {self.lap_number}: {self.time}"
+
+
+class PersonalBest(models.Model):
+    pilot = models.ForeignKey(
+        "accounts.Pilot",
+        on_delete=models.CASCADE,
+        related_name="personal_bests",
+    )
+    track = models.ForeignKey(
+        RaceTrack,
+        on_delete=models.CASCADE,
+        related_name="personal_bests",
+    )
+    race = models.ForeignKey(
+        Race,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    time = models.DurationField()
+
+    class Meta:
+        ordering = ["track", "time"]
+        unique_together = ("pilot", "track")
+        indexes = [
+            models.Index(
+                fields=["track", "time"],
+                name="personalbest_track_time_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.pilot.username} on {self.track.name}: {self.time}"
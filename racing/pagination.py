@@ -0,0 +1,280 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+APPROXIMATE_COUNT_TIMEOUT = 60
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def keyset_ordering(model, ordering=None):
+    """
+    Return the keyset for ``model`` as a tuple of ``(attname, descending)``.
+
+    The keyset follows ``ordering`` (``Meta.ordering`` by default), using the
+    raw column of foreign keys so that the sort can be served by the
+    composite index instead of a join, and ends with the primary key unless
+    the fields are already unique together.
+    """
+    keys = []
+    for name in ordering or model._meta.ordering:
+        descending = name.startswith("-")
+        field = model._meta.get_field(name.lstrip("-"))
+        keys.append((field.attname, descending))
+
+    names = {attname for attname, _ in keys}
+    unique_sets = [
+        {model._meta.get_field(name).attname for name in fields}
+        for fields in model._meta.unique_together
+    ]
+    unique_sets.extend(
+        {field.attname}
+        for field in model._meta.concrete_fields
+        if field.unique
+    )
+    if not any(unique <= names for unique in unique_sets):
+        keys.append((model._meta.pk.attname, False))
+    return tuple(keys)
+
+
+def encode_cursor(values, previous=False):
+    payload = json.dumps(
+        {"v": values, "p": previous},
+        cls=DjangoJSONEncoder,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(payload["v"]), bool(payload["p"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor(token)
+
+
+def approximate_count(queryset):
+    """
+    Cheap row count estimate for ``queryset``.
+
+    Unfiltered PostgreSQL tables use the planner statistics, everything else
+    falls back to an exact ``COUNT(*)`` that is cached for a short while.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(repr((sql, params)).encode()).hexdigest()
+    key = "racing:count:%s" % digest
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, APPROXIMATE_COUNT_TIMEOUT)
+    return count
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<Cursor page of %s items>" % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: every page is fetched with a ``WHERE`` on the keyset
+    of the last (or first) row of the neighbouring page and a ``LIMIT``, so
+    the cost does not depend on how deep the page is and no ``COUNT(*)`` is
+    needed.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None,
+                 approximate_count=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = keyset_ordering(queryset.model, ordering)
+        self.with_count = approximate_count
+
+    @cached_property
+    def count(self):
+        if not self.with_count:
+            return None
+        return approximate_count(self.queryset)
+
+    def _order_by(self, reverse=False):
+        return [
+            ("-" if descending != reverse else "") + attname
+            for attname, descending in self.keys
+        ]
+
+    def _values(self, obj):
+        if isinstance(obj, dict):
+            return [obj[attname] for attname, _ in self.keys]
+        return [getattr(obj, attname) for attname, _ in self.keys]
+
+    def _to_python(self, values):
+        model = self.queryset.model
+        if len(values) != len(self.keys):
+            raise InvalidCursor(values)
+        try:
+            return [
+                model._meta.get_field(attname).to_python(value)
+                for (attname, _), value in zip(self.keys, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor(values)
+
+    def _seek(self, values, reverse=False):
+        # (a, b, c) > (x, y, z) expanded to
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z).
+        condition = Q()
+        equal = Q()
+        for (attname, descending), value in zip(self.keys, values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{attname}__{lookup}": value})
+            equal &= Q(**{attname: value})
+        return condition
+
+    def _page_queryset(self, cursor):
+        previous = False
+        queryset = self.queryset.order_by(*self._order_by())
+        if cursor:
+            values, previous = decode_cursor(cursor)
+            values = self._to_python(values)
+            queryset = (self.queryset
+                        .order_by(*self._order_by(reverse=previous))
+                        .filter(self._seek(values, reverse=previous)))
+        return queryset[:self.per_page + 1], previous
+
+    def page(self, cursor=None):
+        queryset, previous = self._page_queryset(cursor)
+        return self._build_page(list(queryset), cursor, previous)
+
+    async def apage(self, cursor=None):
+        queryset, previous = self._page_queryset(cursor)
+        rows = [row async for row in queryset]
+        return self._build_page(rows, cursor, previous)
+
+    def _build_page(self, rows, cursor, previous):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if previous:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or previous:
+                next_cursor = encode_cursor(self._values(rows[-1]))
+            if cursor and (has_more or not previous):
+                previous_cursor = encode_cursor(self._values(rows[0]),
+                                                previous=True)
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+
+def cursor_page_context(request, page, cursor_param="cursor"):
+    """The links of a ``CursorPage`` that ``includes/pagination.html`` shows."""
+
+    def url(cursor):
+        query = request.GET.copy()
+        query.pop("page", None)
+        query[cursor_param] = cursor
+        return "?" + query.urlencode()
+
+    context = {"cursor_pagination": True, "first_page_url": url("")}
+    if page.has_next():
+        context["next_page_url"] = url(page.next_cursor)
+    if page.has_previous():
+        context["previous_page_url"] = url(page.previous_cursor)
+    return context
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination for ``ListView``.
+
+    Offset pagination stays the default; a view switches to cursors when
+    ``settings.RACING_KEYSET_PAGINATION`` is enabled or the request carries a
+    ``cursor`` parameter (an empty one for the first page).
+    """
+
+    cursor_param = "cursor"
+    keyset_ordering = None
+    keyset_approximate_count = False
+
+    def use_keyset_pagination(self):
+        return (getattr(settings, "RACING_KEYSET_PAGINATION", False)
+                or self.cursor_param in self.request.GET)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(
+            queryset,
+            page_size,
+            ordering=self.keyset_ordering,
+            approximate_count=self.keyset_approximate_count,
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_param))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get("page_obj")
+        if isinstance(page, CursorPage):
+            context.update(
+                cursor_page_context(self.request, page, self.cursor_param)
+            )
+        elif page is not None:
+            context["page_window"] = range(
+                max(page.number - 2, 1),
+                min(page.number + 2, page.paginator.num_pages) + 1,
+            )
+        return context
@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from racing.models import (LapTime,
+                           PersonalBest,
+                           Race,
+                           RaceResult,
+                           RaceTrack,)
+
+BATCH_SIZE = 2000
+
+
+def record_race(track_id, started_at, results, using="default"):
+    """
+    Store a race reported by a timing system in a fixed number of queries,
+    however many laps it holds.
+
+    ``results`` is a list of dicts with ``pilot_id``, ``drone_id``, an
+    optional ``position`` and ``laps``, the lap times as ``timedelta``
+    objects in the order they were driven. The track record and the
+    pilots' personal bests are compared against the race's fastest laps
+    only, never recomputed from the whole lap history.
+    """
+    with transaction.atomic(using=using):
+        race = Race.objects.using(using).create(
+            track_id=track_id, started_at=started_at
+        )
+        race_results = RaceResult.objects.using(using).bulk_create([
+            RaceResult(
+                race=race,
+                pilot_id=entry["pilot_id"],
+                drone_id=entry["drone_id"],
+                position=entry.get("position"),
+                total_time=sum(entry["laps"], timedelta()) if entry["laps"] else None,
+                best_lap=min(entry["laps"], default=None),
+            )
+            for entry in results
+        ])
+        # bulk_create only returns primary keys on some databases.
+        if race_results and race_results[0].pk is None:
+            result_ids = dict(
+                RaceResult.objects.using(using).filter(race=race)
+                .values_list("pilot_id", "pk")
+            )
+        else:
+            result_ids = {result.pilot_id: result.pk for result in race_results}
+
+        LapTime.objects.using(using).bulk_create(
+            (
+                LapTime(
+                    result_id=result_ids[entry["pilot_id"]],
+                    track_id=track_id,
+                    pilot_id=entry["pilot_id"],
+                    lap_number=number,
+                    time=time,
+                )
+                for entry in results
+                for number, time in enumerate(entry["laps"], start=1)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+        bests = {
+            result.pilot_id: result.best_lap
+            for result in race_results
+            if result.best_lap is not None
+        }
+        if bests:
+            _improve_track_record(track_id, min(bests.values()), using)
+            _improve_personal_bests(race, bests, using)
+    return race
+
+
+def _improve_track_record(track_id, time, using):
+    RaceTrack.objects.using(using).filter(
+        Q(record_time__isnull=True) | Q(record_time__gt=time), pk=track_id,
+    ).update(record_time=time, updated_at=timezone.now())
+
+
+def _improve_personal_bests(race, bests, using):
+    existing = {
+        best.pilot_id: best
+        for best in PersonalBest.objects.using(using).select_for_update()
+        .filter(track_id=race.track_id, pilot_id__in=bests)
+    }
+    created, improved = [], []
+    for pilot_id, time in bests.items():
+        best = existing.get(pilot_id)
+        if best is None:
+            created.append(PersonalBest(
+                pilot_id=pilot_id, track_id=race.track_id, race=race, time=time,
+            ))
+        elif time < best.time:
+            best.time, best.race = time, race
+            improved.append(best)
+    PersonalBest.objects.using(using).bulk_create(created)
+    PersonalBest.objects.using(using).bulk_update(improved, ["time", "race"])
+
+
+def fastest_laps(track, limit=10):
+    """The ``limit`` fastest laps ever driven on ``track``, best first."""
+    return (
+        LapTime.objects.filter(track=track)
+        .select_related("pilot")
+        .order_by("time", "pk")[:limit]
+    )
+
+
+def refresh_records(track_id, pilot_ids, using="default"):
+    """
+    Recompute the track record and the given pilots' personal bests after
+    laps were deleted. Each value is one seek on the lap-time indexes.
+    """
+    laps = LapTime.objects.using(using).filter(track_id=track_id)
+    record = laps.order_by("time").values_list("time", flat=True).first()
+    RaceTrack.objects.using(using).filter(pk=track_id).exclude(
+        record_time=record
+    ).update(record_time=record, updated_at=timezone.now())
+
+    for pilot_id in pilot_ids:
+        fastest = (
+            laps.filter(pilot_id=pilot_id)
+            .order_by("time")
+            .values_list("time", "result__race_id")
+            .first()
+        )
+        if fastest is None:
+            PersonalBest.objects.using(using).filter(
+                pilot_id=pilot_id, track_id=track_id
+            ).delete()
+        else:
+            PersonalBest.objects.using(using).update_or_create(
+                pilot_id=pilot_id,
+                track_id=track_id,
+                defaults={"time": fastest[0], "race_id": fastest[1]},
+            )
@@ -0,0 +1,344 @@
+import re
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from accounts.models import Pilot
+from racing.models import Drone, Manufacturer, RaceTrack
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchIndex:
+    """
+    Describes the text searchable for one model: ``columns`` maps the name
+    of each index column to the ORM path its value is read from.
+    """
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns
+        self.table = f"{model._meta.db_table}_fts"
+
+    def rows(self, pks=None):
+        queryset = self.model._default_manager.order_by()
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        return queryset.values_list("pk", *self.columns.values())
+
+
+INDEXES = {
+    Drone: SearchIndex(Drone, {
+        "model_name": "model_name",
+        "manufacturer_name": "manufacturer__name",
+    }),
+    Manufacturer: SearchIndex(Manufacturer, {
+        "name": "name",
+    }),
+    Pilot: SearchIndex(Pilot, {
+        "username": "username",
+        "first_name": "first_name",
+        "last_name": "last_name",
+    }),
+    RaceTrack: SearchIndex(RaceTrack, {
+        "name": "name",
+        "location": "location",
+    }),
+}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text or "")
+
+
+class IContainsSearchBackend:
+    """Plain ``icontains`` filtering, for databases without a text index."""
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def install(self):
+        pass
+
+    def missing(self):
+        """Names of the index tables or indexes ``install()`` would create."""
+        return []
+
+    def rebuild(self, model):
+        pass
+
+    def update(self, model, pks):
+        pass
+
+    def delete(self, model, pks):
+        pass
+
+    def filter(self, queryset, text):
+        text = (text or "").strip()
+        if not text:
+            return queryset
+        condition = Q()
+        for path in INDEXES[queryset.model].columns.values():
+            condition |= Q(**{f"{path}__icontains": text})
+        return queryset.filter(condition)
+
+    def rank(self, queryset, text):
+        """
+        ``filter()`` with the best matches first, where the backend can
+        rank them, and the queryset's own ordering breaking ties.
+        """
+        return self.filter(queryset, text)
+
+    def search(self, model, text, limit=20):
+        queryset = self.rank(model._default_manager.all(), text)
+        return list(queryset.values_list("pk", flat=True)[:limit])
+
+    @staticmethod
+    def _order_by_rank(queryset, rank):
+        # ``rank`` sorts ascending: better matches have lower values.
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.annotate(search_rank=rank).order_by("search_rank",
+                                                            *ordering)
+
+
+class SQLiteFTSSearchBackend(IContainsSearchBackend):
+    """
+    SQLite FTS5 virtual tables, one per model, keyed on the model's primary
+    key as ``rowid`` and kept in sync by ``racing.signals``.
+    """
+
+    batch_size = 2000
+    max_params = 500
+
+    def _execute(self, sql, params=()):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def install(self):
+        for index in INDEXES.values():
+            self._execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} USING fts5("
+                f"{', '.join(index.columns)}, "
+                f"tokenize = 'unicode61 remove_diacritics 2', "
+                f"prefix = '2 3')"
+            )
+
+    def missing(self):
+        tables = set(connections[self.using].introspection.table_names())
+        return [index.table for index in INDEXES.values()
+                if index.table not in tables]
+
+    def _insert(self, index, rows):
+        columns = ", ".join(index.columns)
+        placeholders = ", ".join(["%s"] * (len(index.columns) + 1))
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {index.table} (rowid, {columns}) "
+                f"VALUES ({placeholders})",
+                [[value or "" for value in row] for row in rows],
+            )
+
+    def rebuild(self, model):
+        index = INDEXES[model]
+        with transaction.atomic(using=self.using):
+            self._execute(f"DELETE FROM {index.table}")
+            batch = []
+            for row in index.rows().iterator(chunk_size=self.batch_size):
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._insert(index, batch)
+                    batch = []
+            if batch:
+                self._insert(index, batch)
+
+    def _chunks(self, pks):
+        pks = list(pks)
+        for start in range(0, len(pks), self.max_params):
+            yield pks[start:start + self.max_params]
+
+    def update(self, model, pks):
+        index = INDEXES[model]
+        with transaction.atomic(using=self.using):
+            for chunk in self._chunks(pks):
+                self.delete(model, chunk)
+                self._insert(index, index.rows(chunk))
+
+    def delete(self, model, pks):
+        for chunk in self._chunks(pks):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            self._execute(
+                f"DELETE FROM {INDEXES[model].table} "
+                f"WHERE rowid IN ({placeholders})",
+                chunk,
+            )
+
+    @staticmethod
+    def match_expression(tokens):
+        # Every token must match the start of a word.
+        return " ".join('"%s"*' % token.replace('"', '""') for token in tokens)
+
+    def filter(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return super().filter(queryset, text)
+        index = INDEXES[queryset.model]
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {index.table} WHERE {index.table} MATCH %s",
+            [self.match_expression(tokens)],
+        ))
+
+    def rank(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return super().rank(queryset, text)
+        index = INDEXES[queryset.model]
+        quote_name = connections[self.using].ops.quote_name
+        row = (f"{quote_name(queryset.model._meta.db_table)}."
+               f"{quote_name(queryset.model._meta.pk.column)}")
+        # FTS5's rank is the negated bm25 score, so lower is better.
+        rank = RawSQL(
+            f"SELECT rank FROM {index.table} WHERE {index.table} MATCH %s "
+            f"AND rowid = {row}",
+            [self.match_expression(tokens)],
+            output_field=FloatField(),
+        )
+        return self._order_by_rank(self.filter(queryset, text), rank)
+
+
+class PostgresSearchBackend(IContainsSearchBackend):
+    """
+    PostgreSQL ``tsvector`` matching over GIN expression indexes, plus
+    ``pg_trgm`` indexes that make the admin's ``icontains`` searches
+    indexable. The indexes are maintained by PostgreSQL itself, so
+    ``update`` and ``delete`` have nothing to do.
+    """
+
+    config = "simple"
+
+    def _tables(self, index):
+        """
+        Group the index columns by table: local columns first, then one
+        entry per foreign key whose related columns are searched.
+        """
+        local, related = [], {}
+        for path in index.columns.values():
+            if "__" in path:
+                fk_name, column = path.split("__", 1)
+                related.setdefault(fk_name, []).append(column)
+            else:
+                local.append(path)
+        yield None, index.model, local
+        for fk_name, columns in related.items():
+            fk = index.model._meta.get_field(fk_name)
+            yield fk, fk.related_model, columns
+
+    def _vector(self, model, columns, qualified=False):
+        table = connections[self.using].ops.quote_name(model._meta.db_table)
+        parts = []
+        for name in columns:
+            column = model._meta.get_field(name).column
+            column = f"{table}.{column}" if qualified else column
+            parts.append(f"coalesce({column}, '')")
+        document = " || ' ' || ".join(parts)
+        return f"to_tsvector('{self.config}', {document})"
+
+    def install(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for index in INDEXES.values():
+                for _, model, columns in self._tables(index):
+                    table = model._meta.db_table
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_tsv_idx "
+                        f"ON {table} USING gin ({self._vector(model, columns)})"
+                    )
+                    for name in columns:
+                        column = model._meta.get_field(name).column
+                        cursor.execute(
+                            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx "
+                            f"ON {table} USING gin ({column} gin_trgm_ops)"
+                        )
+
+    def missing(self):
+        names = [f"{model._meta.db_table}_tsv_idx"
+                 for index in INDEXES.values()
+                 for _, model, _ in self._tables(index)]
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)",
+                [names],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+        return [name for name in names if name not in existing]
+
+    @staticmethod
+    def tsquery(tokens):
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def _condition(self, index, tokens):
+        query = self.tsquery(tokens)
+        sql, params = [], []
+        for fk, model, columns in self._tables(index):
+            match = (f"{self._vector(model, columns, qualified=fk is None)} "
+                     f"@@ to_tsquery('{self.config}', %s)")
+            if fk is not None:
+                table = connections[self.using].ops.quote_name(
+                    index.model._meta.db_table
+                )
+                match = (f"{table}.{fk.column} IN (SELECT {model._meta.pk.column} "
+                         f"FROM {model._meta.db_table} WHERE {match})")
+            sql.append(match)
+            params.append(query)
+        return " OR ".join(sql), params
+
+    def filter(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return super().filter(queryset, text)
+        sql, params = self._condition(INDEXES[queryset.model], tokens)
+        return queryset.filter(RawSQL(sql, params, output_field=BooleanField()))
+
+    def rank(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return super().rank(queryset, text)
+        model = queryset.model
+        columns = next(self._tables(INDEXES[model]))[2]
+        rank = RawSQL(
+            f"-ts_rank({self._vector(model, columns, qualified=True)}, "
+            f"to_tsquery('{self.config}', %s))",
+            [self.tsquery(tokens)],
+            output_field=FloatField(),
+        )
+        return self._order_by_rank(self.filter(queryset, text), rank)
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteFTSSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(using="default"):
+    backend = getattr(settings, "RACING_SEARCH_BACKEND", None)
+    if backend is not None:
+        backend_class = import_string(backend)
+    else:
+        vendor = connections[using].vendor
+        backend_class = VENDOR_BACKENDS.get(vendor, IContainsSearchBackend)
+    return backend_class(using)
+
+
+def search_filter(queryset, text, ranked=False):
+    """
+    The rows of ``queryset`` matching ``text``; with ``ranked``, the best
+    matches come first. Keyset pagination orders by its keyset instead.
+    """
+    backend = get_search_backend(queryset.db)
+    if ranked:
+        return backend.rank(queryset, text)
+    return backend.filter(queryset, text)
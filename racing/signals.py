@@ -0,0 +1,310 @@
+import threading
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (m2m_changed,
+                                      post_delete,
+                                      post_save,
+                                      pre_delete,
+                                      pre_save,)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.leaderboard import get_leaderboard
+from accounts.models import Pilot
+from racing import analytics, counters, stats
+from racing.models import Drone, Manufacturer, Race, RaceResult, RaceTrack
+from racing.races import refresh_records
+from racing.search import get_search_backend
+
+
+def _is_login_only(update_fields):
+    return update_fields is not None and set(update_fields) == {"last_login"}
+
+
+def _after_commit(using, function, *args):
+    transaction.on_commit(partial(function, *args), using=using)
+
+
+# Leaderboard; shared by every worker in production, like the dashboard
+# statistics below, so it is only updated once the change has committed.
+@receiver(post_save, sender=Pilot)
+def leaderboard_saved(sender, instance, update_fields, using, **kwargs):
+    if not _is_login_only(update_fields):
+        _after_commit(using, get_leaderboard().update,
+                      instance.pk, instance.skill_rating)
+
+
+@receiver(post_delete, sender=Pilot)
+def leaderboard_deleted(sender, instance, using, **kwargs):
+    _after_commit(using, get_leaderboard().remove, instance.pk)
+
+
+# Fleet analytics; other workers would reload the uncommitted columns under
+# the new version and keep them, so they are only invalidated after commit.
+@receiver(post_save, sender=Drone)
+@receiver(post_delete, sender=Drone)
+def drone_columns_changed(sender, using, **kwargs):
+    _after_commit(using, analytics.invalidate)
+
+
+# Race records. Deleting a race sends a signal per result; the records
+# they held are recomputed once per track after the delete has committed,
+# when the next fastest laps are one index seek away.
+_deleted_results = threading.local()
+
+
+def _pending_records(using):
+    pending = getattr(_deleted_results, "pending", None)
+    if pending is None:
+        pending = _deleted_results.pending = {}
+    return pending.setdefault(using, {"races": {}, "tracks": {}})
+
+
+@receiver(pre_delete, sender=RaceResult)
+def race_result_deleted(sender, instance, using, **kwargs):
+    pending = _pending_records(using)
+    races = pending["races"]
+    if RaceResult.race.is_cached(instance):
+        races[instance.race_id] = instance.race.track_id
+    elif instance.race_id not in races:
+        races[instance.race_id] = (
+            Race.objects.using(using).filter(pk=instance.race_id)
+            .values_list("track_id", flat=True).get()
+        )
+    pending["tracks"].setdefault(
+        races[instance.race_id], set()
+    ).add(instance.pilot_id)
+    _after_commit(using, _refresh_deleted_records, using)
+
+
+def _refresh_deleted_records(using):
+    pending = _pending_records(using)
+    tracks = pending["tracks"]
+    pending["races"], pending["tracks"] = {}, {}
+    for track_id, pilot_ids in tracks.items():
+        refresh_records(track_id, sorted(pilot_ids), using=using)
+
+
+# Counter columns; connected before the dashboard statistics, which read
+# them.
+@receiver(post_save, sender=Drone)
+def drone_counted(sender, instance, created, using, **kwargs):
+    previous = getattr(instance, "_previous_manufacturer_id", None)
+    if created:
+        counters.adjust_drone_counts([instance.manufacturer_id], 1, using)
+    elif previous is not None and previous != instance.manufacturer_id:
+        counters.adjust_drone_counts([previous], -1, using)
+        counters.adjust_drone_counts([instance.manufacturer_id], 1, using)
+
+
+@receiver(post_delete, sender=Drone)
+def drone_uncounted(sender, instance, using, **kwargs):
+    counters.adjust_drone_counts([instance.manufacturer_id], -1, using)
+
+
+@receiver(pre_delete, sender=Pilot)
+def pilot_uncounted(sender, instance, using, **kwargs):
+    # The through-table rows go without an m2m_changed signal.
+    counters.pilot_deleted(instance.pk, using)
+
+
+@receiver(m2m_changed, sender=Drone.pilots.through)
+def assignment_counted(sender, instance, action, reverse, pk_set, using,
+                       **kwargs):
+    changed = _assignment_ids(instance, action, reverse, pk_set)
+    if changed is None:
+        return
+    drone_ids, pilot_ids = changed
+    if action == "post_remove":
+        counters.recount_pilots(drone_ids, using)
+        return
+    # A forward change touches one drone and counts its pilots; a reverse
+    # one touches one pilot on each drone.
+    delta = 1 if reverse else len(pilot_ids)
+    if action == "post_clear":
+        delta = -delta
+    if delta:
+        counters.adjust_pilot_counts(drone_ids, delta, using)
+
+
+# Dashboard statistics. The cache is shared by every worker and outlives
+# the transaction, so it is only updated once the change has committed.
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_save, sender=RaceTrack)
+def count_created(sender, instance, created, using, **kwargs):
+    if created:
+        _after_commit(using, stats.adjust_count, sender, 1)
+
+
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_delete, sender=RaceTrack)
+def count_deleted(sender, instance, using, **kwargs):
+    _after_commit(using, stats.adjust_count, sender, -1)
+
+
+@receiver(post_save, sender=Pilot)
+def pilot_saved(sender, instance, created, update_fields, using, **kwargs):
+    if created:
+        _after_commit(using, stats.adjust_count, Pilot, 1)
+    if not _is_login_only(update_fields):
+        _after_commit(using, stats.pilot_saved, instance)
+
+
+@receiver(post_delete, sender=Pilot)
+def pilot_deleted(sender, instance, using, **kwargs):
+    _after_commit(using, stats.adjust_count, Pilot, -1)
+    _after_commit(using, stats.pilot_deleted, instance.pk)
+    # The pilot's through-table rows are removed without an m2m_changed signal.
+    _after_commit(using, stats.refresh_popular_drones)
+
+
+@receiver(post_save, sender=Drone)
+def drone_saved(sender, instance, created, using, **kwargs):
+    if created:
+        _after_commit(using, stats.adjust_count, Drone, 1)
+    _after_commit(using, stats.drones_changed, [instance.pk])
+
+
+@receiver(post_delete, sender=Drone)
+def drone_deleted(sender, instance, using, **kwargs):
+    _after_commit(using, stats.adjust_count, Drone, -1)
+    _after_commit(using, stats.drone_deleted, instance.pk)
+
+
+def _assignment_ids(instance, action, reverse, pk_set):
+    """
+    Return the ``(drone_ids, pilot_ids)`` touched by a ``Drone.pilots``
+    change, or ``None`` for the actions that do not change anything yet.
+    """
+    if action == "pre_clear":
+        related = instance.drones if reverse else instance.pilots
+        instance._cleared_pks = set(related.values_list("pk", flat=True))
+        return None
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return None
+
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_pks", set())
+    if reverse:
+        return set(pk_set), {instance.pk}
+    return {instance.pk}, set(pk_set)
+
+
+@receiver(m2m_changed, sender=Drone.pilots.through)
+def drone_pilots_changed(sender, instance, action, reverse, pk_set, using,
+                         **kwargs):
+    changed = _assignment_ids(instance, action, reverse, pk_set)
+    if changed is not None:
+        _after_commit(using, stats.drones_changed, changed[0])
+
+
+# Full-text search index
+def install_search_index(sender, using, **kwargs):
+    get_search_backend(using).install()
+
+
+@receiver(post_save, sender=Drone)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_save, sender=Pilot)
+@receiver(post_save, sender=RaceTrack)
+def index_saved(sender, instance, using, update_fields, **kwargs):
+    if _is_login_only(update_fields):
+        return
+    backend = get_search_backend(using)
+    backend.update(sender, [instance.pk])
+    if sender is Manufacturer:
+        # Drones are searchable by their manufacturer's name as well.
+        backend.update(
+            Drone,
+            Drone.objects.filter(manufacturer=instance)
+            .values_list("pk", flat=True),
+        )
+
+
+@receiver(post_delete, sender=Drone)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_delete, sender=Pilot)
+@receiver(post_delete, sender=RaceTrack)
+def index_deleted(sender, instance, using, **kwargs):
+    get_search_backend(using).delete(sender, [instance.pk])
+
+
+# Detail page versions: every page showing data of another object is
+# bumped with it, so the detail views can answer from updated_at alone.
+# Drone pages are the exception for their pilots: DroneDetailView also
+# reads the pilots' updated_at, so pilot writes stay O(1).
+def _touch(queryset):
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Drone)
+def remember_drone_manufacturer(sender, instance, **kwargs):
+    instance._previous_manufacturer_id = (
+        Drone.objects
+        .filter(pk=instance.pk)
+        .values_list("manufacturer_id", flat=True)
+        .first()
+    ) if instance.pk else None
+
+
+@receiver(post_save, sender=Drone)
+def drone_version_changed(sender, instance, **kwargs):
+    manufacturer_ids = {
+        instance.manufacturer_id,
+        getattr(instance, "_previous_manufacturer_id", None),
+    }
+    _touch(Manufacturer.objects.filter(pk__in=manufacturer_ids - {None}))
+    _touch(Pilot.objects.filter(drones=instance))
+
+
+@receiver(pre_delete, sender=Drone)
+def drone_version_deleted(sender, instance, **kwargs):
+    _touch(Manufacturer.objects.filter(pk=instance.manufacturer_id))
+    _touch(Pilot.objects.filter(drones=instance))
+
+
+@receiver(post_save, sender=Manufacturer)
+def manufacturer_version_changed(sender, instance, created, **kwargs):
+    if not created:
+        _touch(Drone.objects.filter(manufacturer=instance))
+        _touch(Pilot.objects.filter(drones__manufacturer=instance))
+
+
+@receiver(pre_save, sender=Pilot)
+def remember_pilot_username(sender, instance, update_fields, **kwargs):
+    instance._previous_username = (
+        Pilot.objects
+        .filter(pk=instance.pk)
+        .values_list("username", flat=True)
+        .first()
+    ) if instance.pk and not _is_login_only(update_fields) else None
+
+
+@receiver(post_save, sender=Pilot)
+def pilot_version_changed(sender, instance, created, update_fields, **kwargs):
+    # Drone pages are dated by their pilots' updated_at as well; manufacturer
+    # pages only show the pilots' usernames.
+    previous = getattr(instance, "_previous_username", None)
+    if not created and previous not in (None, instance.username):
+        _touch(Manufacturer.objects.filter(drones__pilots=instance))
+
+
+@receiver(pre_delete, sender=Pilot)
+def pilot_version_deleted(sender, instance, **kwargs):
+    _touch(Drone.objects.filter(pilots=instance))
+    _touch(Manufacturer.objects.filter(drones__pilots=instance))
+
+
+@receiver(m2m_changed, sender=Drone.pilots.through)
+def assignment_version_changed(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    changed = _assignment_ids(instance, action, reverse, pk_set)
+    if changed is None:
+        return
+    drone_ids, pilot_ids = changed
+    # Bumping the pilots also dates the pages of the other drones they fly,
+    # which show each pilot's fleet size.
+    _touch(Pilot.objects.filter(pk__in=pilot_ids))
+    _touch(Drone.objects.filter(pk__in=drone_ids))
+    _touch(Manufacturer.objects.filter(drones__in=drone_ids))
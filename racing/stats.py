@@ -0,0 +1,212 @@
+from django.core.cache import cache
+
+from accounts.models import Pilot
+from racing.models import Drone, Manufacturer, RaceTrack
+
+TOP_N = 5
+
+COUNT_KEYS = {
+    "num_pilots": Pilot,
+    "num_drones": Drone,
+    "num_manufacturers": Manufacturer,
+    "num_race_tracks": RaceTrack,
+}
+TOP_PILOTS_KEY = "top_pilots"
+POPULAR_DRONES_KEY = "popular_drones"
+
+CACHE_PREFIX = "racing:dashboard:"
+# The entries are kept up to date by the signals; the timeout only bounds
+# how long drift from writes that send none (raw SQL, bulk updates) lasts.
+CACHE_TIMEOUT = 60 * 60
+
+
+def _key(name):
+    return CACHE_PREFIX + name
+
+
+def _top_pilots_queryset():
+    return (
+        Pilot.objects
+        .order_by("-skill_rating", "username")
+        .values_list("pk", "username", "skill_rating")[:TOP_N]
+    )
+
+
+def _top_pilots(rows):
+    return [
+        {"pk": pk, "username": username, "skill_rating": skill_rating}
+        for pk, username, skill_rating in rows
+    ]
+
+
+def _popular_drones_queryset():
+    return (
+        Drone.objects
+        .order_by("-pilot_count", "model_name")
+        .values_list("pk", "model_name", "pilot_count")[:TOP_N]
+    )
+
+
+def _popular_drones(rows):
+    return [
+        {"pk": pk, "model_name": model_name, "pilot_count": pilot_count}
+        for pk, model_name, pilot_count in rows
+    ]
+
+
+def _query_top_pilots():
+    return _top_pilots(_top_pilots_queryset())
+
+
+def _query_popular_drones():
+    return _popular_drones(_popular_drones_queryset())
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+def _pilot_sort_key(entry):
+    return -entry["skill_rating"], entry["username"]
+
+
+def _drone_sort_key(entry):
+    return -entry["pilot_count"], entry["model_name"]
+
+
+def rebuild_dashboard_stats():
+    stats = {name: model.objects.count() for name, model in COUNT_KEYS.items()}
+    stats[TOP_PILOTS_KEY] = _query_top_pilots()
+    stats[POPULAR_DRONES_KEY] = _query_popular_drones()
+    cache.set_many(
+        {_key(name): value for name, value in stats.items()},
+        timeout=CACHE_TIMEOUT,
+    )
+    return stats
+
+
+async def arebuild_dashboard_stats():
+    """
+    ``rebuild_dashboard_stats()`` for async views. Django runs the async
+    ORM calls of a request one after another on a single thread, so the
+    queries are awaited in turn rather than gathered.
+    """
+    stats = {name: await model.objects.acount()
+             for name, model in COUNT_KEYS.items()}
+    stats[TOP_PILOTS_KEY] = _top_pilots(await _alist(_top_pilots_queryset()))
+    stats[POPULAR_DRONES_KEY] = _popular_drones(
+        await _alist(_popular_drones_queryset())
+    )
+    await cache.aset_many(
+        {_key(name): value for name, value in stats.items()},
+        timeout=CACHE_TIMEOUT,
+    )
+    return stats
+
+
+def get_dashboard_stats():
+    names = [*COUNT_KEYS, TOP_PILOTS_KEY, POPULAR_DRONES_KEY]
+    cached = cache.get_many([_key(name) for name in names])
+    if len(cached) != len(names):
+        return rebuild_dashboard_stats()
+    return {name: cached[_key(name)] for name in names}
+
+
+async def aget_dashboard_stats():
+    names = [*COUNT_KEYS, TOP_PILOTS_KEY, POPULAR_DRONES_KEY]
+    cached = await cache.aget_many([_key(name) for name in names])
+    if len(cached) != len(names):
+        return await arebuild_dashboard_stats()
+    return {name: cached[_key(name)] for name in names}
+
+
+def adjust_count(model, delta):
+    for name, counted_model in COUNT_KEYS.items():
+        if counted_model is model:
+            try:
+                cache.incr(_key(name), delta)
+            except ValueError:
+                # Not cached yet; the next read rebuilds it from scratch.
+                pass
+            return
+
+
+def _merge_top(name, entry, sort_key, requery, demoted):
+    """
+    Merge ``entry`` into the cached top-N list ``name``.
+
+    ``demoted`` is called with the cached copy of an already listed entry and
+    tells whether the entry may now rank below an outsider the list never
+    kept track of; the list is then re-queried instead of merged.
+    """
+    top = cache.get(_key(name))
+    if top is None:
+        return
+    listed = next((item for item in top if item["pk"] == entry["pk"]), None)
+    if listed is not None and demoted(listed, entry):
+        cache.set(_key(name), requery(), timeout=CACHE_TIMEOUT)
+        return
+    candidates = sorted(
+        [item for item in top if item["pk"] != entry["pk"]] + [entry],
+        key=sort_key,
+    )
+    if listed is None and len(top) >= TOP_N and candidates[-1] is entry:
+        return
+    cache.set(_key(name), candidates[:TOP_N], timeout=CACHE_TIMEOUT)
+
+
+def _discard_top(name, pk, requery):
+    top = cache.get(_key(name))
+    if top is not None and any(item["pk"] == pk for item in top):
+        cache.set(_key(name), requery(), timeout=CACHE_TIMEOUT)
+
+
+def _pilot_demoted(listed, entry):
+    return (entry["skill_rating"] < listed["skill_rating"]
+            or entry["username"] != listed["username"])
+
+
+def _drone_demoted(listed, entry):
+    return (entry["pilot_count"] < listed["pilot_count"]
+            or entry["model_name"] != listed["model_name"])
+
+
+def pilot_saved(pilot):
+    entry = {
+        "pk": pilot.pk,
+        "username": pilot.username,
+        "skill_rating": pilot.skill_rating,
+    }
+    _merge_top(TOP_PILOTS_KEY, entry, _pilot_sort_key,
+               _query_top_pilots, _pilot_demoted)
+
+
+def pilot_deleted(pk):
+    _discard_top(TOP_PILOTS_KEY, pk, _query_top_pilots)
+
+
+def drones_changed(drone_ids):
+    """
+    Refresh the popular-drones list after ``drone_ids`` were saved or had
+    pilots (un)assigned. Only the affected drones' counters are read.
+    """
+    if not drone_ids or cache.get(_key(POPULAR_DRONES_KEY)) is None:
+        return
+    for pk, model_name, pilot_count in (
+        Drone.objects
+        .filter(pk__in=drone_ids)
+        .values_list("pk", "model_name", "pilot_count")
+    ):
+        entry = {"pk": pk, "model_name": model_name, "pilot_count": pilot_count}
+        _merge_top(POPULAR_DRONES_KEY, entry, _drone_sort_key,
+                   _query_popular_drones, _drone_demoted)
+
+
+def drone_deleted(pk):
+    _discard_top(POPULAR_DRONES_KEY, pk, _query_popular_drones)
+
+
+def refresh_popular_drones():
+    if cache.get(_key(POPULAR_DRONES_KEY)) is not None:
+        cache.set(_key(POPULAR_DRONES_KEY), _query_popular_drones(),
+                  timeout=CACHE_TIMEOUT)
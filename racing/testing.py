@@ -0,0 +1,85 @@
+"""
+Test helpers shared by the racing and accounts test modules: a seeded
+generated dataset and the base test cases built on it.
+"""
+from itertools import chain
+
+from django.core.cache import cache, caches
+from django.test import TestCase
+
+import generate_fixtures
+from accounts.leaderboard import get_leaderboard
+from accounts.models import Pilot
+from racing import analytics
+from racing.bulk_import import BulkImporter
+from racing.models import Drone, Manufacturer, RaceTrack
+from racing.stats import rebuild_dashboard_stats
+
+MANUFACTURERS = 20
+PILOTS = 200
+DRONES = 400
+RACETRACKS = 30
+
+
+def load_dataset():
+    """Insert a seeded generated dataset the way ``--database`` does."""
+    importer = BulkImporter()
+    records = chain(
+        generate_fixtures.generate_manufacturers(MANUFACTURERS, "tests"),
+        generate_fixtures.generate_pilots(PILOTS, "tests", workers=1),
+        generate_fixtures.generate_drones(DRONES, MANUFACTURERS, PILOTS, "tests"),
+        generate_fixtures.generate_racetracks(RACETRACKS, "tests"),
+    )
+    for record in records:
+        importer.add(record)
+    importer.finish()
+
+
+class DatasetTestCase(TestCase):
+    """
+    Runs every test against the generated dataset, logged in as pilot 1,
+    with the caches and the leaderboard reset to match the database.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        load_dataset()
+        cls.pilot = Pilot.objects.get(pk=1)
+        cls.manufacturer = Manufacturer.objects.get(pk=1)
+        cls.drone = Drone.objects.get(pk=1)
+        cls.racetrack = RaceTrack.objects.get(pk=1)
+
+    def setUp(self):
+        # Start every test from the same cache state.
+        cache.clear()
+        caches["template_fragments"].clear()
+        rebuild_dashboard_stats()
+        analytics.invalidate()
+        get_leaderboard().reload()
+        self.client.force_login(self.pilot)
+
+    def assign_many(self, pilots=50, drones=50):
+        """Fan out the test pilot and the test drone to many relations."""
+        self.drone.pilots.add(*Pilot.objects.order_by("pk")[:pilots])
+        self.pilot.drones.add(*Drone.objects.order_by("pk")[:drones])
+
+
+class QueryCountTestCase(DatasetTestCase):
+    """
+    Pins the number of queries each view runs against the dataset, so an
+    N+1 regression fails here instead of in production.
+
+    Every request pays 2 queries for the session and the user.
+    """
+
+    def assertQueries(self, expected, url, method="get", data=None,
+                      status=200, **extra):
+        # Requests commit in production, so their on_commit callbacks
+        # (the dashboard statistics) are run and counted.
+        with (self.assertNumQueries(expected),
+              self.captureOnCommitCallbacks(execute=True)):
+            response = getattr(self.client, method)(url, data, **extra)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status)
+        return response
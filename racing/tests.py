@@ -1,3 +1,1253 @@
-from django.test import TestCase
+import base64
+import csv
+import importlib
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.db.models.signals import m2m_changed
+from django.test import Client, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+
+import accounts.urls
+import config.urls
+import racing.urls
+from accounts.models import Pilot
+from config.instrumentation import TEMPLATE_SECONDS
+from racing import analytics, bulk_import, counters, stats
+from racing.assignments import (Assignment,
+                                assign_drones,
+                                assigned_drone_ids,
+                                toggle_assignment,)
+from racing.management.commands.explain_views import ROUTES
+from racing.models import (Drone,
+                           Manufacturer,
+                           PersonalBest,
+                           Race,
+                           RaceResult,
+                           RaceTrack,)
+from racing.bulk_import import BulkImporter, iter_csv
+from racing.checks import check_search_index
+from racing.pagination import (CursorPaginator,
+                               InvalidCursor,
+                               decode_cursor,
+                               encode_cursor,)
+from racing.search import (IContainsSearchBackend,
+                           SQLiteFTSSearchBackend,
+                           get_search_backend,
+                           search_filter,)
+from racing.stats import get_dashboard_stats, rebuild_dashboard_stats
+from racing.testing import (DRONES,
+                            MANUFACTURERS,
+                            DatasetTestCase,
+                            QueryCountTestCase,)
+from racing.views import (
+    MAX_BATCH_DRONES,
+    DroneExportView,
+    DroneListView,
+    ManufacturerDetailView,
+    ManufacturerListView,
+    RaceTrackListView,
+)
+
+
+class DashboardQueryTests(QueryCountTestCase):
+    def test_index_reads_cached_statistics(self):
+        self.assertQueries(2, reverse("racing:index"))
+
+    def test_index_rebuilds_missing_statistics_once(self):
+        cache.clear()
+        self.assertQueries(8, reverse("racing:index"))
+        self.assertQueries(2, reverse("racing:index"))
+
+
+class DashboardStatsTests(DatasetTestCase):
+    """The incrementally updated statistics match a rebuild from scratch."""
+
+    def assertStatsFresh(self):
+        cached = get_dashboard_stats()
+        cache.clear()
+        self.assertEqual(cached, rebuild_dashboard_stats())
+
+    def committed(self):
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def test_counts_follow_creates_and_deletes(self):
+        with self.committed():
+            Manufacturer.objects.create(name="Fresh", country="Nowhere")
+            RaceTrack.objects.get(pk=2).delete()
+            Drone.objects.get(pk=5).delete()
+            Pilot.objects.get(pk=6).delete()
+        self.assertStatsFresh()
+
+    def test_rolled_back_writes_leave_the_cache_alone(self):
+        before = get_dashboard_stats()
+        with self.committed() as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Manufacturer.objects.create(name="Phantom", country="Nowhere")
+                Pilot.objects.get(pk=2).delete()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_dashboard_stats(), before)
+
+    def test_pilot_enters_and_leaves_the_top(self):
+        pilot = Pilot.objects.order_by("skill_rating").first()
+        with self.committed():
+            pilot.skill_rating = 100
+            pilot.save()
+        self.assertIn(pilot.pk, [
+            entry["pk"] for entry in get_dashboard_stats()[stats.TOP_PILOTS_KEY]
+        ])
+        self.assertStatsFresh()
+
+        # Demoted below pilots the cached list never kept track of.
+        rebuild_dashboard_stats()
+        with self.committed():
+            pilot.skill_rating = 1
+            pilot.save()
+        self.assertStatsFresh()
+
+    def test_outsider_below_the_top_is_not_merged(self):
+        top = get_dashboard_stats()[stats.TOP_PILOTS_KEY]
+        pilot = Pilot.objects.exclude(
+            pk__in=[entry["pk"] for entry in top]
+        ).order_by("skill_rating").first()
+        with (mock.patch.object(stats, "_query_top_pilots") as requery,
+              self.committed()):
+            pilot.first_name = "Unranked"
+            pilot.save()
+        requery.assert_not_called()
+        self.assertEqual(get_dashboard_stats()[stats.TOP_PILOTS_KEY], top)
+
+    def test_deleting_a_listed_pilot_or_drone_requeries(self):
+        listed = get_dashboard_stats()
+        with self.committed():
+            Pilot.objects.get(pk=listed[stats.TOP_PILOTS_KEY][0]["pk"]).delete()
+            Drone.objects.get(
+                pk=listed[stats.POPULAR_DRONES_KEY][0]["pk"]
+            ).delete()
+        self.assertStatsFresh()
+
+    def test_assignments_reorder_the_popular_drones(self):
+        drone = Drone.objects.order_by("pilot_count").first()
+        with self.committed():
+            drone.pilots.add(*Pilot.objects.order_by("pk")[:60])
+        self.assertEqual(
+            get_dashboard_stats()[stats.POPULAR_DRONES_KEY][0]["pk"], drone.pk
+        )
+        self.assertStatsFresh()
+        with self.committed():
+            drone.pilots.clear()
+        self.assertStatsFresh()
+
+    def test_entries_expire(self):
+        with mock.patch.object(cache, "set_many") as set_many:
+            rebuild_dashboard_stats()
+        self.assertEqual(set_many.call_args.kwargs["timeout"],
+                         stats.CACHE_TIMEOUT)
+        self.assertIsNotNone(stats.CACHE_TIMEOUT)
+
+
+class ManufacturerQueryTests(QueryCountTestCase):
+    def test_list(self):
+        self.assertQueries(4, reverse("racing:manufacturer-list"))
+
+    def test_list_does_not_grow_with_page_size(self):
+        with mock.patch.object(ManufacturerListView, "paginate_by", 20):
+            self.assertQueries(4, reverse("racing:manufacturer-list"))
+
+    def test_list_cursor_mode(self):
+        self.assertQueries(3, reverse("racing:manufacturer-list") + "?cursor=")
+
+    def test_search(self):
+        self.assertQueries(
+            4, reverse("racing:manufacturer-list"), data={"name": "a"}
+        )
+
+    def test_detail(self):
+        url = reverse("racing:manufacturer-detail", args=[self.manufacturer.pk])
+        self.assertQueries(7, url)
+
+    def test_detail_does_not_grow_with_fan_out(self):
+        url = reverse("racing:manufacturer-detail", args=[self.manufacturer.pk])
+        self.assign_many()
+        self.assertQueries(7, url)
+
+    def test_detail_pages_drones(self):
+        url = reverse("racing:manufacturer-detail", args=[self.manufacturer.pk])
+        with mock.patch.object(ManufacturerDetailView, "drones_per_page", 5):
+            response = self.assertQueries(7, url)
+            self.assertEqual(len(response.context["drone_list"]), 5)
+            self.assertQueries(7, url + response.context["next_page_url"])
+        self.assertQueries(4, url, data={"cursor": "x"}, status=404)
+
+    def test_detail_not_modified(self):
+        url = reverse("racing:manufacturer-detail", args=[self.manufacturer.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertQueries(3, url, HTTP_IF_NONE_MATCH=etag, status=304)
+
+    def test_analytics(self):
+        self.assertQueries(4, reverse("racing:manufacturer-analytics"))
+        self.assertQueries(3, reverse("racing:manufacturer-analytics"))
+
+    def test_export(self):
+        self.assertQueries(3, reverse("racing:manufacturer-export"))
+
+    def test_create(self):
+        url = reverse("racing:manufacturer-create")
+        self.assertQueries(2, url)
+        self.assertQueries(
+            12, url, "post", {"name": "Query Count", "country": "Testland"},
+            status=302,
+        )
+
+    def test_update(self):
+        url = reverse("racing:manufacturer-update", args=[self.manufacturer.pk])
+        self.assertQueries(3, url)
+        self.assertQueries(
+            18, url, "post", {"name": "Renamed", "country": "Testland"},
+            status=302,
+        )
+
+    def test_delete(self):
+        manufacturer = Manufacturer.objects.create(name="Empty", country="X")
+        url = reverse("racing:manufacturer-delete", args=[manufacturer.pk])
+        self.assertQueries(3, url)
+        self.assertQueries(6, url, "post", status=302)
+
+
+class RaceTrackQueryTests(QueryCountTestCase):
+    def test_list(self):
+        self.assertQueries(4, reverse("racing:racetrack-list"))
+
+    def test_list_does_not_grow_with_page_size(self):
+        with mock.patch.object(RaceTrackListView, "paginate_by", 20):
+            self.assertQueries(4, reverse("racing:racetrack-list"))
+
+    def test_detail(self):
+        url = reverse("racing:racetrack-detail", args=[self.racetrack.pk])
+        self.assertQueries(4, url)
+
+    def test_export(self):
+        self.assertQueries(3, reverse("racing:racetrack-export"))
+
+    def test_create(self):
+        url = reverse("racing:racetrack-create")
+        self.assertQueries(2, url)
+        self.assertQueries(
+            9,
+            url,
+            "post",
+            {
+                "name": "Query Loop",
+                "difficulty_level": 2,
+                "length_meters": 1200,
+                "location": "Testville",
+            },
+            status=302,
+        )
+
+    def test_update(self):
+        url = reverse("racing:racetrack-update", args=[self.racetrack.pk])
+        self.assertQueries(3, url)
+        self.assertQueries(
+            10,
+            url,
+            "post",
+            {
+                "name": "Renamed Loop",
+                "difficulty_level": 3,
+                "length_meters": 1500,
+                "location": "Testville",
+            },
+            status=302,
+        )
+
+    def test_delete(self):
+        url = reverse("racing:racetrack-delete", args=[self.racetrack.pk])
+        self.assertQueries(3, url)
+        self.assertQueries(8, url, "post", status=302)
+
+
+class DroneQueryTests(QueryCountTestCase):
+    def test_list(self):
+        self.assertQueries(5, reverse("racing:drone-list"))
+
+    def test_list_does_not_grow_with_page_size(self):
+        with mock.patch.object(DroneListView, "paginate_by", 25):
+            self.assertQueries(5, reverse("racing:drone-list"))
+
+    def test_list_does_not_grow_with_fan_out(self):
+        self.assign_many()
+        self.assertQueries(5, reverse("racing:drone-list"))
+
+    def test_detail(self):
+        url = reverse("racing:drone-detail", args=[self.drone.pk])
+        self.assertQueries(6, url)
+
+    def test_detail_does_not_grow_with_fan_out(self):
+        url = reverse("racing:drone-detail", args=[self.drone.pk])
+        self.assign_many()
+        self.assertQueries(6, url)
+
+    def test_detail_pilot_counts(self):
+        self.assign_many()
+        url = reverse("racing:drone-detail", args=[self.drone.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        pilots = response.context["drone"].pilots.all()
+        self.assertTrue(pilots)
+        for pilot in pilots:
+            self.assertEqual(pilot.num_drones, pilot.drones.count())
+        # The counts are a subquery per pilot, not a GROUP BY over the join.
+        [prefetch] = [query["sql"] for query in queries.captured_queries
+                      if 'AS "num_drones" FROM "accounts_pilot"' in query["sql"]]
+        self.assertNotIn("GROUP BY", prefetch.split('AS "num_drones"')[1])
+
+    def test_detail_is_dated_by_its_pilots(self):
+        url = reverse("racing:drone-detail", args=[self.drone.pk])
+        self.drone.pilots.add(self.pilot)
+        other = Drone.objects.exclude(pilots=self.pilot).first()
+        etag = self.client.get(url)["ETag"]
+        updated_at = Drone.objects.get(pk=self.drone.pk).updated_at
+        # The pilot's fleet grows: only the toggled drone is touched, but
+        # the pilot's fleet size on this drone's page still changes.
+        self.client.get(reverse("racing:toggle-drone-assign", args=[other.pk]))
+        self.assertEqual(
+            Drone.objects.get(pk=self.drone.pk).updated_at, updated_at
+        )
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+    def test_pilot_edits_touch_manufacturers_on_rename_only(self):
+        def manufacturer_versions():
+            return dict(Manufacturer.objects.values_list("pk", "updated_at"))
+
+        pilot = Pilot.objects.get(pk=self.pilot.pk)
+        versions = manufacturer_versions()
+        pilot.skill_rating += 1
+        pilot.save()
+        self.assertEqual(manufacturer_versions(), versions)
+        pilot.username = "renamed"
+        pilot.save()
+        self.assertNotEqual(manufacturer_versions(), versions)
+
+    def test_export(self):
+        self.assertQueries(3, reverse("racing:drone-export"))
+
+    def test_create(self):
+        url = reverse("racing:drone-create")
+        self.assertQueries(3, url)
+        self.assertQueries(
+            24,
+            url,
+            "post",
+            {
+                "model_name": "Query Counter",
+                "max_speed": 120,
+                "weight": "1.50",
+                "manufacturer": self.manufacturer.pk,
+                "pilots": [1, 2, 3],
+            },
+            status=302,
+        )
+
+    def test_update(self):
+        url = reverse("racing:drone-update", args=[self.drone.pk])
+        self.assign_many()
+        self.assertQueries(6, url)
+        # The popular drones are merged once the final state is committed,
+        # not after each intermediate write.
+        self.assertQueries(
+            27,
+            url,
+            "post",
+            {
+                "model_name": "Query Counter",
+                "max_speed": 120,
+                "weight": "1.50",
+                "manufacturer": self.manufacturer.pk,
+                "pilots": [1, 2, 3],
+            },
+            status=302,
+        )
+
+    def test_delete(self):
+        url = reverse("racing:drone-delete", args=[self.drone.pk])
+        self.assertQueries(3, url)
+        self.assertQueries(10, url, "post", status=302)
+
+    def test_toggle(self):
+        url = reverse("racing:toggle-drone-assign", args=[self.drone.pk])
+        self.pilot.drones.remove(self.drone)
+        self.assertQueries(12, url, status=302)
+        # Removing skips the drone's existence check, but the drone drops
+        # out of the cached popular drones, which are queried again.
+        self.assertQueries(12, url, status=302)
+
+    def test_batch_assign_does_not_grow_with_batch_size(self):
+        url = reverse("racing:batch-drone-assign")
+        self.pilot.drones.clear()
+        self.assertQueries(11, url, "post", {"drones": [2, 3]})
+        self.assertQueries(
+            11, url, "post", {"drones": [2, 3], "action": "unassign"}
+        )
+        drones = list(range(10, 60))
+        self.assertQueries(11, url, "post", {"drones": drones})
+        # One of the drones drops out of the cached popular drones.
+        self.assertQueries(
+            12, url, "post", {"drones": drones, "action": "unassign"}
+        )
+
+    def test_batch_assign_caps_the_batch_size(self):
+        url = reverse("racing:batch-drone-assign")
+        assigned = set(self.pilot.drones.values_list("pk", flat=True))
+        drones = list(range(1, MAX_BATCH_DRONES + 2))
+        self.assertQueries(2, url, "post", {"drones": drones}, status=400)
+        self.assertEqual(
+            set(self.pilot.drones.values_list("pk", flat=True)), assigned
+        )
+        self.assertQueries(
+            11, url, "post", {"drones": drones[:MAX_BATCH_DRONES]}
+        )
+
+
+class CounterTests(DatasetTestCase):
+    def assertCountersExact(self):
+        self.assertFalse(
+            Drone.objects.annotate(actual=Count("pilots"))
+            .exclude(pilot_count=F("actual")).exists()
+        )
+        self.assertFalse(
+            Manufacturer.objects.annotate(actual=Count("drones"))
+            .exclude(drone_count=F("actual")).exists()
+        )
+
+    def test_imported_counters_are_exact(self):
+        self.assertCountersExact()
+
+    def test_counters_follow_writes(self):
+        self.assign_many()
+        self.drone.pilots.remove(*Pilot.objects.order_by("pk")[:60])
+        self.pilot.drones.clear()
+        self.drone.manufacturer_id = 2
+        self.drone.save()
+        Pilot.objects.get(pk=3).delete()
+        Drone.objects.get(pk=4).delete()
+        self.assertCountersExact()
+
+    def assertConcurrentAssignmentCountedOnce(self):
+        # Another transaction assigns drone 2 between our select and our
+        # insert; its own post_add counts that row.
+        self.pilot.drones.clear()
+        seen = []
+
+        def assign_first(sender, action, pk_set, **kwargs):
+            assigned = assigned_drone_ids(self.pilot, pk_set)
+            seen.append((action, set(pk_set), assigned))
+            if action == "pre_add":
+                Assignment.objects.create(pilot=self.pilot, drone_id=2)
+                counters.adjust_pilot_counts([2], 1)
+
+        m2m_changed.connect(assign_first, sender=Assignment)
+        try:
+            self.assertEqual(assign_drones(self.pilot, [2, 3]), {3})
+        finally:
+            m2m_changed.disconnect(assign_first, sender=Assignment)
+        self.assertEqual(seen, [
+            ("pre_add", {2, 3}, set()),
+            ("post_add", {3}, {3}),
+        ])
+        self.assertCountersExact()
+
+    def test_concurrent_assignment_is_counted_once(self):
+        self.assertConcurrentAssignmentCountedOnce()
+
+    def test_concurrent_assignment_without_returning(self):
+        with mock.patch.object(type(connection.features),
+                               "can_return_rows_from_bulk_insert", False):
+            self.assertConcurrentAssignmentCountedOnce()
+
+    def test_toggle_signals_around_the_write(self):
+        self.pilot.drones.clear()
+        seen = []
+
+        def record(sender, action, pk_set, **kwargs):
+            seen.append((action, bool(assigned_drone_ids(self.pilot, pk_set))))
+
+        m2m_changed.connect(record, sender=Assignment)
+        self.addCleanup(m2m_changed.disconnect, record, sender=Assignment)
+        self.assertIs(toggle_assignment(self.pilot, 2), True)
+        self.assertIs(toggle_assignment(self.pilot, 2), False)
+        self.assertEqual(seen, [
+            ("pre_add", False), ("post_add", True),
+            ("pre_remove", True), ("post_remove", False),
+        ])
+        self.assertCountersExact()
+
+    def test_reconcile_repairs_drift(self):
+        Drone.objects.filter(pk__lte=3).update(pilot_count=99)
+        Manufacturer.objects.update(drone_count=0)
+        with self.assertNumQueries(2):
+            repaired = counters.reconcile()
+        self.assertEqual(repaired, {Drone: 3, Manufacturer: MANUFACTURERS})
+        self.assertCountersExact()
+
+
+class InstrumentationTests(DatasetTestCase):
+    def test_metrics_are_staff_only_without_a_token(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        Pilot.objects.filter(pk=self.pilot.pk).update(is_staff=True)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN="scrape")
+    def test_metrics_token(self):
+        url = reverse("metrics")
+        Pilot.objects.filter(pk=self.pilot.pk).update(is_staff=True)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(
+            url, headers={"authorization": "Bearer scrape"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_function_views_report_template_time(self):
+        with mock.patch.object(TEMPLATE_SECONDS, "observe") as observe:
+            self.client.get(reverse("racing:index"))
+        observe.assert_called_once()
+        name, seconds = observe.call_args.args
+        self.assertEqual(name, "racing:index")
+        self.assertGreater(seconds, 0)
+
+
+class CursorPaginatorTests(DatasetTestCase):
+    orderings = (None, ["-weight"], ["-max_speed", "model_name"])
+
+    def setUp(self):
+        super().setUp()
+        # Ties on the sort keys, so the primary key has to break them.
+        for number in range(5):
+            Drone.objects.create(
+                model_name=f"Twin {number}", max_speed=100,
+                weight=Decimal("2.50"), manufacturer=self.manufacturer,
+            )
+
+    def expected(self, paginator):
+        return list(paginator.queryset.order_by(*paginator._order_by())
+                    .values_list("pk", flat=True))
+
+    def walk(self, paginator, cursor, direction):
+        pages = []
+        while cursor is not None or not pages:
+            page = paginator.page(cursor)
+            pages.append([drone.pk for drone in page])
+            cursor = getattr(page, direction)
+        return pages
+
+    def test_forward_and_backward_cover_every_row_once(self):
+        for ordering in self.orderings:
+            with self.subTest(ordering=ordering):
+                paginator = CursorPaginator(Drone.objects.all(), 7, ordering)
+                forward = self.walk(paginator, None, "next_cursor")
+                self.assertEqual(sum(forward, []), self.expected(paginator))
+                self.assertTrue(all(len(page) == 7 for page in forward[:-1]))
+
+                last = paginator.page(None)
+                while last.has_next():
+                    last = paginator.page(last.next_cursor)
+                self.assertFalse(last.has_next())
+                backward = self.walk(paginator, last.previous_cursor,
+                                     "previous_cursor")
+                # Walking back from the last page shows the same pages.
+                self.assertEqual(backward[::-1], forward[:-1])
+                self.assertFalse(paginator.page(None).has_previous())
+
+    def test_filtered_queryset(self):
+        queryset = Drone.objects.filter(manufacturer=self.manufacturer)
+        paginator = CursorPaginator(queryset, 3, ["-weight"])
+        pages = self.walk(paginator, None, "next_cursor")
+        self.assertEqual(sum(pages, []), self.expected(paginator))
+
+    def test_decimal_keys_round_trip(self):
+        paginator = CursorPaginator(Drone.objects.all(), 7, ["-weight"])
+        page = paginator.page()
+        values, previous = decode_cursor(page.next_cursor)
+        self.assertFalse(previous)
+        self.assertEqual(values, [str(page[-1].weight), page[-1].pk])
+        self.assertEqual(paginator._to_python(values),
+                         [page[-1].weight, page[-1].pk])
+        self.assertIsInstance(paginator._to_python(values)[0], Decimal)
+        following = paginator.page(page.next_cursor)
+        self.assertLessEqual(following[0].weight, page[-1].weight)
+
+    def test_tampered_cursors(self):
+        paginator = CursorPaginator(Drone.objects.all(), 7, ["-weight"])
+        tokens = [
+            "not base64!",
+            "x",
+            encode_cursor(["1.50"])[:-2],
+            base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+            base64.urlsafe_b64encode(b"[1, 2]").decode(),
+            base64.urlsafe_b64encode(b'{"v": [1, 2]}').decode(),
+            base64.urlsafe_b64encode(b'{"v": 5, "p": false}').decode(),
+            encode_cursor(["1.50"]),
+            encode_cursor(["1.50", 1, 2]),
+            encode_cursor(["heavy", 1]),
+            encode_cursor(["1.50", "one"]),
+            encode_cursor([{"weight": 1}, 1]),
+        ]
+        for token in tokens:
+            with self.subTest(token=token):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(token)
+
+
+class SearchTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = get_search_backend()
+        maker = Manufacturer.objects.create(name="Quokka Dynamics",
+                                            country="Australia")
+        self.exact = Drone.objects.create(
+            model_name="Quokka", max_speed=100, weight=1, manufacturer=maker,
+        )
+        # Sorts before the better match by name.
+        self.longer = Drone.objects.create(
+            model_name="Aardvark Quokka Zephyr Mark Two", max_speed=100,
+            weight=1, manufacturer=self.manufacturer,
+        )
+
+    def search(self, text, backend=None):
+        backend = backend or self.backend
+        return set(
+            backend.filter(Drone.objects.all(), text)
+            .values_list("pk", flat=True)
+        )
+
+    def test_sqlite_uses_the_fts_index(self):
+        self.assertIsInstance(self.backend, SQLiteFTSSearchBackend)
+
+    def test_every_token_matches_as_a_prefix(self):
+        both = {self.exact.pk, self.longer.pk}
+        self.assertEqual(self.search("quok"), both)
+        self.assertEqual(self.search("QUÖKKA"), both)
+        self.assertEqual(self.search("quokka zep"), {self.longer.pk})
+        self.assertEqual(self.search("zephyr quokka"), {self.longer.pk})
+        self.assertEqual(self.search("quo zep"), {self.longer.pk})
+        self.assertEqual(self.search("zep quo"), {self.longer.pk})
+        # Drones are found by their manufacturer's name as well.
+        self.assertEqual(self.search("quokka dyn"), {self.exact.pk})
+        self.assertEqual(self.search("quokka zebra"), set())
+
+    def test_blank_text_does_not_filter(self):
+        self.assertEqual(len(self.search("  ")), DRONES + 2)
+
+    def test_whole_words_match_like_icontains(self):
+        for text in ("quokka", "dynamics", "quokka zephyr"):
+            with self.subTest(text):
+                self.assertEqual(
+                    self.search(text),
+                    self.search(text, IContainsSearchBackend()),
+                )
+
+    def test_best_match_ranks_first(self):
+        # The drone matches in its name and its manufacturer's, and its
+        # name is shorter.
+        self.assertEqual(
+            self.backend.search(Drone, "quokka")[:2],
+            [self.exact.pk, self.longer.pk],
+        )
+        response = self.client.get(reverse("racing:drone-list"),
+                                   {"model_name": "quokka"})
+        self.assertEqual(
+            [drone.pk for drone in response.context["object_list"]],
+            [self.exact.pk, self.longer.pk],
+        )
+        # Without a ranking the list keeps its alphabetical order.
+        self.assertEqual(
+            list(search_filter(Drone.objects.all(), "quokka")
+                 .values_list("pk", flat=True)),
+            [self.longer.pk, self.exact.pk],
+        )
+
+    def test_missing_index_fails_the_database_check(self):
+        self.assertEqual(check_search_index(None, databases=["default"]), [])
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("DROP TABLE racing_drone_fts")
+            [error] = check_search_index(None, databases=["default"])
+            transaction.set_rollback(True)
+        self.assertEqual(error.id, "racing.E001")
+        self.assertIn("racing_drone_fts", error.msg)
+
+    def test_index_follows_writes(self):
+        maker = self.exact.manufacturer
+        maker.name = "Wombat Works"
+        maker.save()
+        self.assertEqual(self.search("wombat"), {self.exact.pk})
+        self.assertEqual(self.search("dynamics"), set())
+        self.longer.delete()
+        self.assertEqual(self.search("zephyr"), set())
+
+
+class ExportTests(DatasetTestCase):
+    def export(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_matches_the_database(self):
+        response, body = self.export("racing:drone-export")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="drones.csv"', response["Content-Disposition"])
+        header, *rows = csv.reader(StringIO(body))
+        self.assertEqual(header, [name for name, _ in DroneExportView.columns])
+        self.assertEqual([int(row[0]) for row in rows],
+                         list(Drone.objects.order_by("pk")
+                              .values_list("pk", flat=True)))
+
+        drones = Drone.objects.select_related("manufacturer").in_bulk()
+        for pk, model_name, max_speed, weight, manufacturer_id, name, pilots in rows:
+            drone = drones[int(pk)]
+            self.assertEqual(model_name, drone.model_name)
+            self.assertEqual(float(max_speed), drone.max_speed)
+            self.assertEqual(Decimal(weight), drone.weight)
+            self.assertEqual(int(manufacturer_id), drone.manufacturer_id)
+            self.assertEqual(name, drone.manufacturer.name)
+            self.assertEqual(
+                {int(pilot) for pilot in pilots.split(",") if pilot},
+                set(drone.pilots.values_list("pk", flat=True)),
+            )
+
+    def test_export_follows_the_search_form(self):
+        text = self.drone.model_name.split()[0]
+        _, body = self.export("racing:drone-export", model_name=text)
+        _, *rows = csv.reader(StringIO(body))
+        self.assertEqual(
+            [int(row[0]) for row in rows],
+            list(search_filter(Drone.objects.order_by("pk"), text)
+                 .values_list("pk", flat=True)),
+        )
+        self.assertIn(self.drone.pk, [int(row[0]) for row in rows])
+
+    def test_jsonl(self):
+        response, body = self.export("pilots:pilot-export", format="jsonl")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(records), Pilot.objects.count())
+        pilot = Pilot.objects.get(pk=records[0]["id"])
+        self.assertEqual(records[0], {
+            "id": pilot.pk,
+            "username": pilot.username,
+            "first_name": pilot.first_name,
+            "last_name": pilot.last_name,
+            "drone_license": pilot.drone_license,
+            "skill_rating": pilot.skill_rating,
+            "certification_date": pilot.certification_date
+            and pilot.certification_date.isoformat(),
+        })
+
+
+def drone_columns(rows):
+    """Analytics columns for ``(id, manufacturer_id, speed, weight)`` rows."""
+    table = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    return {
+        "id": table[:, 0].astype(np.int64),
+        "manufacturer_id": table[:, 1].astype(np.int64),
+        "max_speed": table[:, 2],
+        "weight": table[:, 3],
+    }
+
+
+class AnalyticsTests(DatasetTestCase):
+    def test_statistics_match_numpy(self):
+        rng = np.random.default_rng(7)
+        rows = [
+            (pk, manufacturer, rng.uniform(50, 200), rng.uniform(0.5, 5))
+            for pk, manufacturer in enumerate([2] * 7 + [1] * 12, start=1)
+        ]
+        result = analytics.analyze(drone_columns(rows))
+
+        ratios = {1: [], 2: []}
+        for _, manufacturer, speed, weight in rows:
+            ratios[manufacturer].append(speed / weight)
+        self.assertEqual(
+            [entry["manufacturer_id"] for entry in result["manufacturers"]],
+            [1, 2],
+        )
+        for entry in result["manufacturers"]:
+            values = np.array(ratios[entry["manufacturer_id"]])
+            self.assertEqual(entry["count"], len(values))
+            self.assertEqual(
+                entry["name"],
+                Manufacturer.objects.get(pk=entry["manufacturer_id"]).name,
+            )
+            self.assertAlmostEqual(entry["mean"], values.mean())
+            self.assertAlmostEqual(entry["std"], values.std())
+            self.assertAlmostEqual(entry["min"], values.min())
+            self.assertAlmostEqual(entry["max"], values.max())
+            np.testing.assert_allclose(
+                list(entry["percentiles"].values()),
+                np.percentile(values, analytics.PERCENTILES),
+            )
+
+        fleet = np.array(ratios[1] + ratios[2])
+        self.assertEqual(result["fleet"]["count"], len(fleet))
+        self.assertAlmostEqual(result["fleet"]["mean"], fleet.mean())
+        self.assertAlmostEqual(result["fleet"]["std"], fleet.std())
+        np.testing.assert_allclose(
+            list(result["fleet"]["percentiles"].values()),
+            np.percentile(fleet, analytics.PERCENTILES),
+        )
+
+    def test_outliers_use_the_modified_z_score(self):
+        ratios = [10, 11, 12, 13, 14, 100]
+        rows = [(pk, 1, ratio, 1) for pk, ratio in enumerate(ratios, start=1)]
+        result = analytics.analyze(drone_columns(rows))
+
+        median = np.median(ratios)
+        mad = np.median(np.abs(np.array(ratios) - median))
+        self.assertEqual(result["manufacturers"][0]["outliers"], 1)
+        [outlier] = result["outliers"]
+        self.assertEqual(outlier["drone_id"], 6)
+        self.assertAlmostEqual(outlier["ratio"], 100)
+        self.assertAlmostEqual(outlier["score"], (100 - median) / (1.4826 * mad))
+
+    def test_drones_without_weight_are_skipped(self):
+        result = analytics.analyze(
+            drone_columns([(1, 1, 100, 2), (2, 1, 100, 0)])
+        )
+        self.assertEqual(result["fleet"]["count"], 1)
+        self.assertEqual(result["fleet"]["mean"], 50)
+        self.assertEqual(
+            analytics.analyze(drone_columns([(1, 1, 100, 0)])),
+            {"fleet": None, "manufacturers": [], "outliers": []},
+        )
+
+    def test_columns_follow_drone_writes(self):
+        columns = analytics.get_columns()
+        self.assertEqual(len(columns["id"]), DRONES)
+        with self.captureOnCommitCallbacks(execute=True):
+            drone = Drone.objects.create(
+                model_name="Fresh", max_speed=90, weight=Decimal("1.25"),
+                manufacturer=self.manufacturer,
+            )
+        columns = analytics.get_columns()
+        self.assertEqual(len(columns["id"]), DRONES + 1)
+        index = columns["id"].tolist().index(drone.pk)
+        self.assertEqual(columns["weight"][index], 1.25)
+
+    def test_columns_are_invalidated_after_commit(self):
+        analytics.get_columns()
+        version = cache.get(analytics.VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.drone.max_speed += 1
+                self.drone.save()
+                # Another worker reading now sees the old version.
+                self.assertEqual(cache.get(analytics.VERSION_KEY), version)
+        self.assertTrue(callbacks)
+        self.assertNotEqual(cache.get(analytics.VERSION_KEY), version)
+
+
+class JsonArrayParserTests(SimpleTestCase):
+    def parse(self, text, read_size):
+        with mock.patch.object(bulk_import, "READ_SIZE", read_size):
+            return list(bulk_import.iter_json_array(StringIO(text)))
+
+    def test_records_split_across_blocks(self):
+        records = [
+            {"model": "racing.drone", "pk": pk,
+             "fields": {"model_name": 'Tricky, "[quoted]" {name}',
+                        "pilots": [1, 2, 3]}}
+            for pk in range(1, 21)
+        ]
+        for text in (json.dumps(records), json.dumps(records, indent=2)):
+            for read_size in (1, 2, 7, 64, 1 << 16):
+                with self.subTest(read_size=read_size):
+                    self.assertEqual(self.parse(text, read_size), records)
+
+    def test_numbers_split_across_blocks(self):
+        for read_size in (1, 2, 3, 4, 5):
+            with self.subTest(read_size=read_size):
+                self.assertEqual(self.parse("[1234, 56]", read_size), [1234, 56])
+
+    def test_empty_array(self):
+        for text in ("[]", "  [ ]\n", "\n[\n]\n"):
+            with self.subTest(text=text):
+                self.assertEqual(self.parse(text, 2), [])
+
+    def test_stops_at_the_closing_bracket(self):
+        self.assertEqual(self.parse('[{"a": 1}] trailing', 3), [{"a": 1}])
+
+    def test_rejects_anything_but_an_array(self):
+        with self.assertRaises(ValueError):
+            self.parse('{"model": "racing.drone"}', 4)
+
+    def test_truncated_file(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.parse('[{"a": 1}, {"b": ', 4)
+
+
+class BulkImportTests(DatasetTestCase):
+    def import_csv(self, text, model_label="racing.drone"):
+        importer = BulkImporter()
+        for record in iter_csv(StringIO(text), model_label):
+            importer.add(record)
+        return importer.finish()
+
+    def test_csv_with_pilots(self):
+        pk = DRONES + 1
+        self.import_csv(
+            "pk,model_name,max_speed,weight,manufacturer,pilots\n"
+            f"{pk},Imported,120,1.50,1,1;2\n"
+        )
+        drone = Drone.objects.get(pk=pk)
+        self.assertEqual(drone.model_name, "Imported")
+        self.assertEqual(drone.weight, Decimal("1.50"))
+        self.assertEqual(set(drone.pilots.values_list("pk", flat=True)), {1, 2})
+
+    def test_csv_without_pk(self):
+        self.import_csv(
+            "model_name,max_speed,weight,manufacturer,pilots\n"
+            "No Pilots,120,1.50,1,\n"
+        )
+        self.assertTrue(Drone.objects.filter(model_name="No Pilots").exists())
+
+        csv_text = (
+            "model_name,max_speed,weight,manufacturer,pilots\n"
+            "With Pilots,120,1.50,1,1;2\n"
+        )
+        with self.assertRaisesMessage(ValueError, "need a pk"):
+            self.import_csv(csv_text)
+        self.assertFalse(Drone.objects.filter(model_name="With Pilots").exists())
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as stream:
+            stream.write(csv_text)
+            stream.flush()
+            with self.assertRaisesMessage(CommandError, "need a pk"):
+                call_command("import_fixtures", stream.name,
+                             model="racing.drone", stdout=StringIO())
+
+
+class ExplainViewsTests(DatasetTestCase):
+    def test_explains_every_route(self):
+        out = StringIO()
+        call_command("explain_views", stdout=out)
+        lines = [line for line in out.getvalue().splitlines()
+                 if not line.startswith(" ")]
+        self.assertEqual(len(lines), len(ROUTES))
+        self.assertIn(f"/drones/{self.drone.pk}/: ", out.getvalue())
+
+
+class ApiQueryTests(QueryCountTestCase):
+    def test_list(self):
+        self.assertQueries(4, reverse("racing:api-drone-list"))
+
+    def test_list_does_not_grow_with_page_size(self):
+        self.assertQueries(
+            4, reverse("racing:api-drone-list"), data={"limit": 200}
+        )
+
+    def test_detail(self):
+        url = reverse("racing:api-drone-detail", args=[self.drone.pk])
+        self.assertQueries(4, url)
+
+    def test_not_modified_skips_the_rows(self):
+        for url in (reverse("racing:api-drone-list") + "?ids=1,2,3",
+                    reverse("racing:api-drone-detail", args=[self.drone.pk])):
+            with self.subTest(url):
+                etag = self.client.get(url)["ETag"]
+                self.assertQueries(
+                    3, url, HTTP_IF_NONE_MATCH=etag, status=304
+                )
+
+    def test_etag_follows_the_rows(self):
+        list_url = reverse("racing:api-drone-list") + "?ids=1,2,3"
+        detail_url = reverse("racing:api-drone-detail", args=[self.drone.pk])
+        etags = [self.client.get(url)["ETag"] for url in (list_url, detail_url)]
+        # A new pilot on the drone changes its row in both responses.
+        self.drone.pilots.add(Pilot.objects.exclude(drones=self.drone).first())
+        for url, etag in zip((list_url, detail_url), etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+        # Deleting a row leaves the newest updated_at as it was.
+        etag = self.client.get(list_url)["ETag"]
+        Drone.objects.filter(pk=3).delete()
+        etag, previous = self.client.get(list_url)["ETag"], etag
+        self.assertNotEqual(etag, previous)
+        # Each query string is its own page.
+        self.assertNotEqual(
+            self.client.get(list_url, {"fields": "id"})["ETag"], etag
+        )
+
+    @override_settings(RACE_INGEST_TOKEN="timing")
+    def test_ingest_does_not_grow_with_laps(self):
+        # Only the batched lap inserts depend on the number of laps, and
+        # they are limited by the database's parameter cap, not by Python.
+        # Each race runs on a fresh track, so both set new records.
+        url = reverse("racing:api-race-ingest")
+        for track, laps in ((1, 3), (2, 300)):
+            payload = {
+                "track": track,
+                "started_at": "2025-06-01T14:00:00Z",
+                "results": [
+                    {"pilot": pk, "drone": self.drone.pk, "laps": [20.5] * laps}
+                    for pk in (1, 2, 3)
+                ],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    url, json.dumps(payload), content_type="application/json",
+                    headers={"authorization": "Bearer timing"},
+                )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(
+                len([
+                    query for query in queries.captured_queries
+                    if not query["sql"].startswith('INSERT INTO "racing_laptime"')
+                ]),
+                11,
+            )
+            self.assertEqual(
+                RaceTrack.objects.get(pk=track).record_time.total_seconds(),
+                20.5,
+            )
+
+
+@override_settings(RACE_INGEST_TOKEN="timing")
+class RaceIngestTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        RaceTrack.objects.filter(pk=self.racetrack.pk).update(record_time=None)
+        self.url = reverse("racing:api-race-ingest")
+
+    def post(self, results, client=None, token="timing", **extra):
+        payload = {
+            "track": self.racetrack.pk,
+            "started_at": "2025-06-01T14:00:00Z",
+            "results": [
+                {"pilot": pilot, "drone": self.drone.pk, "laps": laps, **extra}
+                for pilot, laps in results.items()
+            ],
+        }
+        headers = {"authorization": f"Bearer {token}"} if token else {}
+        return (client or self.client).post(
+            self.url, json.dumps(payload), content_type="application/json",
+            headers=headers,
+        )
+
+    def record_time(self):
+        self.racetrack.refresh_from_db()
+        return self.racetrack.record_time.total_seconds()
+
+    def personal_best(self, pilot):
+        best = PersonalBest.objects.filter(
+            pilot=pilot, track=self.racetrack
+        ).first()
+        return best and (best.time.total_seconds(), best.race_id)
+
+    def test_token_skips_session_and_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(self.post({1: [30]}, client).status_code, 201)
+
+    def test_wrong_token(self):
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(self.post({1: [30]}, client, "guess").status_code, 401)
+
+    def test_session_requires_permission(self):
+        self.assertEqual(self.post({1: [30]}, token=None).status_code, 403)
+        self.pilot.user_permissions.add(
+            Permission.objects.get(codename="add_race")
+        )
+        self.assertEqual(self.post({1: [30]}, token=None).status_code, 201)
+
+    def test_session_requires_csrf(self):
+        self.pilot.user_permissions.add(
+            Permission.objects.get(codename="add_race")
+        )
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.pilot)
+        self.assertEqual(self.post({1: [30]}, client, None).status_code, 403)
+        self.assertFalse(Race.objects.exists())
+
+    def test_invalid_position(self):
+        for position in ("1st", -1, 0, 1.5, True):
+            with self.subTest(position=position):
+                response = self.post({1: [30]}, position=position)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("position", response.json()["detail"])
+        self.assertFalse(Race.objects.exists())
+
+    def test_records_improve_and_fall_back_on_delete(self):
+        first = self.post({1: [21, 20], 2: [25]}).json()["race"]
+        self.assertEqual(self.record_time(), 20)
+        self.assertEqual(self.personal_best(1), (20, first))
+        self.assertEqual(self.personal_best(2), (25, first))
+
+        second = self.post({1: [18], 2: [22, 26]}).json()["race"]
+        self.assertEqual(self.record_time(), 18)
+        self.assertEqual(self.personal_best(1), (18, second))
+        self.assertEqual(self.personal_best(2), (22, second))
+
+        # A slower race changes nothing.
+        self.post({1: [40], 2: [40]})
+        self.assertEqual(self.record_time(), 18)
+        self.assertEqual(self.personal_best(1), (18, second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RaceResult.objects.get(race=second, pilot=1).delete()
+        self.assertEqual(self.record_time(), 20)
+        self.assertEqual(self.personal_best(1), (20, first))
+        self.assertEqual(self.personal_best(2), (22, second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Race.objects.filter(pk=first).delete()
+        self.assertEqual(self.record_time(), 22)
+        self.assertEqual(self.personal_best(1)[0], 40)
+        self.assertEqual(self.personal_best(2), (22, second))
+
+    def test_refresh_records_without_laps(self):
+        race = self.post({1: [20]}).json()["race"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Race.objects.filter(pk=race).delete()
+        self.racetrack.refresh_from_db()
+        self.assertIsNone(self.racetrack.record_time)
+        self.assertIsNone(self.personal_best(1))
+
+    def test_race_delete_refreshes_records_once(self):
+        races = [self.post({pilot: [20 + pilot] for pilot in range(1, 7)})
+                 .json()["race"] for _ in range(2)]
+        with mock.patch("racing.signals.refresh_records") as refresh:
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    Race.objects.filter(pk__in=races).delete()
+        refresh.assert_called_once_with(
+            self.racetrack.pk, [1, 2, 3, 4, 5, 6], using="default",
+        )
+        # One track lookup per race, none per result.
+        track_lookups = [
+            query for query in queries.captured_queries
+            if query["sql"].startswith('SELECT "racing_race"."track_id"')
+        ]
+        self.assertEqual(len(track_lookups), len(races))
+
+    def test_invalid_lap_times(self):
+        for lap in (float("inf"), float("nan"), 1e20, 10 ** 30, -1, 0,
+                    "999999999999 00:00:00", "2:00:00", "fast", None):
+            with self.subTest(lap=lap):
+                response = self.post({1: [30, lap]})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("lap time", response.json()["detail"])
+        for track in (float("inf"), 10 ** 30):
+            with self.subTest(track=track):
+                response = self.client.post(
+                    self.url,
+                    json.dumps({"track": track,
+                                "started_at": "2025-06-01T14:00:00Z",
+                                "results": []}),
+                    content_type="application/json",
+                    headers={"authorization": "Bearer timing"},
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Race.objects.exists())
+
+    def test_deleting_a_drone_keeps_its_races(self):
+        race = self.post({1: [20]}).json()["race"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drone.delete()
+        result = RaceResult.objects.get(race=race, pilot=1)
+        self.assertIsNone(result.drone_id)
+        self.assertEqual(result.laps.count(), 1)
+        self.assertEqual(self.record_time(), 20)
+        self.assertEqual(self.personal_best(1), (20, race))
+
+
+def reload_urlconfs():
+    """Route to the sync or async views, following ``ASYNC_VIEWS``."""
+    for module in (racing.urls, accounts.urls, config.urls):
+        importlib.reload(module)
+    clear_url_caches()
+
+
+class AsyncViewQueryTests(QueryCountTestCase):
+    """The async views run no more queries than the sync ones."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Cleanups run last in, first out: restore the setting, then reload.
+        cls.addClassCleanup(reload_urlconfs)
+        cls.enterClassContext(override_settings(ASYNC_VIEWS=True))
+        reload_urlconfs()
+
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.pilot)
+
+    def assertQueriesAsync(self, expected, url, status=200, **kwargs):
+        # Query counting is synchronous, so the async client is driven
+        # from here; the views still run on an event loop.
+        with self.assertNumQueries(expected):
+            response = async_to_sync(self.async_client.get)(url, **kwargs)
+        self.assertEqual(response.status_code, status)
+        return response
+
+    def test_index(self):
+        self.assertQueriesAsync(2, reverse("racing:index"))
+
+    def test_index_rebuilds_missing_statistics_once(self):
+        cache.clear()
+        self.assertQueriesAsync(8, reverse("racing:index"))
+        self.assertQueriesAsync(2, reverse("racing:index"))
+
+    def test_index_requires_login(self):
+        self.async_client.logout()
+        self.assertQueriesAsync(0, reverse("racing:index"), status=302)
+
+    def test_lists(self):
+        for name, expected in (
+            ("racing:manufacturer-list", 4),
+            ("racing:racetrack-list", 4),
+            ("racing:drone-list", 5),
+            ("pilots:pilot-list", 5),
+        ):
+            with self.subTest(name):
+                self.assertQueriesAsync(expected, reverse(name))
+                self.assertQueriesAsync(
+                    expected - 1, reverse(name), data={"cursor": ""}
+                )
+
+    def test_list_pages(self):
+        url = reverse("racing:drone-list")
+        response = self.assertQueriesAsync(5, url, data={"page": "last"})
+        self.assertEqual(response.context["page_obj"].number, DRONES // 5)
+        self.assertQueriesAsync(3, url, data={"page": "x"}, status=404)
+
+    def test_details(self):
+        for name, pk, expected in (
+            ("racing:manufacturer-detail", self.manufacturer.pk, 7),
+            ("racing:racetrack-detail", self.racetrack.pk, 4),
+            ("racing:drone-detail", self.drone.pk, 6),
+            ("pilots:pilot-detail", self.pilot.pk, 5),
+        ):
+            with self.subTest(name):
+                url = reverse(name, args=[pk])
+                response = self.assertQueriesAsync(expected, url)
+                self.assertQueriesAsync(
+                    3, url, headers={"if-none-match": response["ETag"]},
+                    status=304,
+                )
+
+    def test_detail_not_found(self):
+        url = reverse("racing:drone-detail", args=[DRONES + 1])
+        self.assertQueriesAsync(3, url, status=404)
@@ -1,25 +1,50 @@
+from django.conf import settings
 from django.urls import path
 
+from .api import (
+    DroneResourceView,
+    ManufacturerResourceView,
+    PilotResourceView,
+    RaceIngestView,
+    RaceTrackResourceView,
+)
 from .views import (
     index,
     DroneListView,
+    DroneExportView,
     DroneDetailView,
     DroneCreateView,
     DroneUpdateView,
     DroneDeleteView,
     ManufacturerListView,
+    ManufacturerExportView,
+    ManufacturerAnalyticsView,
     ManufacturerDetailView,
     ManufacturerCreateView,
     ManufacturerUpdateView,
     ManufacturerDeleteView,
     RaceTrackListView,
+    RaceTrackExportView,
     RaceTrackDetailView,
     RaceTrackCreateView,
     RaceTrackUpdateView,
     RaceTrackDeleteView,
     toggle_assign_to_drone,
+    batch_assign_drones,
 )
 
+# The read-only pages run on the async ORM when served over ASGI.
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        index,
+        AsyncDroneListView as DroneListView,
+        AsyncDroneDetailView as DroneDetailView,
+        AsyncManufacturerListView as ManufacturerListView,
+        AsyncManufacturerDetailView as ManufacturerDetailView,
+        AsyncRaceTrackListView as RaceTrackListView,
+        AsyncRaceTrackDetailView as RaceTrackDetailView,
+    )
+
 app_name = "racing"
 
 urlpatterns = [
@@ -34,6 +59,16 @@ urlpatterns = [
         ManufacturerListView.as_view(),
         name="manufacturer-list",
     ),
+    path(
+        "manufacturers/export/",
+        ManufacturerExportView.as_view(),
+        name="manufacturer-export",
+    ),
+    path(
+        "manufacturers/analytics/",
+        ManufacturerAnalyticsView.as_view(),
+        name="manufacturer-analytics",
+    ),
     path(
         "manufacturers/<int:pk>/",
         ManufacturerDetailView.as_view(),
@@ -60,6 +95,11 @@ urlpatterns = [
         RaceTrackListView.as_view(),
         name="racetrack-list",
     ),
+    path(
+        "racetracks/export/",
+        RaceTrackExportView.as_view(),
+        name="racetrack-export",
+    ),
     path(
         "racetracks/<int:pk>/",
         RaceTrackDetailView.as_view(),
@@ -86,6 +126,11 @@ urlpatterns = [
         DroneListView.as_view(),
         name="drone-list",
     ),
+    path(
+        "drones/export/",
+        DroneExportView.as_view(),
+        name="drone-export",
+    ),
     path(
         "drones/<int:pk>/",
         DroneDetailView.as_view(),
@@ -113,4 +158,58 @@ urlpatterns = [
         toggle_assign_to_drone,
         name="toggle-drone-assign",
     ),
+    path(
+        "drones/assign/",
+        batch_assign_drones,
+        name="batch-drone-assign",
+    ),
+
+    # Read-only JSON API
+    path(
+        "api/manufacturers/",
+        ManufacturerResourceView.as_view(),
+        name="api-manufacturer-list",
+    ),
+    path(
+        "api/manufacturers/<int:pk>/",
+        ManufacturerResourceView.as_view(),
+        name="api-manufacturer-detail",
+    ),
+    path(
+        "api/drones/",
+        DroneResourceView.as_view(),
+        name="api-drone-list",
+    ),
+    path(
+        "api/drones/<int:pk>/",
+        DroneResourceView.as_view(),
+        name="api-drone-detail",
+    ),
+    path(
+        "api/racetracks/",
+        RaceTrackResourceView.as_view(),
+        name="api-racetrack-list",
+    ),
+    path(
+        "api/racetracks/<int:pk>/",
+        RaceTrackResourceView.as_view(),
+        name="api-racetrack-detail",
+    ),
+    path(
+        "api/pilots/",
+        PilotResourceView.as_view(),
+        name="api-pilot-list",
+    ),
+    path(
+        "api/pilots/<int:pk>/",
+        PilotResourceView.as_view(),
+        name="api-pilot-detail",
+    ),
+
+    # Race results from timing systems
+    path(
+        "api/races/",
+        RaceIngestView.as_view(),
+        name="api-race-ingest",
+    ),
 ]
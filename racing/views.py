@@ -1,11 +1,37 @@
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy
 from django.views import generic
+from django.views.decorators.http import require_POST
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import (Avg,
+                              Count,
+                              OuterRef,
+                              Prefetch,
+                              Q,
+                              Subquery,
+                              Sum,)
+from django.db.models.functions import Coalesce, Greatest
 
 from accounts.models import Pilot
+from racing.analytics import PERCENTILES, fleet_analytics
+from racing.assignments import (assign_drones,
+                                assigned_drone_ids,
+                                toggle_assignment,
+                                unassign_drones,)
 from racing.models import Drone, RaceTrack, Manufacturer
+from racing.conditional import ConditionalDetailMixin
+from racing.counters import assigned_drone_count
+from racing.exports import ExportView, GroupConcat
+from racing.pagination import (
+    CursorPaginator,
+    InvalidCursor,
+    KeysetPaginationMixin,
+    cursor_page_context,
+)
+from racing.search import search_filter
+from racing.stats import get_dashboard_stats
 
 from .forms import (
     DroneForm,
@@ -14,34 +40,19 @@ from .forms import (
     RaceTrackNameSearchForm,
 )
 
+# Drones one batch assignment may change, to bound the locked write.
+MAX_BATCH_DRONES = 100
+
 
 @login_required
 def index(request):
-    num_pilots = Pilot.objects.count()
-    num_drones = Drone.objects.count()
-    num_manufacturers = Manufacturer.objects.count()
-    num_race_tracks = RaceTrack.objects.count()
-    top_pilots = Pilot.objects.order_by('-skill_rating')[:5]
-
-    from django.db.models import Count
-    popular_drones = Drone.objects.annotate(
-        pilot_count=Count('pilots')
-    ).order_by('-pilot_count')[:5]
-
-    context = {
-        "num_pilots": num_pilots,
-        "num_drones": num_drones,
-        "num_manufacturers": num_manufacturers,
-        "num_race_tracks": num_race_tracks,
-        "top_pilots": top_pilots,
-        "popular_drones": popular_drones,
-    }
-
-    return render(request, "racing/index.html", context=context)
+    return render(request, "racing/index.html", context=get_dashboard_stats())
 
 
 # Manufacturer Views
-class ManufacturerListView(LoginRequiredMixin, generic.ListView):
+class ManufacturerListView(LoginRequiredMixin,
+                           KeysetPaginationMixin,
+                           generic.ListView):
     model = Manufacturer
     context_object_name = "manufacturer_list"
     template_name = "racing/manufacturer_list.html"
@@ -54,19 +65,106 @@ class ManufacturerListView(LoginRequiredMixin, generic.ListView):
         return context
 
     def get_queryset(self):
-        from django.db.models import Count
         form = ManufacturerNameSearchForm(self.request.GET)
-        queryset = Manufacturer.objects.all().annotate(drone_count=Count('drones'))
+        queryset = Manufacturer.objects.all()
         if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
+            return search_filter(queryset, form.cleaned_data["name"],
+                                 ranked=True)
         return queryset
 
 
-class ManufacturerDetailView(LoginRequiredMixin, generic.DetailView):
+class ManufacturerExportView(ExportView):
+    model = Manufacturer
+    search_form_class = ManufacturerNameSearchForm
+    search_field = "name"
+    filename = "manufacturers"
+    columns = (
+        ("id", "pk"),
+        ("name", "name"),
+        ("country", "country"),
+        ("drone_count", "drone_count"),
+    )
+
+
+class ManufacturerAnalyticsView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "racing/manufacturer_analytics.html"
+    max_outliers = 20
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        analytics = fleet_analytics()
+        context["fleet"] = analytics["fleet"]
+        context["manufacturers"] = analytics["manufacturers"]
+        context["outliers"] = analytics["outliers"][:self.max_outliers]
+        context["outlier_count"] = len(analytics["outliers"])
+        context["percentiles"] = PERCENTILES
+        return context
+
+
+class ManufacturerDetailView(LoginRequiredMixin,
+                             ConditionalDetailMixin,
+                             generic.DetailView):
+    """
+    A manufacturer with one keyset-paginated page of its drones. The fleet
+    figures come from a single aggregate over the drones' own columns and
+    pilots are only loaded for the drones on the page, so a manufacturer
+    with thousands of drones costs the same as one with a dozen.
+    """
+
     model = Manufacturer
     context_object_name = "manufacturer"
     template_name = "racing/manufacturer_detail.html"
-    queryset = Manufacturer.objects.prefetch_related("drones__pilots")
+    drones_per_page = 12
+    cursor_param = "cursor"
+    drone_aggregates = {
+        "drone_count": Count("pk"),
+        "avg_speed": Avg("max_speed"),
+        "avg_weight": Avg("weight"),
+        "piloted_drones": Count("pk", filter=Q(pilot_count__gt=0)),
+        "assignments": Sum("pilot_count"),
+    }
+
+    def get_version_extra(self):
+        # Every page of drones has a version of its own.
+        return self.request.GET.get(self.cursor_param, "")
+
+    def get_drones(self):
+        return Drone.objects.filter(
+            manufacturer_id=self.kwargs[self.pk_url_kwarg]
+        )
+
+    def get_drone_stats(self):
+        return self.get_drones().aggregate(**self.drone_aggregates)
+
+    def get_drone_paginator(self):
+        return CursorPaginator(
+            self.get_drones().prefetch_related(Prefetch(
+                "pilots",
+                queryset=Pilot.objects.only("username").order_by("username"),
+            )),
+            self.drones_per_page,
+        )
+
+    def get_drone_page(self):
+        try:
+            return self.get_drone_paginator().page(
+                self.request.GET.get(self.cursor_param)
+            )
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = self.get_drone_page()
+        context.update(
+            cursor_page_context(self.request, page, self.cursor_param),
+            drone_stats=self.get_drone_stats(),
+            drone_list=page.object_list,
+            page_obj=page,
+            paginator=page.paginator,
+            is_paginated=page.has_other_pages(),
+        )
+        return context
 
 
 class ManufacturerCreateView(LoginRequiredMixin, generic.CreateView):
@@ -87,7 +185,9 @@ class ManufacturerDeleteView(LoginRequiredMixin, generic.DeleteView):
 
 
 # RaceTrack Views
-class RaceTrackListView(LoginRequiredMixin, generic.ListView):
+class RaceTrackListView(LoginRequiredMixin,
+                        KeysetPaginationMixin,
+                        generic.ListView):
     model = RaceTrack
     context_object_name = "racetrack_list"
     template_name = "racing/racetrack_list.html"
@@ -103,11 +203,29 @@ class RaceTrackListView(LoginRequiredMixin, generic.ListView):
         form = RaceTrackNameSearchForm(self.request.GET)
         queryset = RaceTrack.objects.all()
         if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
+            return search_filter(queryset, form.cleaned_data["name"],
+                                 ranked=True)
         return queryset
 
 
-class RaceTrackDetailView(LoginRequiredMixin, generic.DetailView):
+class RaceTrackExportView(ExportView):
+    model = RaceTrack
+    search_form_class = RaceTrackNameSearchForm
+    search_field = "name"
+    filename = "racetracks"
+    columns = (
+        ("id", "pk"),
+        ("name", "name"),
+        ("difficulty_level", "difficulty_level"),
+        ("length_meters", "length_meters"),
+        ("location", "location"),
+        ("record_time", "record_time"),
+    )
+
+
+class RaceTrackDetailView(LoginRequiredMixin,
+                          ConditionalDetailMixin,
+                          generic.DetailView):
     model = RaceTrack
     context_object_name = "racetrack"
     template_name = "racing/racetrack_detail.html"
@@ -131,12 +249,12 @@ class RaceTrackDeleteView(LoginRequiredMixin, generic.DeleteView):
 
 
 # Drone Views
-class DroneListView(LoginRequiredMixin, generic.ListView):
+class DroneListView(LoginRequiredMixin,
+                    KeysetPaginationMixin,
+                    generic.ListView):
     model = Drone
     paginate_by = 5
-    queryset = (Drone.objects
-                .select_related("manufacturer")
-                .prefetch_related("pilots"))
+    queryset = Drone.objects.select_related("manufacturer")
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -144,28 +262,80 @@ class DroneListView(LoginRequiredMixin, generic.ListView):
         context["search_form"] = DroneModelSearchForm(
             initial={"model_name": model_name}
         )
-        if self.request.user.is_authenticated:
-            context["user_drone_ids"] = set(
-                self.request.user.drones.values_list('id', flat=True)
-            )
-        else:
-            context["user_drone_ids"] = set()
+        context["user_drone_ids"] = self.get_user_drone_ids(
+            context["object_list"]
+        )
+        # Part of the cache key of the row fragments.
+        for drone in context["object_list"]:
+            drone.is_assigned = drone.pk in context["user_drone_ids"]
         return context
 
+    def get_user_drone_ids(self, drones):
+        return assigned_drone_ids(self.request.user,
+                                  [drone.pk for drone in drones])
+
     def get_queryset(self):
         form = DroneModelSearchForm(self.request.GET)
         if form.is_valid():
-            return self.queryset.filter(
-                model_name__icontains=form.cleaned_data["model_name"]
-            )
+            return search_filter(self.queryset,
+                                 form.cleaned_data["model_name"],
+                                 ranked=True)
         return self.queryset
 
 
-class DroneDetailView(LoginRequiredMixin, generic.DetailView):
+class DroneExportView(ExportView):
+    model = Drone
+    search_form_class = DroneModelSearchForm
+    search_field = "model_name"
+    filename = "drones"
+    columns = (
+        ("id", "pk"),
+        ("model_name", "model_name"),
+        ("max_speed", "max_speed"),
+        ("weight", "weight"),
+        ("manufacturer_id", "manufacturer_id"),
+        ("manufacturer", "manufacturer__name"),
+        ("pilot_ids", "pilot_ids"),
+    )
+
+    def get_queryset(self):
+        return super().get_queryset().annotate(pilot_ids=GroupConcat("pilots"))
+
+
+class DroneDetailView(LoginRequiredMixin,
+                      ConditionalDetailMixin,
+                      generic.DetailView):
+    """
+    A drone with its pilots and the size of each pilot's fleet. Editing a
+    pilot or changing their fleet bumps the pilot's ``updated_at``, so the
+    page is dated by the newest of the drone and its pilots instead of
+    every drone of the pilot being touched.
+    """
+
     model = Drone
     queryset = (Drone.objects
                 .select_related("manufacturer")
-                .prefetch_related("pilots"))
+                .prefetch_related(Prefetch(
+                    "pilots",
+                    queryset=Pilot.objects
+                    .annotate(num_drones=assigned_drone_count())
+                    .order_by("username"),
+                )))
+
+    def get_last_modified_queryset(self):
+        newest_pilot = Subquery(
+            Pilot.objects.filter(drones=OuterRef("pk"))
+            .order_by("-updated_at")
+            .values("updated_at")[:1]
+        )
+        return (
+            Drone.objects
+            .filter(pk=self.kwargs[self.pk_url_kwarg])
+            .annotate(last_modified=Greatest(
+                "updated_at", Coalesce(newest_pilot, "updated_at")
+            ))
+            .values_list("last_modified", flat=True)
+        )
 
 
 class DroneCreateView(LoginRequiredMixin, generic.CreateView):
@@ -187,17 +357,34 @@ class DroneDeleteView(LoginRequiredMixin, generic.DeleteView):
 
 @login_required
 def toggle_assign_to_drone(request, pk):
-    pilot = (Pilot.objects
-             .prefetch_related("drones")
-             .get(id=request.user.id))
-    drone = (Drone.objects
-             .prefetch_related("pilots")
-             .get(id=pk))
-
-    if drone in pilot.drones.all():
-        pilot.drones.remove(pk)
-    else:
-        pilot.drones.add(pk)
+    if toggle_assignment(request.user, pk) is None:
+        raise Http404("No drone found matching the query")
 
     return redirect(request.META.get('HTTP_REFERER',
-                                     reverse_lazy("racing:drone-list")))
\ No newline at end of file
+                                     reverse_lazy("racing:drone-list")))
+
+
+@login_required
+@require_POST
+def batch_assign_drones(request):
+    action = request.POST.get("action", "assign")
+    if action not in ("assign", "unassign"):
+        return JsonResponse({"detail": "action must be assign or unassign."},
+                            status=400)
+    drones = request.POST.getlist("drones")
+    if len(drones) > MAX_BATCH_DRONES:
+        return JsonResponse(
+            {"detail": f"At most {MAX_BATCH_DRONES} drones can be changed "
+                       f"at once."},
+            status=400,
+        )
+    try:
+        drone_ids = {int(pk) for pk in drones}
+    except ValueError:
+        return JsonResponse({"detail": "drones must be integers."}, status=400)
+
+    if action == "assign":
+        changed = assign_drones(request.user, drone_ids)
+    else:
+        changed = unassign_drones(request.user, drone_ids)
+    return JsonResponse({"action": action, "changed": sorted(changed)})
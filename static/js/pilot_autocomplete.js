@@ -0,0 +1,109 @@
+// Turns every <select multiple data-autocomplete-url> into a search box
+// plus a list of removable badges. The select stays in the form (hidden)
+// and holds one selected <option> per chosen pilot.
+(function () {
+  "use strict";
+
+  function init(select) {
+    var url = select.dataset.autocompleteUrl;
+    var wrapper = document.createElement("div");
+    var chosen = document.createElement("div");
+    var input = document.createElement("input");
+    var results = document.createElement("div");
+    var more = document.createElement("button");
+    var timer = null;
+    var after = null;
+
+    chosen.className = "mb-2";
+    input.type = "search";
+    input.className = "form-control";
+    input.placeholder = "Search pilots by username...";
+    input.autocomplete = "off";
+    results.className = "list-group mt-1";
+    more.type = "button";
+    more.className = "btn btn-link btn-sm";
+    more.textContent = "More results";
+    more.hidden = true;
+
+    select.hidden = true;
+    select.parentNode.insertBefore(wrapper, select);
+    wrapper.append(chosen, input, results, more, select);
+
+    function renderChosen() {
+      chosen.innerHTML = "";
+      Array.prototype.forEach.call(select.selectedOptions, function (option) {
+        var badge = document.createElement("span");
+        var remove = document.createElement("button");
+        badge.className = "badge badge-info mr-1 mb-1 p-2";
+        badge.textContent = option.textContent + " ";
+        remove.type = "button";
+        remove.className = "close ml-1";
+        remove.style.fontSize = "1rem";
+        remove.innerHTML = "&times;";
+        remove.addEventListener("click", function () {
+          option.remove();
+          renderChosen();
+        });
+        badge.appendChild(remove);
+        chosen.appendChild(badge);
+      });
+    }
+
+    function choose(pilot) {
+      var value = String(pilot.id);
+      var exists = Array.prototype.some.call(select.options, function (option) {
+        return option.value === value;
+      });
+      if (!exists) {
+        select.add(new Option(pilot.text, value, true, true));
+      }
+      renderChosen();
+    }
+
+    function search(append) {
+      var params = new URLSearchParams({ q: input.value.trim() });
+      if (append && after) {
+        params.set("after", after);
+      }
+      fetch(url + "?" + params.toString(), {
+        credentials: "same-origin",
+        headers: { Accept: "application/json" },
+      })
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (!append) {
+            results.innerHTML = "";
+          }
+          data.results.forEach(function (pilot) {
+            var item = document.createElement("button");
+            item.type = "button";
+            item.className = "list-group-item list-group-item-action py-1";
+            item.textContent = pilot.text;
+            item.addEventListener("click", function () { choose(pilot); });
+            results.appendChild(item);
+          });
+          after = data.after;
+          more.hidden = !after;
+        });
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      if (!input.value.trim()) {
+        results.innerHTML = "";
+        more.hidden = true;
+        return;
+      }
+      timer = setTimeout(function () { search(false); }, 250);
+    });
+    more.addEventListener("click", function () { search(true); });
+
+    renderChosen();
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document
+      .querySelectorAll("select[multiple][data-autocomplete-url]")
+      .forEach(init);
+  });
+})();